@@ -12,6 +12,14 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 from utils.database import db
+from utils.sharding import shards
+from utils.maintenance import maintenance
+from utils.retention import retention
+from utils.config_sync import config_sync
+from utils.repositories import warm_config_caches
+from utils.repositories.guild_settings import guild_settings_repo
+from utils.repositories.levels import levels_repo
+from utils.voice_tracker import voice_tracker
 
 load_dotenv()
 
@@ -43,24 +51,16 @@ class DraftBot(commands.Bot):
         
         self.default_prefix = os.getenv("BOT_PREFIX", "!")
         self.start_time = None
-        self.prefix_cache: dict[int, str] = {}  # cache des prefix par serveur
     
     async def get_prefix(self, message: discord.Message) -> list[str]:
         """recup le prefix du serveur ou le default"""
         prefixes = [self.default_prefix]
         
         if message.guild:
-            guild_id = message.guild.id
-            if guild_id in self.prefix_cache:
-                prefixes = [self.prefix_cache[guild_id]]
-            else:
-                row = await db.fetchone(
-                    "SELECT prefix FROM guild_settings WHERE guild_id = ?",
-                    (guild_id,)
-                )
-                if row:
-                    self.prefix_cache[guild_id] = row["prefix"]
-                    prefixes = [row["prefix"]]
+            # en memoire (warm-up + invalidation), pas de requete par message
+            prefix = await guild_settings_repo.get_prefix(message.guild.id)
+            if prefix:
+                prefixes = [prefix]
         
         # on peut toujours mentionner le bot comme prefix
         return commands.when_mentioned_or(*prefixes)(self, message)
@@ -70,6 +70,13 @@ class DraftBot(commands.Bot):
         logger.info("Init...")
         
         await db.connect()
+        await shards.connect()
+        await retention.connect()
+        maintenance.start()
+        retention.start()
+        await config_sync.start()
+        levels_repo.start()
+        voice_tracker.start(self)
         logger.info("DB ok")
         
         # charge tous les cogs du dossier cogs/
@@ -84,6 +91,8 @@ class DraftBot(commands.Bot):
             except Exception as e:
                 logger.error(f"Erreur chargement {cog_name}: {e}")
         
+        await self.warm_caches()
+        
         # sync les slash commands
         try:
             synced = await self.tree.sync()
@@ -91,6 +100,18 @@ class DraftBot(commands.Bot):
         except Exception as e:
             logger.error(f"Sync fail: {e}")
     
+    async def warm_caches(self):
+        """
+        charge les configs et prefix de toutes les guilds d'un coup (une requete
+        par table) avant la connexion a la gateway, sinon le premier message de
+        chaque guild declenche ses propres SELECT juste quand les events affluent
+        """
+        start = asyncio.get_running_loop().time()
+        configs = await warm_config_caches()
+        guilds = await guild_settings_repo.warm()
+        elapsed = asyncio.get_running_loop().time() - start
+        logger.info(f"Warm-up: {configs} configs, {guilds} guild_settings en {elapsed * 1000:.0f}ms")
+    
     async def on_ready(self):
         """quand le bot est pret"""
         import time
@@ -112,14 +133,15 @@ class DraftBot(commands.Bot):
             "INSERT OR IGNORE INTO guild_settings (guild_id) VALUES (?)",
             (guild.id,)
         )
+        # la guild etait peut etre cachee "sans ligne"
+        guild_settings_repo.invalidate(guild.id)
         logger.info(f"Rejoint: {guild.name} ({guild.id})")
     
     async def on_guild_remove(self, guild: discord.Guild):
         """quand le bot quitte un serveur"""
         # on garde les donnees au cas ou (decommenter pour supprimer)
         # await db.execute("DELETE FROM guild_settings WHERE guild_id = ?", (guild.id,))
-        if guild.id in self.prefix_cache:
-            del self.prefix_cache[guild.id]
+        guild_settings_repo.invalidate(guild.id)
         logger.info(f"Quitte: {guild.name} ({guild.id})")
     
     async def on_command_error(self, ctx: commands.Context, error: Exception):
@@ -175,6 +197,13 @@ class DraftBot(commands.Bot):
     
     async def close(self):
         """fermeture propre"""
+        await voice_tracker.stop()
+        await config_sync.stop()
+        # gains d'xp pas encore ecrits, avant de fermer les shards
+        await levels_repo.stop()
+        await maintenance.stop()
+        await retention.close()
+        await shards.close()
         await db.close()
         await super().close()
 
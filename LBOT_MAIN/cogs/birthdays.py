@@ -11,6 +11,8 @@ from typing import Optional
 import calendar
 
 from utils.database import db
+from utils.repositories.guild_settings import guild_settings_repo
+from utils.repositories.configs import birthdays_config_repo
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed,
     format_message, is_admin
@@ -145,22 +147,6 @@ class Birthdays(commands.Cog):
         except:
             pass
     
-    async def get_config(self, guild_id: int) -> dict:
-        """Get birthday config"""
-        row = await db.fetchone(
-            "SELECT * FROM birthday_config WHERE guild_id = ?", (guild_id,)
-        )
-        if row:
-            return dict(row)
-        
-        await db.execute(
-            "INSERT OR IGNORE INTO birthday_config (guild_id) VALUES (?)", (guild_id,)
-        )
-        row = await db.fetchone(
-            "SELECT * FROM birthday_config WHERE guild_id = ?", (guild_id,)
-        )
-        return dict(row)
-    
     def parse_date(self, date_str: str) -> tuple:
         """Parse a date string (DD/MM or DD/MM/YYYY)"""
         parts = date_str.replace("-", "/").split("/")
@@ -235,7 +221,7 @@ class Birthdays(commands.Cog):
             return await ctx.send(embed=error_embed(f"Date invalide ! Utilise JJ/MM ou JJ/MM/AAAA"))
         
         # Check if birthday changes are allowed
-        config = await self.get_config(ctx.guild.id)
+        config = await birthdays_config_repo.get_config(ctx.guild.id)
         
         existing = await db.fetchone(
             "SELECT * FROM user_birthdays WHERE guild_id = ? AND user_id = ?",
@@ -386,11 +372,8 @@ class Birthdays(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def birthday_config(self, ctx: commands.Context):
         """Configure le système d'anniversaires"""
-        config = await self.get_config(ctx.guild.id)
-        settings = await db.fetchone(
-            "SELECT birthdays_enabled FROM guild_settings WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        config = await birthdays_config_repo.get_config(ctx.guild.id)
+        enabled = await guild_settings_repo.is_enabled(ctx.guild.id, "birthdays")
         
         channel = ctx.guild.get_channel(config.get("channel_id"))
         role = ctx.guild.get_role(config.get("role_id"))
@@ -399,7 +382,7 @@ class Birthdays(commands.Cog):
             title="🎂 Configuration des anniversaires",
             color=discord.Color.from_rgb(255, 182, 193),
             fields=[
-                ("État", "✅ Activé" if settings and settings["birthdays_enabled"] else "❌ Désactivé", True),
+                ("État", "✅ Activé" if enabled else "❌ Désactivé", True),
                 ("Salon", channel.mention if channel else "Non configuré", True),
                 ("Rôle", role.mention if role else "Non configuré", True),
                 ("Heure d'annonce", f"{config.get('announce_hour') or 9}h", True),
@@ -424,31 +407,21 @@ class Birthdays(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def birthday_enable(self, ctx: commands.Context):
         """Active le système d'anniversaires"""
-        await db.execute(
-            "UPDATE guild_settings SET birthdays_enabled = 1 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "birthdays", True)
         await ctx.send(embed=success_embed("Système d'anniversaires activé !"))
     
     @birthday_config.command(name="disable")
     @commands.has_permissions(administrator=True)
     async def birthday_disable(self, ctx: commands.Context):
         """Désactive le système d'anniversaires"""
-        await db.execute(
-            "UPDATE guild_settings SET birthdays_enabled = 0 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "birthdays", False)
         await ctx.send(embed=success_embed("Système d'anniversaires désactivé !"))
     
     @birthday_config.command(name="channel")
     @commands.has_permissions(administrator=True)
     async def birthday_channel(self, ctx: commands.Context, channel: discord.TextChannel):
         """Définit le salon d'annonces"""
-        await self.get_config(ctx.guild.id)
-        await db.execute(
-            "UPDATE birthday_config SET channel_id = ? WHERE guild_id = ?",
-            (channel.id, ctx.guild.id)
-        )
+        await birthdays_config_repo.update_config(ctx.guild.id, channel_id=channel.id)
         await ctx.send(embed=success_embed(f"Salon d'anniversaires: {channel.mention}"))
     
     @birthday_config.command(name="role")
@@ -458,10 +431,7 @@ class Birthdays(commands.Cog):
         if role >= ctx.guild.me.top_role:
             return await ctx.send(embed=error_embed("Je ne peux pas donner ce rôle !"))
         
-        await db.execute(
-            "UPDATE birthday_config SET role_id = ? WHERE guild_id = ?",
-            (role.id, ctx.guild.id)
-        )
+        await birthdays_config_repo.update_config(ctx.guild.id, role_id=role.id)
         await ctx.send(embed=success_embed(f"Rôle d'anniversaire: {role.mention}"))
     
     @birthday_config.command(name="hour")
@@ -471,10 +441,7 @@ class Birthdays(commands.Cog):
         if not (0 <= hour <= 23):
             return await ctx.send(embed=error_embed("L'heure doit être entre 0 et 23 !"))
         
-        await db.execute(
-            "UPDATE birthday_config SET announce_hour = ? WHERE guild_id = ?",
-            (hour, ctx.guild.id)
-        )
+        await birthdays_config_repo.update_config(ctx.guild.id, announce_hour=hour)
         await ctx.send(embed=success_embed(f"Heure d'annonce: {hour}h"))
     
     @birthday_config.command(name="message")
@@ -484,10 +451,7 @@ class Birthdays(commands.Cog):
         
         Variables: {user}, {age}, {server}
         """
-        await db.execute(
-            "UPDATE birthday_config SET message = ? WHERE guild_id = ?",
-            (message, ctx.guild.id)
-        )
+        await birthdays_config_repo.update_config(ctx.guild.id, message=message)
         
         preview = format_message(message, user=ctx.author.mention, age=" (20 ans)", server=ctx.guild.name)
         await ctx.send(embed=success_embed(f"Message défini !\n\n**Aperçu:**\n{preview}"))
@@ -5,17 +5,17 @@ utilise economy_repo pour les acces DB (voir utils/repositories/economy.py)
 """
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-import time
 import random
 from typing import Optional
 
 from utils.database import db
 from utils.repositories.economy import economy_repo, UserEconomy
+from utils.voice_tracker import voice_tracker
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed, warning_embed,
-    format_duration, Paginator, ConfirmView, is_admin
+    format_duration, Paginator, KeysetPaginator, ConfirmView, is_admin
 )
 
 
@@ -24,13 +24,12 @@ class Economy(commands.Cog):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.voice_tracking: dict[tuple[int, int], float] = {}
     
     async def cog_load(self):
-        self.voice_money_task.start()
+        voice_tracker.subscribe(self.on_voice_tick)
     
     async def cog_unload(self):
-        self.voice_money_task.cancel()
+        voice_tracker.unsubscribe(self.on_voice_tick)
     
     def format_currency(self, amount: int, config: dict) -> str:
         """formate la monnaie avec emoji"""
@@ -38,51 +37,15 @@ class Economy(commands.Cog):
         name = config.get("currency_name", "coins")
         return f"{emoji} **{amount:,}** {name}"
     
-    @commands.Cog.listener()
-    async def on_voice_state_update(
-        self,
-        member: discord.Member,
-        before: discord.VoiceState,
-        after: discord.VoiceState
-    ):
-        """track le vocal pour l'argent"""
-        if member.bot:
-            return
-        
-        key = (member.guild.id, member.id)
-        
-        if before.channel is None and after.channel is not None:
-            self.voice_tracking[key] = time.time()
-        elif before.channel is not None and after.channel is None:
-            if key in self.voice_tracking:
-                del self.voice_tracking[key]
-    
-    @tasks.loop(minutes=1)
-    async def voice_money_task(self):
-        """donne de l'argent pour le temps vocal"""
-        for (guild_id, user_id), join_time in list(self.voice_tracking.items()):
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                continue
-            
-            member = guild.get_member(user_id)
-            if not member or not member.voice or not member.voice.channel:
-                del self.voice_tracking[(guild_id, user_id)]
-                continue
-            
-            voice_members = [m for m in member.voice.channel.members if not m.bot]
-            if len(voice_members) < 2 or member.voice.self_mute or member.voice.self_deaf:
-                continue
-            
+    async def on_voice_tick(self, eligible: dict[int, list[int]]):
+        """donne de l'argent pour le temps vocal (tick par minute de voice_tracker)"""
+        for guild_id, user_ids in eligible.items():
             config = await economy_repo.get_config(guild_id)
             money_per_min = config.get("voice_money_per_minute", 1)
             
             if money_per_min > 0:
-                await economy_repo.add_balance(guild_id, user_id, money_per_min)
-    
-    @voice_money_task.before_loop
-    async def before_voice_money(self):
-        await self.bot.wait_until_ready()
+                # un statement pour tout le serveur
+                await economy_repo.add_balance_many(guild_id, user_ids, money_per_min)
     
     # ==================== COMMANDS ====================
     
@@ -287,46 +250,55 @@ class Economy(commands.Cog):
     async def leaderboard_eco(self, ctx: commands.Context, page: int = 1):
         """Affiche le classement des plus riches"""
         per_page = 10
-        offset = (page - 1) * per_page
-        
-        users = await economy_repo.get_leaderboard(ctx.guild.id, limit=per_page, offset=offset)
         
         # compte total pour pagination
-        total_row = await db.fetchone(
-            "SELECT COUNT(*) as count FROM user_economy WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
-        total_pages = (total_row["count"] // per_page) + 1
-        
-        if not users:
+        total = await economy_repo.get_total_users(ctx.guild.id)
+        if not total:
             return await ctx.send(embed=info_embed("Personne n'a d'argent !"))
         
+        total_pages = (total + per_page - 1) // per_page
+        page = min(max(page, 1), total_pages)
+        
         config = await economy_repo.get_config(ctx.guild.id)
         color = discord.Color.from_str(config.get("color", "#F1C40F"))
         emoji = config.get("currency_emoji", "🪙")
         
-        description = ""
-        for i, user in enumerate(users, start=offset + 1):
-            member = ctx.guild.get_member(user.user_id)
-            name = member.display_name if member else "Utilisateur inconnu"
-            total_money = user.balance + user.bank
+        async def fetch_page(after, page_index):
+            # keyset: la page reprend apres le dernier membre de la precedente
+            users = await economy_repo.get_leaderboard(ctx.guild.id, limit=per_page, after=after)
             
-            medal = ""
-            if i == 1: medal = "🥇 "
-            elif i == 2: medal = "🥈 "
-            elif i == 3: medal = "🥉 "
+            description = ""
+            for i, user in enumerate(users, start=page_index * per_page + 1):
+                member = ctx.guild.get_member(user.user_id)
+                name = member.display_name if member else "Utilisateur inconnu"
+                
+                medal = ""
+                if i == 1: medal = "🥇 "
+                elif i == 2: medal = "🥈 "
+                elif i == 3: medal = "🥉 "
+                
+                description += f"{medal}**#{i}** {name}\n"
+                description += f"└ {emoji} {user.net_worth:,}\n\n"
             
-            description += f"{medal}**#{i}** {name}\n"
-            description += f"└ {emoji} {total_money:,}\n\n"
-        
-        embed = create_embed(
-            title=f"💰 Les plus riches de {ctx.guild.name}",
-            description=description,
-            color=color,
-            footer=f"Page {page}/{total_pages}"
+            embed = create_embed(
+                title=f"💰 Les plus riches de {ctx.guild.name}",
+                description=description or "Page vide",
+                color=color,
+                footer=f"Page {page_index + 1}/{total_pages}"
+            )
+            
+            next_cursor = None
+            if len(users) == per_page and page_index + 1 < total_pages:
+                next_cursor = (users[-1].net_worth, users[-1].user_id)
+            return embed, next_cursor
+        
+        # saut direct a une page: une lecture de l'index pour trouver son debut
+        start = await economy_repo.get_leaderboard_cursor(ctx.guild.id, (page - 1) * per_page)
+        view = KeysetPaginator(
+            fetch_page, ctx.author.id, start_cursor=start, start_page=page - 1,
+            find_cursor=lambda page_index: economy_repo.get_leaderboard_cursor(ctx.guild.id, page_index * per_page)
         )
-        
-        await ctx.send(embed=embed)
+        view.message = await ctx.send(embed=await view.load(), view=view)
     
     # ==================== SHOP ====================
     
@@ -15,6 +15,8 @@ import json
 import re
 
 from utils.database import db
+from utils.repositories.guild_settings import guild_settings_repo
+from utils.repositories.configs import gamedeals_config_repo
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed,
     is_admin
@@ -44,22 +46,6 @@ class GameDeals(commands.Cog):
         if self.session:
             await self.session.close()
     
-    async def get_config(self, guild_id: int) -> dict:
-        """Get deals config for guild"""
-        row = await db.fetchone(
-            "SELECT * FROM gamedeals_config WHERE guild_id = ?", (guild_id,)
-        )
-        if row:
-            return dict(row)
-        
-        await db.execute(
-            "INSERT OR IGNORE INTO gamedeals_config (guild_id) VALUES (?)", (guild_id,)
-        )
-        row = await db.fetchone(
-            "SELECT * FROM gamedeals_config WHERE guild_id = ?", (guild_id,)
-        )
-        return dict(row)
-    
     # ==================== EPIC GAMES FREE GAMES ====================
     
     @tasks.loop(hours=4)
@@ -374,11 +360,8 @@ class GameDeals(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def deals(self, ctx: commands.Context):
         """Configure les annonces de deals/jeux gratuits"""
-        config = await self.get_config(ctx.guild.id)
-        settings = await db.fetchone(
-            "SELECT gamedeals_enabled FROM guild_settings WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        config = await gamedeals_config_repo.get_config(ctx.guild.id)
+        enabled = await guild_settings_repo.is_enabled(ctx.guild.id, "gamedeals")
         
         epic_channel = ctx.guild.get_channel(config.get("epic_channel_id"))
         steam_channel = ctx.guild.get_channel(config.get("steam_channel_id"))
@@ -387,7 +370,7 @@ class GameDeals(commands.Cog):
             title="🎮 Configuration des deals",
             color=discord.Color.gold(),
             fields=[
-                ("État", "✅ Activé" if settings and settings["gamedeals_enabled"] else "❌ Désactivé", True),
+                ("État", "✅ Activé" if enabled else "❌ Désactivé", True),
                 ("🟣 Epic Games", epic_channel.mention if epic_channel else "Non configuré", True),
                 ("🔵 Steam", steam_channel.mention if steam_channel else "Non configuré", True),
                 ("Steam min. réduction", f"{config.get('steam_min_discount') or 75}%", True),
@@ -413,31 +396,21 @@ class GameDeals(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def deals_enable(self, ctx: commands.Context):
         """Active les annonces de deals"""
-        await db.execute(
-            "UPDATE guild_settings SET gamedeals_enabled = 1 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "gamedeals", True)
         await ctx.send(embed=success_embed("Annonces de deals activées !"))
     
     @deals.command(name="disable")
     @commands.has_permissions(administrator=True)
     async def deals_disable(self, ctx: commands.Context):
         """Désactive les annonces de deals"""
-        await db.execute(
-            "UPDATE guild_settings SET gamedeals_enabled = 0 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "gamedeals", False)
         await ctx.send(embed=success_embed("Annonces de deals désactivées !"))
     
     @deals.command(name="epic")
     @commands.has_permissions(administrator=True)
     async def deals_epic(self, ctx: commands.Context, channel: discord.TextChannel, role: discord.Role = None):
         """Configure le salon Epic Games"""
-        await self.get_config(ctx.guild.id)
-        await db.execute(
-            "UPDATE gamedeals_config SET epic_channel_id = ?, epic_role_id = ? WHERE guild_id = ?",
-            (channel.id, role.id if role else None, ctx.guild.id)
-        )
+        await gamedeals_config_repo.update_config(ctx.guild.id, epic_channel_id=channel.id, epic_role_id=role.id if role else None)
         
         msg = f"Salon Epic Games: {channel.mention}"
         if role:
@@ -448,10 +421,7 @@ class GameDeals(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def deals_steam(self, ctx: commands.Context, channel: discord.TextChannel, role: discord.Role = None):
         """Configure le salon Steam"""
-        await db.execute(
-            "UPDATE gamedeals_config SET steam_channel_id = ?, steam_role_id = ? WHERE guild_id = ?",
-            (channel.id, role.id if role else None, ctx.guild.id)
-        )
+        await gamedeals_config_repo.update_config(ctx.guild.id, steam_channel_id=channel.id, steam_role_id=role.id if role else None)
         
         msg = f"Salon Steam: {channel.mention}"
         if role:
@@ -465,10 +435,7 @@ class GameDeals(commands.Cog):
         if percentage < 50 or percentage > 100:
             return await ctx.send(embed=error_embed("Le pourcentage doit être entre 50 et 100 !"))
         
-        await db.execute(
-            "UPDATE gamedeals_config SET steam_min_discount = ? WHERE guild_id = ?",
-            (percentage, ctx.guild.id)
-        )
+        await gamedeals_config_repo.update_config(ctx.guild.id, steam_min_discount=percentage)
         await ctx.send(embed=success_embed(f"Réduction minimum Steam: {percentage}%"))
     
     @deals.command(name="check")
@@ -11,6 +11,8 @@ import asyncio
 from typing import Optional, List
 
 from utils.database import db
+from utils.sharding import shards
+from utils.repositories.levels import levels_repo
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed,
     parse_duration, format_duration, format_relative_time,
@@ -95,11 +97,8 @@ class Giveaways(commands.Cog):
                 )
         
         if giveaway["required_level"]:
-            user_level = await db.fetchone(
-                "SELECT level FROM user_levels WHERE guild_id = ? AND user_id = ?",
-                (interaction.guild.id, interaction.user.id)
-            )
-            level = user_level["level"] if user_level else 0
+            user_level = await levels_repo.get_user(interaction.guild.id, interaction.user.id)
+            level = user_level.level if user_level else 0
             if level < giveaway["required_level"]:
                 return await interaction.response.send_message(
                     embed=error_embed(f"Tu dois être niveau {giveaway['required_level']} minimum !"),
@@ -107,14 +106,15 @@ class Giveaways(commands.Cog):
                 )
         
         # Check if already entered
-        existing = await db.fetchone(
+        shard = shards.for_guild(interaction.guild.id)
+        existing = await shard.fetchone(
             "SELECT * FROM giveaway_entries WHERE giveaway_id = ? AND user_id = ?",
             (giveaway["id"], interaction.user.id)
         )
         
         if existing:
             # Remove entry
-            await db.execute(
+            await shard.execute(
                 "DELETE FROM giveaway_entries WHERE giveaway_id = ? AND user_id = ?",
                 (giveaway["id"], interaction.user.id)
             )
@@ -124,7 +124,7 @@ class Giveaways(commands.Cog):
             )
         else:
             # Add entry
-            await db.execute(
+            await shard.execute(
                 "INSERT INTO giveaway_entries (giveaway_id, user_id, entered_at) VALUES (?, ?, ?)",
                 (giveaway["id"], interaction.user.id, time.time())
             )
@@ -152,7 +152,7 @@ class Giveaways(commands.Cog):
                 return
             
             # Count participants
-            count = await db.fetchone(
+            count = await shards.for_guild(giveaway["guild_id"]).fetchone(
                 "SELECT COUNT(*) as count FROM giveaway_entries WHERE giveaway_id = ?",
                 (giveaway["id"],)
             )
@@ -216,7 +216,8 @@ class Giveaways(commands.Cog):
                 return
             
             # Get all entries
-            entries = await db.fetchall(
+            shard = shards.for_guild(guild.id)
+            entries = await shard.fetchall(
                 "SELECT user_id FROM giveaway_entries WHERE giveaway_id = ?",
                 (giveaway["id"],)
             )
@@ -232,19 +233,24 @@ class Giveaways(commands.Cog):
             winner_count = min(giveaway["winner_count"], len(valid_users))
             winners = random.sample(valid_users, winner_count) if valid_users else []
             
-            # Update database
-            await db.execute(
-                "UPDATE giveaways SET ended = 1 WHERE id = ?",
-                (giveaway["id"],)
-            )
-            
-            # Store winners
-            for winner in winners:
-                await db.execute(
+            # Update database (one transaction: ended flag + winners)
+            # giveaways is in the central file, entries in the guild's shard
+            async with db.transaction(), shard.transaction():
+                cursor = await db.execute(
+                    "UPDATE giveaways SET ended = 1, ended_at = ? WHERE id = ? AND ended = 0",
+                    (time.time(), giveaway["id"])
+                )
+                # Already ended by the task or the end command meanwhile
+                if cursor.rowcount == 0:
+                    return
+                
+                # Store winners (single batched statement)
+                now = time.time()
+                await shard.execute_many(
                     """INSERT OR REPLACE INTO giveaway_entries 
                        (giveaway_id, user_id, entered_at, won)
                        VALUES (?, ?, ?, 1)""",
-                    (giveaway["id"], winner.id, time.time())
+                    [(giveaway["id"], winner.id, now) for winner in winners]
                 )
             
             # Update message
@@ -380,7 +386,7 @@ class Giveaways(commands.Cog):
             return await ctx.send(embed=error_embed("Giveaway non trouvé ou pas encore terminé !"))
         
         # Get entries (excluding previous winners)
-        entries = await db.fetchall(
+        entries = await shards.for_guild(ctx.guild.id).fetchall(
             "SELECT user_id FROM giveaway_entries WHERE giveaway_id = ? AND (won IS NULL OR won = 0)",
             (giveaway["id"],)
         )
@@ -417,7 +423,9 @@ class Giveaways(commands.Cog):
             return await ctx.send(embed=error_embed("Giveaway non trouvé ou déjà terminé !"))
         
         # Delete from database
-        await db.execute("DELETE FROM giveaway_entries WHERE giveaway_id = ?", (giveaway["id"],))
+        await shards.for_guild(ctx.guild.id).execute(
+            "DELETE FROM giveaway_entries WHERE giveaway_id = ?", (giveaway["id"],)
+        )
         await db.execute("DELETE FROM giveaways WHERE id = ?", (giveaway["id"],))
         
         # Try to delete/edit message
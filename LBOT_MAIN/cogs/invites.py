@@ -16,6 +16,9 @@ from typing import Optional, Dict, List
 from collections import defaultdict
 
 from utils.database import db
+from utils.repositories.guild_settings import guild_settings_repo
+from utils.repositories.configs import invites_config_repo
+from utils.sharding import shards
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed,
     format_message, Paginator, is_admin
@@ -68,25 +71,9 @@ class Invites(commands.Cog):
     async def before_sync_invites(self):
         await self.bot.wait_until_ready()
     
-    async def get_config(self, guild_id: int) -> dict:
-        """Get invite config"""
-        row = await db.fetchone(
-            "SELECT * FROM invite_config WHERE guild_id = ?", (guild_id,)
-        )
-        if row:
-            return dict(row)
-        
-        await db.execute(
-            "INSERT OR IGNORE INTO invite_config (guild_id) VALUES (?)", (guild_id,)
-        )
-        row = await db.fetchone(
-            "SELECT * FROM invite_config WHERE guild_id = ?", (guild_id,)
-        )
-        return dict(row)
-    
     async def get_user_invites(self, guild_id: int, user_id: int) -> dict:
         """Get invite stats for a user"""
-        row = await db.fetchone(
+        row = await shards.for_guild(guild_id).fetchone(
             "SELECT * FROM user_invites WHERE guild_id = ? AND user_id = ?",
             (guild_id, user_id)
         )
@@ -154,14 +141,10 @@ class Invites(commands.Cog):
             return
         
         # Check if invites tracking is enabled
-        settings = await db.fetchone(
-            "SELECT invites_enabled FROM guild_settings WHERE guild_id = ?",
-            (member.guild.id,)
-        )
-        if not settings or not settings["invites_enabled"]:
+        if not await guild_settings_repo.is_enabled(member.guild.id, "invites"):
             return
         
-        config = await self.get_config(member.guild.id)
+        config = await invites_config_repo.get_config(member.guild.id)
         
         # Find which invite was used
         used_invite = await self.find_used_invite(member.guild)
@@ -181,16 +164,18 @@ class Invites(commands.Cog):
             if account_age < min_age:
                 is_fake = True
             
+            shard = shards.for_guild(member.guild.id)
+            
             # Update inviter stats
             if is_fake:
-                await db.execute(
+                await shard.execute(
                     """INSERT INTO user_invites (guild_id, user_id, fake)
                        VALUES (?, ?, 1)
                        ON CONFLICT(guild_id, user_id) DO UPDATE SET fake = fake + 1""",
                     (member.guild.id, inviter.id)
                 )
             else:
-                await db.execute(
+                await shard.execute(
                     """INSERT INTO user_invites (guild_id, user_id, regular)
                        VALUES (?, ?, 1)
                        ON CONFLICT(guild_id, user_id) DO UPDATE SET regular = regular + 1""",
@@ -198,7 +183,7 @@ class Invites(commands.Cog):
                 )
             
             # Store who invited this member
-            await db.execute(
+            await shard.execute(
                 """INSERT OR REPLACE INTO invited_users 
                    (guild_id, user_id, inviter_id, invite_code, joined_at, is_fake)
                    VALUES (?, ?, ?, ?, ?, ?)""",
@@ -220,17 +205,13 @@ class Invites(commands.Cog):
         if member.bot:
             return
         
-        settings = await db.fetchone(
-            "SELECT invites_enabled FROM guild_settings WHERE guild_id = ?",
-            (member.guild.id,)
-        )
-        if not settings or not settings["invites_enabled"]:
+        if not await guild_settings_repo.is_enabled(member.guild.id, "invites"):
             return
         
-        config = await self.get_config(member.guild.id)
+        config = await invites_config_repo.get_config(member.guild.id)
         
         # Find who invited this member
-        invited = await db.fetchone(
+        invited = await shards.for_guild(member.guild.id).fetchone(
             "SELECT * FROM invited_users WHERE guild_id = ? AND user_id = ?",
             (member.guild.id, member.id)
         )
@@ -241,7 +222,7 @@ class Invites(commands.Cog):
             
             # Update leaves count (only if wasn't fake)
             if not invited.get("is_fake"):
-                await db.execute(
+                await shards.for_guild(member.guild.id).execute(
                     """UPDATE user_invites SET leaves = leaves + 1 
                        WHERE guild_id = ? AND user_id = ?""",
                     (member.guild.id, invited["inviter_id"])
@@ -420,7 +401,7 @@ class Invites(commands.Cog):
     @invites.command(name="leaderboard", aliases=["lb", "top"])
     async def invites_leaderboard(self, ctx: commands.Context):
         """Affiche le classement des inviteurs"""
-        top_inviters = await db.fetchall(
+        top_inviters = await shards.for_guild(ctx.guild.id).fetchall(
             """SELECT user_id, regular, leaves, fake, bonus,
                       (regular - leaves - fake + bonus) as total
                FROM user_invites 
@@ -455,7 +436,7 @@ class Invites(commands.Cog):
         """Affiche qui a invité un membre"""
         member = member or ctx.author
         
-        invited = await db.fetchone(
+        invited = await shards.for_guild(ctx.guild.id).fetchone(
             "SELECT * FROM invited_users WHERE guild_id = ? AND user_id = ?",
             (ctx.guild.id, member.id)
         )
@@ -487,7 +468,7 @@ class Invites(commands.Cog):
         """Affiche les membres invités par quelqu'un"""
         member = member or ctx.author
         
-        invited = await db.fetchall(
+        invited = await shards.for_guild(ctx.guild.id).fetchall(
             """SELECT user_id, joined_at, is_fake FROM invited_users 
                WHERE guild_id = ? AND inviter_id = ?
                ORDER BY joined_at DESC
@@ -552,7 +533,7 @@ class Invites(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def invites_add(self, ctx: commands.Context, member: discord.Member, amount: int):
         """Ajoute des invitations bonus"""
-        await db.execute(
+        await shards.for_guild(ctx.guild.id).execute(
             """INSERT INTO user_invites (guild_id, user_id, bonus)
                VALUES (?, ?, ?)
                ON CONFLICT(guild_id, user_id) DO UPDATE SET bonus = bonus + ?""",
@@ -574,7 +555,7 @@ class Invites(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def invites_remove(self, ctx: commands.Context, member: discord.Member, amount: int):
         """Retire des invitations bonus"""
-        await db.execute(
+        await shards.for_guild(ctx.guild.id).execute(
             """UPDATE user_invites SET bonus = bonus - ? 
                WHERE guild_id = ? AND user_id = ?""",
             (amount, ctx.guild.id, member.id)
@@ -592,30 +573,28 @@ class Invites(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def invites_reset(self, ctx: commands.Context, member: discord.Member = None):
         """Reset les invitations d'un membre ou du serveur"""
+        shard = shards.for_guild(ctx.guild.id)
         if member:
-            await db.execute(
+            await shard.execute(
                 "DELETE FROM user_invites WHERE guild_id = ? AND user_id = ?",
                 (ctx.guild.id, member.id)
             )
-            await db.execute(
+            await shard.execute(
                 "DELETE FROM invited_users WHERE guild_id = ? AND inviter_id = ?",
                 (ctx.guild.id, member.id)
             )
             await ctx.send(embed=success_embed(f"Invitations de {member.mention} réinitialisées !"))
         else:
-            await db.execute("DELETE FROM user_invites WHERE guild_id = ?", (ctx.guild.id,))
-            await db.execute("DELETE FROM invited_users WHERE guild_id = ?", (ctx.guild.id,))
+            await shard.execute("DELETE FROM user_invites WHERE guild_id = ?", (ctx.guild.id,))
+            await shard.execute("DELETE FROM invited_users WHERE guild_id = ?", (ctx.guild.id,))
             await ctx.send(embed=success_embed("Toutes les invitations ont été réinitialisées !"))
     
     @invites.group(name="config", invoke_without_command=True)
     @commands.has_permissions(administrator=True)
     async def invites_config(self, ctx: commands.Context):
         """Configure le système d'invitations"""
-        config = await self.get_config(ctx.guild.id)
-        settings = await db.fetchone(
-            "SELECT invites_enabled FROM guild_settings WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        config = await invites_config_repo.get_config(ctx.guild.id)
+        enabled = await guild_settings_repo.is_enabled(ctx.guild.id, "invites")
         
         join_channel = ctx.guild.get_channel(config.get("join_channel_id"))
         leave_channel = ctx.guild.get_channel(config.get("leave_channel_id"))
@@ -624,7 +603,7 @@ class Invites(commands.Cog):
             title="📨 Configuration des invitations",
             color=discord.Color.blue(),
             fields=[
-                ("État", "✅ Activé" if settings and settings["invites_enabled"] else "❌ Désactivé", True),
+                ("État", "✅ Activé" if enabled else "❌ Désactivé", True),
                 ("Salon arrivées", join_channel.mention if join_channel else "Non configuré", True),
                 ("Salon départs", leave_channel.mention if leave_channel else "Non configuré", True),
                 ("Âge minimum compte", f"{config.get('min_account_age') or 7} jours", True),
@@ -651,41 +630,28 @@ class Invites(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def invites_enable(self, ctx: commands.Context):
         """Active le système d'invitations"""
-        await db.execute(
-            "UPDATE guild_settings SET invites_enabled = 1 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "invites", True)
         await ctx.send(embed=success_embed("Système d'invitations activé !"))
     
     @invites_config.command(name="disable")
     @commands.has_permissions(administrator=True)
     async def invites_disable(self, ctx: commands.Context):
         """Désactive le système d'invitations"""
-        await db.execute(
-            "UPDATE guild_settings SET invites_enabled = 0 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "invites", False)
         await ctx.send(embed=success_embed("Système d'invitations désactivé !"))
     
     @invites_config.command(name="join")
     @commands.has_permissions(administrator=True)
     async def invites_join_channel(self, ctx: commands.Context, channel: discord.TextChannel):
         """Définit le salon des arrivées"""
-        await self.get_config(ctx.guild.id)
-        await db.execute(
-            "UPDATE invite_config SET join_channel_id = ? WHERE guild_id = ?",
-            (channel.id, ctx.guild.id)
-        )
+        await invites_config_repo.update_config(ctx.guild.id, join_channel_id=channel.id)
         await ctx.send(embed=success_embed(f"Salon des arrivées: {channel.mention}"))
     
     @invites_config.command(name="leave")
     @commands.has_permissions(administrator=True)
     async def invites_leave_channel(self, ctx: commands.Context, channel: discord.TextChannel):
         """Définit le salon des départs"""
-        await db.execute(
-            "UPDATE invite_config SET leave_channel_id = ? WHERE guild_id = ?",
-            (channel.id, ctx.guild.id)
-        )
+        await invites_config_repo.update_config(ctx.guild.id, leave_channel_id=channel.id)
         await ctx.send(embed=success_embed(f"Salon des départs: {channel.mention}"))
     
     @invites_config.command(name="age")
@@ -695,10 +661,7 @@ class Invites(commands.Cog):
         if days < 0 or days > 365:
             return await ctx.send(embed=error_embed("L'âge doit être entre 0 et 365 jours !"))
         
-        await db.execute(
-            "UPDATE invite_config SET min_account_age = ? WHERE guild_id = ?",
-            (days, ctx.guild.id)
-        )
+        await invites_config_repo.update_config(ctx.guild.id, min_account_age=days)
         await ctx.send(embed=success_embed(f"Âge minimum du compte: {days} jours"))
     
     @invites.group(name="reward", invoke_without_command=True)
@@ -6,17 +6,19 @@ le repo gere le cache de config et centralise le SQL
 """
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import time
 import random
 from typing import Optional
 
-from utils.database import db
+from utils.repositories.guild_settings import guild_settings_repo
 from utils.repositories.levels import levels_repo, UserLevel
+from utils.xp_curve import curve_for, get_curve
+from utils.voice_tracker import voice_tracker
+from utils.expiring import Cooldowns
 from utils.helpers import (
-    create_embed, success_embed, error_embed, info_embed,
-    xp_for_level, level_from_xp, xp_progress, progress_bar,
+    create_embed, success_embed, error_embed, info_embed, progress_bar,
     format_message, Paginator, is_admin, chunk_list
 )
 
@@ -33,41 +35,47 @@ class Levels(commands.Cog):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.xp_cooldowns: dict[tuple[int, int], float] = {}
-        self.voice_tracking: dict[tuple[int, int], float] = {}
+        # (guild, user) -> fin du cooldown, oublie tout seul une fois expire
+        self.xp_cooldowns = Cooldowns("xp_cooldowns")
     
     async def cog_load(self):
-        self.voice_xp_task.start()
+        voice_tracker.subscribe(self.on_voice_tick)
     
     async def cog_unload(self):
-        self.voice_xp_task.cancel()
+        voice_tracker.unsubscribe(self.on_voice_tick)
     
-    async def add_xp(self, member: discord.Member, amount: int) -> Optional[int]:
-        """ajoute de l'xp, retourne le nouveau niveau si level up"""
-        config = await levels_repo.get_config(member.guild.id)
-        user = await levels_repo.get_or_create_user(member.guild.id, member.id)
-        
+    def apply_xp(self, user: UserLevel, amount: int, config: dict) -> Optional[int]:
+        """applique un gain d'xp sur le user (en memoire), retourne le nouveau niveau si level up"""
+        curve = curve_for(config)
         old_level = user.level
         new_xp = user.xp + amount
-        new_level = level_from_xp(new_xp)
+        new_level = curve.level_for(new_xp)
         
         # check max level
         max_level = config.get("max_level", 0)
         if max_level > 0 and new_level > max_level:
             new_level = max_level
-            new_xp = xp_for_level(max_level)
+            new_xp = curve.xp_for(max_level)
         
-        # update via repo
         user.xp = new_xp
         user.level = new_level
         user.total_messages += 1
         user.last_xp_time = time.time()
-        await levels_repo.save_user(user)
         
         if new_level > old_level:
             return new_level
         return None
     
+    async def add_xp(self, member: discord.Member, amount: int) -> Optional[int]:
+        """ajoute de l'xp, retourne le nouveau niveau si level up"""
+        config = await levels_repo.get_config(member.guild.id)
+        user = await levels_repo.get_cached_user(member.guild.id, member.id)
+        
+        # level up calcule sur la version en memoire, l'ecriture part au prochain flush
+        new_level = self.apply_xp(user, amount, config)
+        await levels_repo.queue_save(user)
+        return new_level
+    
     async def check_rewards(self, member: discord.Member, level: int):
         """donne les rewards de niveau"""
         rewards = await levels_repo.get_rewards_for_level(member.guild.id, level)
@@ -98,11 +106,7 @@ class Levels(commands.Cog):
             return
         
         # check si levels actifs
-        settings = await db.fetchone(
-            "SELECT levels_enabled FROM guild_settings WHERE guild_id = ?",
-            (message.guild.id,)
-        )
-        if not settings or not settings["levels_enabled"]:
+        if not await guild_settings_repo.is_enabled(message.guild.id, "levels"):
             return
         
         # config cached par le repo
@@ -121,11 +125,8 @@ class Levels(commands.Cog):
         # check cooldown (en memoire pour la perf)
         key = (message.guild.id, message.author.id)
         cooldown = config.get("xp_cooldown", 60)
-        if key in self.xp_cooldowns:
-            if time.time() - self.xp_cooldowns[key] < cooldown:
-                return
-        
-        self.xp_cooldowns[key] = time.time()
+        if not self.xp_cooldowns.hit(key, cooldown):
+            return
         
         # calcul xp avec boosters
         base_xp = config.get("xp_per_message", 15)
@@ -167,58 +168,21 @@ class Levels(commands.Cog):
                 except discord.Forbidden:
                     pass
     
-    @commands.Cog.listener()
-    async def on_voice_state_update(
-        self,
-        member: discord.Member,
-        before: discord.VoiceState,
-        after: discord.VoiceState
-    ):
-        """track le temps vocal pour l'xp"""
-        if member.bot:
-            return
-        
-        key = (member.guild.id, member.id)
-        
-        if before.channel is None and after.channel is not None:
-            self.voice_tracking[key] = time.time()
-        elif before.channel is not None and after.channel is None:
-            if key in self.voice_tracking:
-                del self.voice_tracking[key]
-    
-    @tasks.loop(minutes=1)
-    async def voice_xp_task(self):
-        """donne de l'xp pour le temps en vocal"""
-        for (guild_id, user_id), join_time in list(self.voice_tracking.items()):
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                continue
-            
-            member = guild.get_member(user_id)
-            if not member or not member.voice or not member.voice.channel:
-                del self.voice_tracking[(guild_id, user_id)]
-                continue
-            
-            # pas d'xp si seul ou mute
-            voice_members = [m for m in member.voice.channel.members if not m.bot]
-            if len(voice_members) < 2 or member.voice.self_mute or member.voice.self_deaf:
-                continue
-            
+    async def on_voice_tick(self, eligible: dict[int, list[int]]):
+        """donne de l'xp pour le temps en vocal (tick par minute de voice_tracker)"""
+        for guild_id, user_ids in eligible.items():
             config = await levels_repo.get_config(guild_id)
             xp_per_min = config.get("xp_voice_per_minute", 5)
             
-            if xp_per_min > 0:
-                await self.add_xp(member, xp_per_min)
-                
-                # update voice time directement (pas dans le repo pour l'instant)
-                await db.execute(
-                    "UPDATE user_levels SET voice_time = voice_time + 60 WHERE guild_id = ? AND user_id = ?",
-                    (guild_id, user_id)
-                )
-    
-    @voice_xp_task.before_loop
-    async def before_voice_xp(self):
-        await self.bot.wait_until_ready()
+            if xp_per_min <= 0:
+                continue
+            
+            # memes instances que les gains par message, un upsert par guild au flush
+            users = await levels_repo.get_cached_users(guild_id, user_ids)
+            for user in users:
+                self.apply_xp(user, xp_per_min, config)
+                user.voice_time += 60
+            await levels_repo.queue_save_many(users)
     
     # ==================== COMMANDS ====================
     
@@ -232,10 +196,11 @@ class Levels(commands.Cog):
             return await ctx.send(embed=error_embed("Les bots n'ont pas de niveau !"))
         
         config = await levels_repo.get_config(ctx.guild.id)
-        user = await levels_repo.get_or_create_user(ctx.guild.id, member.id)
+        user = await levels_repo.get_cached_user(ctx.guild.id, member.id)
         rank = await levels_repo.get_rank(ctx.guild.id, member.id)
+        percentile = await levels_repo.get_percentile(ctx.guild.id, member.id)
         
-        current_xp, needed_xp = xp_progress(user.xp, user.level)
+        current_xp, needed_xp = curve_for(config).progress(user.xp, user.level)
         
         color = discord.Color.from_str(config.get("color", "#5865F2"))
         bar = progress_bar(current_xp, needed_xp, 15)
@@ -245,7 +210,7 @@ class Levels(commands.Cog):
             color=color,
             thumbnail=member.display_avatar.url
         )
-        embed.add_field(name="Rang", value=f"#{rank}", inline=True)
+        embed.add_field(name="Rang", value=f"#{rank} (top {max(percentile, 1):.0f}%)", inline=True)
         embed.add_field(name="Niveau", value=str(user.level), inline=True)
         embed.add_field(name="XP Total", value=f"{user.xp:,}", inline=True)
         embed.add_field(
@@ -366,7 +331,8 @@ class Levels(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def setxp(self, ctx: commands.Context, member: discord.Member, xp: int):
         """Définit l'XP d'un membre"""
-        level = level_from_xp(xp)
+        config = await levels_repo.get_config(ctx.guild.id)
+        level = curve_for(config).level_for(xp)
         await levels_repo.set_xp(ctx.guild.id, member.id, xp, level)
         await ctx.send(embed=success_embed(
             f"XP de {member.mention} défini à **{xp:,}** (niveau {level})"
@@ -406,6 +372,27 @@ class Levels(commands.Cog):
         await levels_repo.update_config(ctx.guild.id, xp_cooldown=seconds)
         await ctx.send(embed=success_embed(f"Cooldown XP défini à **{seconds}** secondes"))
     
+    @leveladmin.command(name="curve")
+    @commands.has_permissions(administrator=True)
+    async def set_curve(self, ctx: commands.Context, base: int = 100, exponent: float = 1.5):
+        """Définit la courbe d'XP (XP du niveau n = base × n^exposant) et recalcule les niveaux"""
+        if not 1 <= base <= 100_000 or not 1.0 <= exponent <= 3.0:
+            return await ctx.send(embed=error_embed("Base entre 1 et 100000, exposant entre 1 et 3 !"))
+        
+        # cree la ligne de config si besoin, update_config fait juste un UPDATE
+        config = await levels_repo.get_config(ctx.guild.id)
+        await levels_repo.update_config(ctx.guild.id, xp_curve_base=base, xp_curve_exponent=exponent)
+        curve = get_curve(base, exponent)
+        
+        async with ctx.typing():
+            changed = await levels_repo.recompute_levels(ctx.guild.id, curve, config.get("max_level", 0))
+        
+        steps = ", ".join(f"niv. {lvl}: {curve.xp_for(lvl):,}" for lvl in (1, 10, 50, 100))
+        await ctx.send(embed=success_embed(
+            f"Courbe définie: **{base} × n^{exponent}**\n{steps}\n"
+            f"Niveau recalculé pour **{changed:,}** membres"
+        ))
+    
     @leveladmin.command(name="channel")
     @commands.has_permissions(administrator=True)
     async def set_channel(self, ctx: commands.Context, channel: discord.TextChannel = None):
@@ -8,13 +8,13 @@ import discord
 from discord.ext import commands, tasks
 from discord import app_commands
 import time
-import json
-import re
 from typing import Optional
 from datetime import datetime, timedelta
 
 from utils.database import db
 from utils.repositories.moderation import moderation_repo
+from utils.expiring import RateTracker
+from utils.link_filter import INVITE_PATTERN
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed, warning_embed,
     parse_duration, format_duration, format_datetime, ConfirmView, is_mod
@@ -26,7 +26,8 @@ class Moderation(commands.Cog):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.spam_tracker: dict[tuple[int, int], list[float]] = {}
+        # (guild, user) -> messages recents, oublie apres antispam_seconds sans message
+        self.spam_tracker = RateTracker("spam_tracker")
     
     async def cog_load(self):
         self.check_temp_punishments.start()
@@ -234,17 +235,12 @@ class Moderation(commands.Cog):
     async def check_spam(self, message: discord.Message, config: dict):
         """anti-spam"""
         key = (message.guild.id, message.author.id)
-        now = time.time()
-        
-        if key not in self.spam_tracker:
-            self.spam_tracker[key] = []
         
         window = config.get("antispam_seconds", 5)
-        self.spam_tracker[key] = [t for t in self.spam_tracker[key] if now - t < window]
-        self.spam_tracker[key].append(now)
+        count = self.spam_tracker.hit(key, window)
         
         threshold = config.get("antispam_messages", 5)
-        if len(self.spam_tracker[key]) >= threshold:
+        if count >= threshold:
             action = config.get("antispam_action", "mute")
             
             try:
@@ -270,13 +266,11 @@ class Moderation(commands.Cog):
                 except discord.Forbidden:
                     pass
             
-            self.spam_tracker[key] = []
+            self.spam_tracker.reset(key)
     
     async def check_invites(self, message: discord.Message, config: dict):
         """anti-invites discord"""
-        invite_pattern = r"(?:https?://)?(?:www\.)?(?:discord\.(?:gg|io|me|li)|discordapp\.com/invite)/[a-zA-Z0-9]+"
-        
-        if re.search(invite_pattern, message.content):
+        if INVITE_PATTERN.search(message.content):
             try:
                 await message.delete()
                 await message.channel.send(
@@ -288,46 +282,34 @@ class Moderation(commands.Cog):
     
     async def check_links(self, message: discord.Message, config: dict):
         """anti-links"""
-        link_pattern = r"https?://[^\s]+"
+        # domaines autorises compiles par le repo, un lien passe si son hote
+        # est un de ces domaines (ou sous-domaine), plus de sous-chaine
+        matcher = moderation_repo.get_link_matcher(message.guild.id, config)
         
-        if re.search(link_pattern, message.content):
-            # allowed_links deja parse en list par le cache
-            allowed = config.get("allowed_links", [])
-            if isinstance(allowed, str):
-                allowed = json.loads(allowed)
-            
-            for link in re.findall(link_pattern, message.content):
-                if not any(allowed_domain in link for allowed_domain in allowed):
-                    try:
-                        await message.delete()
-                        await message.channel.send(
-                            embed=warning_embed(f"{message.author.mention}, les liens ne sont pas autorisés !"),
-                            delete_after=5
-                        )
-                    except discord.Forbidden:
-                        pass
-                    break
+        if matcher.search(message.content):
+            try:
+                await message.delete()
+                await message.channel.send(
+                    embed=warning_embed(f"{message.author.mention}, les liens ne sont pas autorisés !"),
+                    delete_after=5
+                )
+            except discord.Forbidden:
+                pass
     
     async def check_bad_words(self, message: discord.Message, config: dict):
         """filtre de mots"""
-        # bad_words deja parse par le cache si configure
-        bad_words = config.get("bad_words", [])
-        if isinstance(bad_words, str):
-            bad_words = json.loads(bad_words)
+        # liste compilee une fois par le repo (rebuild quand la config change)
+        matcher = moderation_repo.get_word_matcher(message.guild.id, config)
         
-        content_lower = message.content.lower()
-        
-        for word in bad_words:
-            if word.lower() in content_lower:
-                try:
-                    await message.delete()
-                    await message.channel.send(
-                        embed=warning_embed(f"{message.author.mention}, ce mot n'est pas autorisé !"),
-                        delete_after=5
-                    )
-                except discord.Forbidden:
-                    pass
-                break
+        if matcher.search(message.content):
+            try:
+                await message.delete()
+                await message.channel.send(
+                    embed=warning_embed(f"{message.author.mention}, ce mot n'est pas autorisé !"),
+                    delete_after=5
+                )
+            except discord.Forbidden:
+                pass
     
     # ==================== COMMANDS ====================
     
@@ -0,0 +1,211 @@
+"""
+Cog Owner - commandes reservees au proprio du bot (stats db, etc.)
+"""
+
+import discord
+from discord.ext import commands
+
+from utils.database import db
+from utils.maintenance import maintenance
+from utils.retention import retention, POLICIES
+from utils.expiring import tracker_stats
+from utils.helpers import create_embed, success_embed, error_embed, info_embed, truncate, split_embed
+
+
+def ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms"
+
+
+def mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} Mo"
+
+
+class Owner(commands.Cog):
+    """Commandes owner"""
+    
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+    
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        # tout le cog est owner only
+        if not await self.bot.is_owner(ctx.author):
+            raise commands.NotOwner()
+        return True
+    
+    @commands.group(name="dbstats", invoke_without_command=True)
+    async def dbstats(self, ctx: commands.Context, limit: int = 10, sort: str = "total"):
+        """Latences des requetes SQL (sort: total, count, p99, wait)"""
+        stats = db.stats.top(min(limit, 25), sort)
+        if not stats:
+            return await ctx.send(embed=info_embed("Aucune requete enregistree."))
+        
+        embed = create_embed(
+            title=f"📊 Requetes SQL (tri: {sort})",
+            color=discord.Color.blurple(),
+            footer=f"Seuil slow query: {ms(db.stats.slow_threshold)}"
+        )
+        for stat in stats:
+            p = stat.percentiles()
+            embed.add_field(
+                name=truncate(stat.query, 250),
+                value=(
+                    f"**{stat.count:,}** appels - exec p50 {ms(p['exec'][50])} / "
+                    f"p95 {ms(p['exec'][95])} / p99 {ms(p['exec'][99])} / max {ms(stat.max_exec)}\n"
+                    f"attente p50 {ms(p['wait'][50])} / p99 {ms(p['wait'][99])} - "
+                    f"total {ms(stat.total_exec + stat.total_wait)}"
+                ),
+                inline=False
+            )
+        
+        # 25 requetes x 250 caracteres depassent les 6000 d'un embed
+        for page in split_embed(embed):
+            await ctx.send(embed=page)
+    
+    @dbstats.command(name="slow")
+    async def dbstats_slow(self, ctx: commands.Context):
+        """Dernieres slow queries"""
+        if not db.stats.slow_queries:
+            return await ctx.send(embed=info_embed("Aucune slow query 🎉"))
+        
+        embed = create_embed(title="🐢 Slow queries", color=discord.Color.orange())
+        for query, shape, wait, exec_time in list(db.stats.slow_queries)[-10:]:
+            embed.add_field(
+                name=f"{ms(wait + exec_time)} (attente {ms(wait)}, exec {ms(exec_time)})",
+                value=f"`{truncate(query, 800)}`\nparams: `{truncate(shape, 200)}`",
+                inline=False
+            )
+        
+        for page in split_embed(embed):
+            await ctx.send(embed=page)
+    
+    @dbstats.command(name="reset")
+    async def dbstats_reset(self, ctx: commands.Context):
+        """Remet les stats a zero"""
+        db.stats.reset()
+        await ctx.send(embed=success_embed("Stats SQL remises a zero."))
+
+    
+    @commands.group(name="dbmaint", invoke_without_command=True)
+    async def dbmaint(self, ctx: commands.Context):
+        """Etat des fichiers DB: taille, WAL, pages libres, derniere maintenance"""
+        embed = create_embed(
+            title="🧹 Maintenance DB",
+            color=discord.Color.blurple(),
+            footer=f"Tour toutes les {maintenance.interval}s, budget {ms(maintenance.budget)}"
+        )
+        for r in await maintenance.report():
+            state = r["state"]
+            free_pct = r["freelist_count"] / r["page_count"] * 100 if r["page_count"] else 0
+            checkpoint = state.last_checkpoint
+            lines = [
+                f"Taille **{mb(r['size'])}** - WAL **{mb(r['wal_size'])}**",
+                f"{r['page_count']:,} pages de {r['page_size']} o - "
+                f"{r['freelist_count']:,} libres ({free_pct:.1f}%) - auto_vacuum {r['auto_vacuum']}",
+            ]
+            if state.last_run:
+                lines.append(
+                    f"Dernier tour <t:{int(state.last_run)}:R> en {ms(state.last_duration)}"
+                    + (f" - checkpoint {checkpoint[2]}/{checkpoint[1]} pages" if checkpoint else "")
+                )
+                lines.append(f"Pages vacuum: {state.pages_vacuumed:,}"
+                             + (f" - optimize <t:{int(state.last_optimize)}:R>" if state.last_optimize else ""))
+            if state.errors:
+                lines.append(f"⚠️ {state.errors[-1]}")
+            embed.add_field(name=r["name"], value="\n".join(lines), inline=False)
+        
+        await ctx.send(embed=embed)
+    
+    @dbmaint.command(name="run")
+    async def dbmaint_run(self, ctx: commands.Context):
+        """Lance un tour de maintenance maintenant (meme en heure de pointe)"""
+        await maintenance.run(force=True)
+        await ctx.send(embed=success_embed("Tour de maintenance termine."))
+    
+    @dbmaint.command(name="vacuum")
+    async def dbmaint_vacuum(self, ctx: commands.Context):
+        """VACUUM complet + active le vacuum incremental (bloque les ecritures pendant ce temps)"""
+        await ctx.send(embed=info_embed("VACUUM en cours, les ecritures sont en pause..."))
+        for database in maintenance.databases:
+            await maintenance.full_vacuum(database)
+        await ctx.send(embed=success_embed("VACUUM termine, vacuum incremental actif."))
+
+    
+    @commands.command(name="memstats")
+    async def memstats(self, ctx: commands.Context):
+        """Taille des structures en memoire qui expirent (cooldowns, anti-spam)"""
+        stats = tracker_stats()
+        if not stats:
+            return await ctx.send(embed=info_embed("Aucune structure enregistree."))
+        
+        embed = create_embed(title="🧠 Memoire", color=discord.Color.blurple())
+        for s in stats:
+            embed.add_field(
+                name=s["name"],
+                value=(
+                    f"**{s['keys']:,}** cles (~{mb(s['bytes'])}) - "
+                    f"{s['scheduled']:,} dans la roue - {s['expired']:,} expirees"
+                ),
+                inline=False
+            )
+        
+        await ctx.send(embed=embed)
+
+    
+    @commands.group(name="retention", invoke_without_command=True)
+    async def retention_cmd(self, ctx: commands.Context):
+        """Lignes archivees par la retention (total et 24h)"""
+        report = await retention.report()
+        
+        embed = create_embed(
+            title="🗄️ Retention",
+            color=discord.Color.blurple(),
+            footer=f"Passe toutes les {retention.interval}s - archive: {retention.archive.db_path}"
+        )
+        for r in report:
+            embed.add_field(
+                name=r["table_name"],
+                value=(
+                    f"**{r['rows']:,}** lignes (~{mb(r['bytes'])}) - {r['rows_24h']:,} sur 24h\n"
+                    f"Derniere archive <t:{int(r['last_run'])}:R>"
+                ),
+                inline=False
+            )
+        
+        windows = ", ".join(f"{p.table} {p.default_days}j" for p in POLICIES.values())
+        embed.description = f"Fenetres par defaut: {windows}"
+        if not report:
+            embed.description += "\nRien d'archive pour l'instant."
+        
+        await ctx.send(embed=embed)
+    
+    @retention_cmd.command(name="run")
+    async def retention_run(self, ctx: commands.Context):
+        """Lance une passe de retention maintenant"""
+        results = await retention.run()
+        lines = [f"`{table}`: {rows:,} lignes (~{mb(size)})" for table, (rows, size) in results.items() if rows]
+        await ctx.send(embed=success_embed("\n".join(lines) or "Rien a archiver.", "Retention terminee"))
+    
+    @retention_cmd.command(name="set")
+    async def retention_set(self, ctx: commands.Context, table: str, days: str, guild_id: int = None):
+        """Fenetre d'une table pour une guild en jours (default = defaut du bot, 0 = jamais)"""
+        if table not in POLICIES:
+            return await ctx.send(embed=error_embed(f"Tables: {', '.join(POLICIES)}"))
+        
+        if guild_id is None:
+            if ctx.guild is None:
+                return await ctx.send(embed=error_embed("En MP il faut preciser le guild_id."))
+            guild_id = ctx.guild.id
+        
+        value = None
+        if days != "default":
+            value = int(days) if days.lstrip("-").isdigit() else -1
+            if value < 0:
+                return await ctx.send(embed=error_embed("Jours: un nombre >= 0 ou `default`."))
+        
+        await retention.set_window(guild_id, table, value)
+        shown = "defaut" if value is None else "jamais" if value == 0 else f"{value} jours"
+        await ctx.send(embed=success_embed(f"`{table}` pour `{guild_id}`: {shown}"))
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Owner(bot))
@@ -15,6 +15,8 @@ import json
 import os
 
 from utils.database import db
+from utils.repositories.guild_settings import guild_settings_repo
+from utils.repositories.configs import releases_config_repo
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed,
     format_message, is_admin
@@ -51,21 +53,12 @@ class Releases(commands.Cog):
         if self.session:
             await self.session.close()
     
-    async def get_config(self, guild_id: int) -> dict:
-        """Get releases config for guild"""
-        row = await db.fetchone(
-            "SELECT * FROM releases_config WHERE guild_id = ?", (guild_id,)
+    async def mark_announced(self, rows: List[tuple]):
+        """Record announced items (guild_id, category, item_id, announced_at) in one write"""
+        await db.execute_many(
+            "INSERT OR IGNORE INTO announced_releases (guild_id, category, item_id, announced_at) VALUES (?, ?, ?, ?)",
+            rows
         )
-        if row:
-            return dict(row)
-        
-        await db.execute(
-            "INSERT OR IGNORE INTO releases_config (guild_id) VALUES (?)", (guild_id,)
-        )
-        row = await db.fetchone(
-            "SELECT * FROM releases_config WHERE guild_id = ?", (guild_id,)
-        )
-        return dict(row)
     
     @tasks.loop(hours=6)
     async def check_releases(self):
@@ -132,6 +125,7 @@ class Releases(commands.Cog):
                 data = await resp.json()
                 games = data.get("results", [])
                 
+                announced = []
                 for game in games:
                     game_id = str(game.get("id"))
                     cache_key = f"{guild.id}_{game_id}"
@@ -161,13 +155,13 @@ class Releases(commands.Cog):
                         await channel.send(content=role_mention or None, embed=embed)
                         
                         # Mark as announced
-                        await db.execute(
-                            "INSERT INTO announced_releases (guild_id, category, item_id, announced_at) VALUES (?, 'game', ?, ?)",
-                            (guild.id, game_id, time.time())
-                        )
+                        announced.append((guild.id, 'game', game_id, time.time()))
                         self.announced_cache["games"].add(cache_key)
                     except:
                         pass
+                
+                # One batched insert for everything announced above
+                await self.mark_announced(announced)
                         
         except Exception as e:
             print(f"Error checking game releases: {e}")
@@ -247,6 +241,7 @@ class Releases(commands.Cog):
                 data = await resp.json()
                 animes = data.get("data", {}).get("Page", {}).get("media", [])
                 
+                announced = []
                 for anime in animes:
                     # Only announce if new episode is airing soon (within 24h)
                     next_ep = anime.get("nextAiringEpisode")
@@ -283,13 +278,13 @@ class Releases(commands.Cog):
                     try:
                         await channel.send(content=role_mention or None, embed=embed)
                         
-                        await db.execute(
-                            "INSERT INTO announced_releases (guild_id, category, item_id, announced_at) VALUES (?, 'anime', ?, ?)",
-                            (guild.id, f"{anime_id}_ep{episode}", time.time())
-                        )
+                        announced.append((guild.id, 'anime', f"{anime_id}_ep{episode}", time.time()))
                         self.announced_cache["anime"].add(cache_key)
                     except:
                         pass
+                
+                # One batched insert for everything announced above
+                await self.mark_announced(announced)
                         
         except Exception as e:
             print(f"Error checking anime releases: {e}")
@@ -379,6 +374,7 @@ class Releases(commands.Cog):
                 data = await resp.json()
                 series_list = data.get("results", [])[:10]
                 
+                announced = []
                 for series in series_list:
                     series_id = str(series.get("id"))
                     cache_key = f"{guild.id}_{series_id}"
@@ -405,13 +401,13 @@ class Releases(commands.Cog):
                     try:
                         await channel.send(content=role_mention or None, embed=embed)
                         
-                        await db.execute(
-                            "INSERT INTO announced_releases (guild_id, category, item_id, announced_at) VALUES (?, 'series', ?, ?)",
-                            (guild.id, series_id, time.time())
-                        )
+                        announced.append((guild.id, 'series', series_id, time.time()))
                         self.announced_cache["series"].add(cache_key)
                     except:
                         pass
+                
+                # One batched insert for everything announced above
+                await self.mark_announced(announced)
                         
         except Exception as e:
             print(f"Error checking series releases: {e}")
@@ -441,6 +437,7 @@ class Releases(commands.Cog):
                 data = await resp.json()
                 films = data.get("results", [])[:10]
                 
+                announced = []
                 for film in films:
                     film_id = str(film.get("id"))
                     cache_key = f"{guild.id}_{film_id}"
@@ -467,13 +464,13 @@ class Releases(commands.Cog):
                     try:
                         await channel.send(content=role_mention or None, embed=embed)
                         
-                        await db.execute(
-                            "INSERT INTO announced_releases (guild_id, category, item_id, announced_at) VALUES (?, 'film', ?, ?)",
-                            (guild.id, film_id, time.time())
-                        )
+                        announced.append((guild.id, 'film', film_id, time.time()))
                         self.announced_cache["films"].add(cache_key)
                     except:
                         pass
+                
+                # One batched insert for everything announced above
+                await self.mark_announced(announced)
                         
         except Exception as e:
             print(f"Error checking film releases: {e}")
@@ -532,11 +529,8 @@ class Releases(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def releases(self, ctx: commands.Context):
         """Configure les annonces de sorties"""
-        config = await self.get_config(ctx.guild.id)
-        settings = await db.fetchone(
-            "SELECT releases_enabled FROM guild_settings WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        config = await releases_config_repo.get_config(ctx.guild.id)
+        enabled = await guild_settings_repo.is_enabled(ctx.guild.id, "releases")
         
         games_channel = ctx.guild.get_channel(config.get("games_channel_id"))
         anime_channel = ctx.guild.get_channel(config.get("anime_channel_id"))
@@ -547,7 +541,7 @@ class Releases(commands.Cog):
             title="🎬 Configuration des sorties",
             color=discord.Color.blue(),
             fields=[
-                ("État", "✅ Activé" if settings and settings["releases_enabled"] else "❌ Désactivé", True),
+                ("État", "✅ Activé" if enabled else "❌ Désactivé", True),
                 ("🎮 Jeux", games_channel.mention if games_channel else "Non configuré", True),
                 ("📺 Anime", anime_channel.mention if anime_channel else "Non configuré", True),
                 ("📺 Séries", series_channel.mention if series_channel else "Non configuré", True),
@@ -574,31 +568,21 @@ class Releases(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def releases_enable(self, ctx: commands.Context):
         """Active les annonces de sorties"""
-        await db.execute(
-            "UPDATE guild_settings SET releases_enabled = 1 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "releases", True)
         await ctx.send(embed=success_embed("Annonces de sorties activées !"))
     
     @releases.command(name="disable")
     @commands.has_permissions(administrator=True)
     async def releases_disable(self, ctx: commands.Context):
         """Désactive les annonces de sorties"""
-        await db.execute(
-            "UPDATE guild_settings SET releases_enabled = 0 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "releases", False)
         await ctx.send(embed=success_embed("Annonces de sorties désactivées !"))
     
     @releases.command(name="games", aliases=["jeux"])
     @commands.has_permissions(administrator=True)
     async def releases_games(self, ctx: commands.Context, channel: discord.TextChannel, role: discord.Role = None):
         """Configure le salon des sorties de jeux"""
-        await self.get_config(ctx.guild.id)
-        await db.execute(
-            "UPDATE releases_config SET games_channel_id = ?, games_role_id = ? WHERE guild_id = ?",
-            (channel.id, role.id if role else None, ctx.guild.id)
-        )
+        await releases_config_repo.update_config(ctx.guild.id, games_channel_id=channel.id, games_role_id=role.id if role else None)
         
         msg = f"Salon des sorties jeux: {channel.mention}"
         if role:
@@ -609,10 +593,7 @@ class Releases(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def releases_anime(self, ctx: commands.Context, channel: discord.TextChannel, role: discord.Role = None):
         """Configure le salon des sorties anime"""
-        await db.execute(
-            "UPDATE releases_config SET anime_channel_id = ?, anime_role_id = ? WHERE guild_id = ?",
-            (channel.id, role.id if role else None, ctx.guild.id)
-        )
+        await releases_config_repo.update_config(ctx.guild.id, anime_channel_id=channel.id, anime_role_id=role.id if role else None)
         
         msg = f"Salon des sorties anime: {channel.mention}"
         if role:
@@ -623,10 +604,7 @@ class Releases(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def releases_series(self, ctx: commands.Context, channel: discord.TextChannel, role: discord.Role = None):
         """Configure le salon des sorties séries"""
-        await db.execute(
-            "UPDATE releases_config SET series_channel_id = ?, series_role_id = ? WHERE guild_id = ?",
-            (channel.id, role.id if role else None, ctx.guild.id)
-        )
+        await releases_config_repo.update_config(ctx.guild.id, series_channel_id=channel.id, series_role_id=role.id if role else None)
         
         msg = f"Salon des sorties séries: {channel.mention}"
         if role:
@@ -637,10 +615,7 @@ class Releases(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def releases_films(self, ctx: commands.Context, channel: discord.TextChannel, role: discord.Role = None):
         """Configure le salon des sorties films"""
-        await db.execute(
-            "UPDATE releases_config SET films_channel_id = ?, films_role_id = ? WHERE guild_id = ?",
-            (channel.id, role.id if role else None, ctx.guild.id)
-        )
+        await releases_config_repo.update_config(ctx.guild.id, films_channel_id=channel.id, films_role_id=role.id if role else None)
         
         msg = f"Salon des sorties films: {channel.mention}"
         if role:
@@ -653,7 +628,7 @@ class Releases(commands.Cog):
         """Force une vérification des sorties"""
         await ctx.send(embed=info_embed("Vérification en cours..."))
         
-        config = await self.get_config(ctx.guild.id)
+        config = await releases_config_repo.get_config(ctx.guild.id)
         
         if config.get("games_channel_id"):
             await self.check_game_releases(ctx.guild, config)
@@ -9,6 +9,8 @@ import time
 from typing import Optional
 
 from utils.database import db
+from utils.repositories.guild_settings import guild_settings_repo
+from utils.repositories.configs import starboard_config_repo
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed,
     is_admin
@@ -22,22 +24,6 @@ class Starboard(commands.Cog):
         self.bot = bot
         self.star_emoji = "⭐"
     
-    async def get_config(self, guild_id: int) -> dict:
-        """Get starboard config"""
-        row = await db.fetchone(
-            "SELECT * FROM starboard_config WHERE guild_id = ?", (guild_id,)
-        )
-        if row:
-            return dict(row)
-        
-        await db.execute(
-            "INSERT OR IGNORE INTO starboard_config (guild_id) VALUES (?)", (guild_id,)
-        )
-        row = await db.fetchone(
-            "SELECT * FROM starboard_config WHERE guild_id = ?", (guild_id,)
-        )
-        return dict(row)
-    
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         """Handle reaction add for starboard"""
@@ -45,14 +31,10 @@ class Starboard(commands.Cog):
             return
         
         # Check if starboard is enabled
-        settings = await db.fetchone(
-            "SELECT starboard_enabled FROM guild_settings WHERE guild_id = ?",
-            (payload.guild_id,)
-        )
-        if not settings or not settings["starboard_enabled"]:
+        if not await guild_settings_repo.is_enabled(payload.guild_id, "starboard"):
             return
         
-        config = await self.get_config(payload.guild_id)
+        config = await starboard_config_repo.get_config(payload.guild_id)
         
         # Check emoji
         emoji = str(payload.emoji)
@@ -123,14 +105,10 @@ class Starboard(commands.Cog):
         if not payload.guild_id:
             return
         
-        settings = await db.fetchone(
-            "SELECT starboard_enabled FROM guild_settings WHERE guild_id = ?",
-            (payload.guild_id,)
-        )
-        if not settings or not settings["starboard_enabled"]:
+        if not await guild_settings_repo.is_enabled(payload.guild_id, "starboard"):
             return
         
-        config = await self.get_config(payload.guild_id)
+        config = await starboard_config_repo.get_config(payload.guild_id)
         
         emoji = str(payload.emoji)
         required_emoji = config.get("emoji") or self.star_emoji
@@ -309,11 +287,8 @@ class Starboard(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def starboard(self, ctx: commands.Context):
         """Configure le starboard"""
-        config = await self.get_config(ctx.guild.id)
-        settings = await db.fetchone(
-            "SELECT starboard_enabled FROM guild_settings WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        config = await starboard_config_repo.get_config(ctx.guild.id)
+        enabled = await guild_settings_repo.is_enabled(ctx.guild.id, "starboard")
         
         channel = ctx.guild.get_channel(config.get("channel_id"))
         emoji = config.get("emoji") or self.star_emoji
@@ -328,7 +303,7 @@ class Starboard(commands.Cog):
             title="⭐ Configuration du Starboard",
             color=discord.Color.gold(),
             fields=[
-                ("État", "✅ Activé" if settings and settings["starboard_enabled"] else "❌ Désactivé", True),
+                ("État", "✅ Activé" if enabled else "❌ Désactivé", True),
                 ("Salon", channel.mention if channel else "Non configuré", True),
                 ("Emoji", emoji, True),
                 ("Seuil", str(config.get("threshold") or 3) + " réactions", True),
@@ -360,31 +335,21 @@ class Starboard(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def starboard_enable(self, ctx: commands.Context):
         """Active le starboard"""
-        await db.execute(
-            "UPDATE guild_settings SET starboard_enabled = 1 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "starboard", True)
         await ctx.send(embed=success_embed("Starboard activé !"))
     
     @starboard.command(name="disable")
     @commands.has_permissions(administrator=True)
     async def starboard_disable(self, ctx: commands.Context):
         """Désactive le starboard"""
-        await db.execute(
-            "UPDATE guild_settings SET starboard_enabled = 0 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "starboard", False)
         await ctx.send(embed=success_embed("Starboard désactivé !"))
     
     @starboard.command(name="channel")
     @commands.has_permissions(administrator=True)
     async def starboard_channel(self, ctx: commands.Context, channel: discord.TextChannel):
         """Définit le salon du starboard"""
-        await self.get_config(ctx.guild.id)  # Ensure config exists
-        await db.execute(
-            "UPDATE starboard_config SET channel_id = ? WHERE guild_id = ?",
-            (channel.id, ctx.guild.id)
-        )
+        await starboard_config_repo.update_config(ctx.guild.id, channel_id=channel.id)
         await ctx.send(embed=success_embed(f"Salon starboard: {channel.mention}"))
     
     @starboard.command(name="threshold")
@@ -394,10 +359,7 @@ class Starboard(commands.Cog):
         if threshold < 1 or threshold > 100:
             return await ctx.send(embed=error_embed("Le seuil doit être entre 1 et 100 !"))
         
-        await db.execute(
-            "UPDATE starboard_config SET threshold = ? WHERE guild_id = ?",
-            (threshold, ctx.guild.id)
-        )
+        await starboard_config_repo.update_config(ctx.guild.id, threshold=threshold)
         await ctx.send(embed=success_embed(f"Seuil défini à {threshold} réactions !"))
     
     @starboard.command(name="emoji")
@@ -411,10 +373,7 @@ class Starboard(commands.Cog):
         except:
             return await ctx.send(embed=error_embed("Emoji invalide !"))
         
-        await db.execute(
-            "UPDATE starboard_config SET emoji = ? WHERE guild_id = ?",
-            (emoji, ctx.guild.id)
-        )
+        await starboard_config_repo.update_config(ctx.guild.id, emoji=emoji)
         await ctx.send(embed=success_embed(f"Emoji changé en {emoji} !"))
     
     @starboard.command(name="selfstar")
@@ -428,10 +387,7 @@ class Starboard(commands.Cog):
         else:
             return await ctx.send(embed=error_embed("Utilise `on` ou `off` !"))
         
-        await db.execute(
-            "UPDATE starboard_config SET self_star = ? WHERE guild_id = ?",
-            (value, ctx.guild.id)
-        )
+        await starboard_config_repo.update_config(ctx.guild.id, self_star=value)
         
         status = "activé" if value else "désactivé"
         await ctx.send(embed=success_embed(f"Self-star {status} !"))
@@ -447,10 +403,7 @@ class Starboard(commands.Cog):
         else:
             return await ctx.send(embed=error_embed("Utilise `on` ou `off` !"))
         
-        await db.execute(
-            "UPDATE starboard_config SET ignore_bots = ? WHERE guild_id = ?",
-            (value, ctx.guild.id)
-        )
+        await starboard_config_repo.update_config(ctx.guild.id, ignore_bots=value)
         
         status = "ignorés" if value else "inclus"
         await ctx.send(embed=success_embed(f"Messages de bots {status} !"))
@@ -459,7 +412,7 @@ class Starboard(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def starboard_ignore(self, ctx: commands.Context, channel: discord.TextChannel):
         """Ignore/réactive un salon pour le starboard"""
-        config = await self.get_config(ctx.guild.id)
+        config = await starboard_config_repo.get_config(ctx.guild.id)
         
         ignored = config.get("ignored_channels") or ""
         ignored_list = [c for c in ignored.split(",") if c]
@@ -473,10 +426,7 @@ class Starboard(commands.Cog):
             ignored_list.append(channel_str)
             await ctx.send(embed=success_embed(f"{channel.mention} est maintenant ignoré !"))
         
-        await db.execute(
-            "UPDATE starboard_config SET ignored_channels = ? WHERE guild_id = ?",
-            (",".join(ignored_list), ctx.guild.id)
-        )
+        await starboard_config_repo.update_config(ctx.guild.id, ignored_channels=",".join(ignored_list))
     
     @starboard.command(name="random")
     async def starboard_random(self, ctx: commands.Context):
@@ -497,7 +447,7 @@ class Starboard(commands.Cog):
         
         try:
             message = await channel.fetch_message(starred["original_message_id"])
-            config = await self.get_config(ctx.guild.id)
+            config = await starboard_config_repo.get_config(ctx.guild.id)
             emoji = config.get("emoji") or self.star_emoji
             
             embed = self.create_starboard_embed(message, starred["star_count"], emoji)
@@ -10,6 +10,8 @@ from io import BytesIO
 from typing import Optional
 
 from utils.database import db
+from utils.repositories.guild_settings import guild_settings_repo
+from utils.repositories.configs import tickets_config_repo
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed,
     format_message, format_datetime, ConfirmView, is_admin
@@ -77,25 +79,9 @@ class Tickets(commands.Cog):
         self.bot.add_view(TicketButton())
         self.bot.add_view(TicketControls())
     
-    async def get_config(self, guild_id: int) -> dict:
-        """Get ticket config"""
-        row = await db.fetchone(
-            "SELECT * FROM ticket_config WHERE guild_id = ?", (guild_id,)
-        )
-        if row:
-            return dict(row)
-        
-        await db.execute(
-            "INSERT OR IGNORE INTO ticket_config (guild_id) VALUES (?)", (guild_id,)
-        )
-        row = await db.fetchone(
-            "SELECT * FROM ticket_config WHERE guild_id = ?", (guild_id,)
-        )
-        return dict(row)
-    
     async def create_ticket(self, interaction: discord.Interaction):
         """Create a new ticket"""
-        config = await self.get_config(interaction.guild.id)
+        config = await tickets_config_repo.get_config(interaction.guild.id)
         
         # Check if user already has a ticket
         existing = await db.fetchone(
@@ -231,7 +217,7 @@ class Tickets(commands.Cog):
     
     async def claim_ticket_handler(self, interaction: discord.Interaction):
         """Handle ticket claim button"""
-        config = await self.get_config(interaction.guild.id)
+        config = await tickets_config_repo.get_config(interaction.guild.id)
         
         # Check if user is support
         if config.get("support_role_id"):
@@ -258,7 +244,7 @@ class Tickets(commands.Cog):
         ticket: dict
     ):
         """Close a ticket and save transcript"""
-        config = await self.get_config(channel.guild.id)
+        config = await tickets_config_repo.get_config(channel.guild.id)
         
         # Update database
         await db.execute(
@@ -318,11 +304,8 @@ class Tickets(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def ticket(self, ctx: commands.Context):
         """Configure le système de tickets"""
-        config = await self.get_config(ctx.guild.id)
-        settings = await db.fetchone(
-            "SELECT tickets_enabled FROM guild_settings WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        config = await tickets_config_repo.get_config(ctx.guild.id)
+        enabled = await guild_settings_repo.is_enabled(ctx.guild.id, "tickets")
         
         category = ctx.guild.get_channel(config.get("category_id"))
         log_channel = ctx.guild.get_channel(config.get("log_channel_id"))
@@ -337,7 +320,7 @@ class Tickets(commands.Cog):
             title="🎫 Configuration des tickets",
             color=discord.Color.blue(),
             fields=[
-                ("État", "✅ Activé" if settings and settings["tickets_enabled"] else "❌ Désactivé", True),
+                ("État", "✅ Activé" if enabled else "❌ Désactivé", True),
                 ("Tickets ouverts", str(open_tickets["count"]) if open_tickets else "0", True),
                 ("Catégorie", category.name if category else "Non configurée", True),
                 ("Salon de logs", log_channel.mention if log_channel else "Non configuré", True),
@@ -366,20 +349,14 @@ class Tickets(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def ticket_enable(self, ctx: commands.Context):
         """Active le système de tickets"""
-        await db.execute(
-            "UPDATE guild_settings SET tickets_enabled = 1 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "tickets", True)
         await ctx.send(embed=success_embed("Système de tickets activé !"))
     
     @ticket.command(name="disable")
     @commands.has_permissions(administrator=True)
     async def ticket_disable(self, ctx: commands.Context):
         """Désactive le système de tickets"""
-        await db.execute(
-            "UPDATE guild_settings SET tickets_enabled = 0 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "tickets", False)
         await ctx.send(embed=success_embed("Système de tickets désactivé !"))
     
     @ticket.command(name="setup")
@@ -402,40 +379,28 @@ class Tickets(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def ticket_category(self, ctx: commands.Context, category: discord.CategoryChannel):
         """Définit la catégorie des tickets"""
-        await db.execute(
-            "UPDATE ticket_config SET category_id = ? WHERE guild_id = ?",
-            (category.id, ctx.guild.id)
-        )
+        await tickets_config_repo.update_config(ctx.guild.id, category_id=category.id)
         await ctx.send(embed=success_embed(f"Catégorie définie: **{category.name}**"))
     
     @ticket.command(name="log")
     @commands.has_permissions(administrator=True)
     async def ticket_log(self, ctx: commands.Context, channel: discord.TextChannel):
         """Définit le salon des transcripts"""
-        await db.execute(
-            "UPDATE ticket_config SET log_channel_id = ? WHERE guild_id = ?",
-            (channel.id, ctx.guild.id)
-        )
+        await tickets_config_repo.update_config(ctx.guild.id, log_channel_id=channel.id)
         await ctx.send(embed=success_embed(f"Salon de logs: {channel.mention}"))
     
     @ticket.command(name="role")
     @commands.has_permissions(administrator=True)
     async def ticket_role(self, ctx: commands.Context, role: discord.Role):
         """Définit le rôle support"""
-        await db.execute(
-            "UPDATE ticket_config SET support_role_id = ? WHERE guild_id = ?",
-            (role.id, ctx.guild.id)
-        )
+        await tickets_config_repo.update_config(ctx.guild.id, support_role_id=role.id)
         await ctx.send(embed=success_embed(f"Rôle support: {role.mention}"))
     
     @ticket.command(name="message")
     @commands.has_permissions(administrator=True)
     async def ticket_message(self, ctx: commands.Context, *, message: str):
         """Définit le message d'accueil"""
-        await db.execute(
-            "UPDATE ticket_config SET ticket_message = ? WHERE guild_id = ?",
-            (message, ctx.guild.id)
-        )
+        await tickets_config_repo.update_config(ctx.guild.id, ticket_message=message)
         await ctx.send(embed=success_embed("Message d'accueil défini !"))
     
     @ticket.command(name="close")
@@ -449,7 +414,7 @@ class Tickets(commands.Cog):
         if not ticket:
             return await ctx.send(embed=error_embed("Ce n'est pas un ticket !"))
         
-        config = await self.get_config(ctx.guild.id)
+        config = await tickets_config_repo.get_config(ctx.guild.id)
         
         # Check permission
         if ctx.author.id != ticket["user_id"]:
@@ -9,6 +9,8 @@ import json
 from typing import Optional
 
 from utils.database import db
+from utils.repositories.guild_settings import guild_settings_repo
+from utils.repositories.configs import welcome_config_repo
 from utils.helpers import (
     create_embed, success_embed, error_embed, info_embed,
     format_message, is_admin
@@ -21,21 +23,6 @@ class Welcome(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
     
-    async def get_config(self, guild_id: int) -> dict:
-        row = await db.fetchone(
-            "SELECT * FROM welcome_config WHERE guild_id = ?", (guild_id,)
-        )
-        if row:
-            return dict(row)
-        
-        await db.execute(
-            "INSERT OR IGNORE INTO welcome_config (guild_id) VALUES (?)", (guild_id,)
-        )
-        row = await db.fetchone(
-            "SELECT * FROM welcome_config WHERE guild_id = ?", (guild_id,)
-        )
-        return dict(row)
-    
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """Handle member join"""
@@ -43,14 +30,10 @@ class Welcome(commands.Cog):
             return
         
         # Check if welcome is enabled
-        settings = await db.fetchone(
-            "SELECT welcome_enabled FROM guild_settings WHERE guild_id = ?",
-            (member.guild.id,)
-        )
-        if not settings or not settings["welcome_enabled"]:
+        if not await guild_settings_repo.is_enabled(member.guild.id, "welcome"):
             return
         
-        config = await self.get_config(member.guild.id)
+        config = await welcome_config_repo.get_config(member.guild.id)
         
         # Send welcome message
         channel_id = config.get("welcome_channel_id")
@@ -123,14 +106,10 @@ class Welcome(commands.Cog):
         if member.bot:
             return
         
-        settings = await db.fetchone(
-            "SELECT welcome_enabled FROM guild_settings WHERE guild_id = ?",
-            (member.guild.id,)
-        )
-        if not settings or not settings["welcome_enabled"]:
+        if not await guild_settings_repo.is_enabled(member.guild.id, "welcome"):
             return
         
-        config = await self.get_config(member.guild.id)
+        config = await welcome_config_repo.get_config(member.guild.id)
         
         channel_id = config.get("goodbye_channel_id")
         if channel_id:
@@ -170,11 +149,8 @@ class Welcome(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def welcome(self, ctx: commands.Context):
         """Configure le système de bienvenue"""
-        config = await self.get_config(ctx.guild.id)
-        settings = await db.fetchone(
-            "SELECT welcome_enabled FROM guild_settings WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        config = await welcome_config_repo.get_config(ctx.guild.id)
+        enabled = await guild_settings_repo.is_enabled(ctx.guild.id, "welcome")
         
         welcome_channel = ctx.guild.get_channel(config.get("welcome_channel_id"))
         goodbye_channel = ctx.guild.get_channel(config.get("goodbye_channel_id"))
@@ -192,7 +168,7 @@ class Welcome(commands.Cog):
             title="👋 Configuration de bienvenue",
             color=discord.Color.green(),
             fields=[
-                ("État", "✅ Activé" if settings and settings["welcome_enabled"] else "❌ Désactivé", True),
+                ("État", "✅ Activé" if enabled else "❌ Désactivé", True),
                 ("Salon bienvenue", welcome_channel.mention if welcome_channel else "Non configuré", True),
                 ("Salon départ", goodbye_channel.mention if goodbye_channel else "Non configuré", True),
                 ("Message bienvenue", f"```{config.get('welcome_message', 'Non défini')[:100]}```", False),
@@ -224,40 +200,28 @@ class Welcome(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def welcome_enable(self, ctx: commands.Context):
         """Active le système de bienvenue"""
-        await db.execute(
-            "UPDATE guild_settings SET welcome_enabled = 1 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "welcome", True)
         await ctx.send(embed=success_embed("Système de bienvenue activé !"))
     
     @welcome.command(name="disable")
     @commands.has_permissions(administrator=True)
     async def welcome_disable(self, ctx: commands.Context):
         """Désactive le système de bienvenue"""
-        await db.execute(
-            "UPDATE guild_settings SET welcome_enabled = 0 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await guild_settings_repo.set_enabled(ctx.guild.id, "welcome", False)
         await ctx.send(embed=success_embed("Système de bienvenue désactivé !"))
     
     @welcome.command(name="channel")
     @commands.has_permissions(administrator=True)
     async def welcome_channel(self, ctx: commands.Context, channel: discord.TextChannel):
         """Définit le salon de bienvenue"""
-        await db.execute(
-            "UPDATE welcome_config SET welcome_channel_id = ? WHERE guild_id = ?",
-            (channel.id, ctx.guild.id)
-        )
+        await welcome_config_repo.update_config(ctx.guild.id, welcome_channel_id=channel.id)
         await ctx.send(embed=success_embed(f"Salon de bienvenue: {channel.mention}"))
     
     @welcome.command(name="message")
     @commands.has_permissions(administrator=True)
     async def welcome_message(self, ctx: commands.Context, *, message: str):
         """Définit le message de bienvenue"""
-        await db.execute(
-            "UPDATE welcome_config SET welcome_message = ? WHERE guild_id = ?",
-            (message, ctx.guild.id)
-        )
+        await welcome_config_repo.update_config(ctx.guild.id, welcome_message=message)
         
         preview = format_message(message, user=ctx.author.mention, server=ctx.guild.name, guild=ctx.guild)
         await ctx.send(embed=success_embed(
@@ -268,10 +232,7 @@ class Welcome(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def welcome_image(self, ctx: commands.Context, url: str = None):
         """Définit l'image de bienvenue"""
-        await db.execute(
-            "UPDATE welcome_config SET welcome_image_url = ? WHERE guild_id = ?",
-            (url, ctx.guild.id)
-        )
+        await welcome_config_repo.update_config(ctx.guild.id, welcome_image_url=url)
         
         if url:
             await ctx.send(embed=success_embed("Image de bienvenue définie !"))
@@ -288,20 +249,14 @@ class Welcome(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def goodbye_channel(self, ctx: commands.Context, channel: discord.TextChannel):
         """Définit le salon de départ"""
-        await db.execute(
-            "UPDATE welcome_config SET goodbye_channel_id = ? WHERE guild_id = ?",
-            (channel.id, ctx.guild.id)
-        )
+        await welcome_config_repo.update_config(ctx.guild.id, goodbye_channel_id=channel.id)
         await ctx.send(embed=success_embed(f"Salon de départ: {channel.mention}"))
     
     @goodbye.command(name="message")
     @commands.has_permissions(administrator=True)
     async def goodbye_message(self, ctx: commands.Context, *, message: str):
         """Définit le message de départ"""
-        await db.execute(
-            "UPDATE welcome_config SET goodbye_message = ? WHERE guild_id = ?",
-            (message, ctx.guild.id)
-        )
+        await welcome_config_repo.update_config(ctx.guild.id, goodbye_message=message)
         
         preview = format_message(message, user=ctx.author.name, server=ctx.guild.name, guild=ctx.guild)
         await ctx.send(embed=success_embed(
@@ -359,7 +314,7 @@ class Welcome(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def dm(self, ctx: commands.Context):
         """Configure les DM de bienvenue"""
-        config = await self.get_config(ctx.guild.id)
+        config = await welcome_config_repo.get_config(ctx.guild.id)
         
         embed = create_embed(
             title="📬 DM de bienvenue",
@@ -374,30 +329,21 @@ class Welcome(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def dm_enable(self, ctx: commands.Context):
         """Active les DM de bienvenue"""
-        await db.execute(
-            "UPDATE welcome_config SET dm_enabled = 1 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await welcome_config_repo.update_config(ctx.guild.id, dm_enabled=1)
         await ctx.send(embed=success_embed("DM de bienvenue activés !"))
     
     @dm.command(name="disable")
     @commands.has_permissions(administrator=True)
     async def dm_disable(self, ctx: commands.Context):
         """Désactive les DM de bienvenue"""
-        await db.execute(
-            "UPDATE welcome_config SET dm_enabled = 0 WHERE guild_id = ?",
-            (ctx.guild.id,)
-        )
+        await welcome_config_repo.update_config(ctx.guild.id, dm_enabled=0)
         await ctx.send(embed=success_embed("DM de bienvenue désactivés !"))
     
     @dm.command(name="message")
     @commands.has_permissions(administrator=True)
     async def dm_message_cmd(self, ctx: commands.Context, *, message: str):
         """Définit le message DM"""
-        await db.execute(
-            "UPDATE welcome_config SET dm_message = ? WHERE guild_id = ?",
-            (message, ctx.guild.id)
-        )
+        await welcome_config_repo.update_config(ctx.guild.id, dm_message=message)
         await ctx.send(embed=success_embed("Message DM défini !"))
     
     @welcome.command(name="test")
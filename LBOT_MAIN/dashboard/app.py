@@ -68,6 +68,9 @@ DISCORD_REDIRECT_URI = os.getenv("DISCORD_REDIRECT_URI", "http://localhost:5000/
 DISCORD_API = "https://discord.com/api/v10"
 DATABASE_PATH = os.getenv("DATABASE_PATH", str(Path(__file__).parent.parent / "data" / "bot.db"))
 BOT_TOKEN = os.getenv("DISCORD_TOKEN", "")
+# meme sharding que le bot (utils/sharding.py), sinon les stats par membre sont vides
+DB_SHARDS = int(os.getenv("DB_SHARDS", "0"))
+DB_SHARD_DIR = os.getenv("DB_SHARD_DIR", "")
 
 # l'url oauth - attention:
 # - le redirect_uri doit etre encode (quote) sinon discord fait n'importe quoi
@@ -106,8 +109,8 @@ def handle_rate_limit(e):
 
 # ============ DB ============
 
-def get_db():
-    db = sqlite3.connect(DATABASE_PATH)
+def get_db(path=None):
+    db = sqlite3.connect(path or DATABASE_PATH)
     db.row_factory = sqlite3.Row
     db.execute("PRAGMA foreign_keys = ON")
     db.execute("PRAGMA journal_mode = WAL")
@@ -115,8 +118,17 @@ def get_db():
     return db
 
 
-def db_fetchone(query, params=()):
-    db = get_db()
+def guild_db_path(guild_id):
+    """fichier qui contient les tables par membre d'une guild (xp, eco, cases...)"""
+    if DB_SHARDS <= 0:
+        return DATABASE_PATH
+    central = Path(DATABASE_PATH)
+    folder = Path(DB_SHARD_DIR) if DB_SHARD_DIR else central.parent
+    return str(folder / f"{central.stem}.shard{int(guild_id) % DB_SHARDS}{central.suffix}")
+
+
+def db_fetchone(query, params=(), path=None):
+    db = get_db(path)
     try:
         row = db.execute(query, params).fetchone()
         return dict(row) if row else None
@@ -409,8 +421,8 @@ def dashboard(guild_id):
     
     # stats
     stats = {
-        "members_tracked": (db_fetchone("SELECT COUNT(*) as c FROM user_levels WHERE guild_id = ?", (guild_id,)) or {"c": 0}),
-        "mod_cases": (db_fetchone("SELECT COUNT(*) as c FROM mod_cases WHERE guild_id = ?", (guild_id,)) or {"c": 0}),
+        "members_tracked": (db_fetchone("SELECT COUNT(*) as c FROM user_levels WHERE guild_id = ?", (guild_id,), guild_db_path(guild_id)) or {"c": 0}),
+        "mod_cases": (db_fetchone("SELECT COUNT(*) as c FROM mod_cases WHERE guild_id = ?", (guild_id,), guild_db_path(guild_id)) or {"c": 0}),
         "giveaways_active": (db_fetchone("SELECT COUNT(*) as c FROM giveaways WHERE guild_id = ? AND ended = 0", (guild_id,)) or {"c": 0}),
         "tickets_open": (db_fetchone("SELECT COUNT(*) as c FROM tickets WHERE guild_id = ? AND status = 'open'", (guild_id,)) or {"c": 0}),
     }
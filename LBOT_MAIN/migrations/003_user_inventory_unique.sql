@@ -0,0 +1,21 @@
+-- Migration 003: Index unique sur l'inventaire
+-- buy_item fait un upsert ON CONFLICT(guild_id, user_id, item_id)
+-- qui a besoin d'une contrainte unique sur ces colonnes
+
+-- fusionne les doublons eventuels avant de poser l'index
+UPDATE user_inventory SET quantity = (
+    SELECT SUM(u2.quantity) FROM user_inventory u2
+    WHERE u2.guild_id = user_inventory.guild_id
+      AND u2.user_id = user_inventory.user_id
+      AND u2.item_id = user_inventory.item_id
+)
+WHERE id IN (
+    SELECT MIN(id) FROM user_inventory GROUP BY guild_id, user_id, item_id
+);
+
+DELETE FROM user_inventory WHERE id NOT IN (
+    SELECT MIN(id) FROM user_inventory GROUP BY guild_id, user_id, item_id
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_inventory_item
+    ON user_inventory(guild_id, user_id, item_id);
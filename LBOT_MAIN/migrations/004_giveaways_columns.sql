@@ -0,0 +1,20 @@
+-- Migration 004: colonnes giveaways utilisees par le cog
+-- le CREATE TABLE d'origine avait winners_count/ends_at alors que le cog
+-- lit/ecrit winner_count/end_time/created_at/required_level, et les entries
+-- avaient pas entered_at/won -> les giveaways marchaient pas sur une db neuve
+-- ended_at sert a la retention (entries archivees X jours apres la fin)
+
+ALTER TABLE giveaways ADD COLUMN winner_count INTEGER DEFAULT 1;
+ALTER TABLE giveaways ADD COLUMN end_time REAL;
+ALTER TABLE giveaways ADD COLUMN created_at REAL;
+ALTER TABLE giveaways ADD COLUMN required_level INTEGER DEFAULT 0;
+ALTER TABLE giveaways ADD COLUMN ended_at REAL;
+
+-- reprend les valeurs des anciennes colonnes
+UPDATE giveaways SET winner_count = COALESCE(winners_count, 1), end_time = ends_at;
+UPDATE giveaways SET ended_at = end_time WHERE ended = 1;
+
+ALTER TABLE giveaway_entries ADD COLUMN entered_at REAL;
+ALTER TABLE giveaway_entries ADD COLUMN won INTEGER DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_giveaways_pending ON giveaways(ended, end_time);
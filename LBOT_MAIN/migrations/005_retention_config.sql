@@ -0,0 +1,18 @@
+-- Migration 005: fenetres de retention par guild (utils/retention.py)
+-- une colonne par table, en jours: NULL = defaut du bot, 0 = jamais archiver
+
+CREATE TABLE IF NOT EXISTS retention_config (
+    guild_id INTEGER PRIMARY KEY,
+    announced_releases_days INTEGER,
+    announced_deals_days INTEGER,
+    mod_cases_days INTEGER,
+    giveaway_entries_days INTEGER,
+    tickets_days INTEGER,
+    temp_punishments_days INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_tickets_closed ON tickets(status, closed_at);
+CREATE INDEX IF NOT EXISTS idx_mod_cases_created_at ON mod_cases(created_at);
+CREATE INDEX IF NOT EXISTS idx_announced_releases_at ON announced_releases(announced_at);
+CREATE INDEX IF NOT EXISTS idx_announced_deals_at ON announced_deals(announced_at);
+CREATE INDEX IF NOT EXISTS idx_giveaways_ended ON giveaways(ended, ended_at);
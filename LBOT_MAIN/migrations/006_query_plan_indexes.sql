@@ -0,0 +1,28 @@
+-- Migration 006: index manquants trouves par utils/query_plans.py
+-- chaque index correspond a une requete qui faisait un SCAN de la table
+-- ou un tri dans un B-tree temporaire
+
+-- leaderboard eco: index sur l'expression exacte du ORDER BY
+CREATE INDEX IF NOT EXISTS idx_user_economy_networth
+    ON user_economy(guild_id, (balance + bank) DESC);
+
+-- leaderboard invites (ORDER BY total)
+CREATE INDEX IF NOT EXISTS idx_user_invites_total
+    ON user_invites(guild_id, (regular - leaves - fake + bonus) DESC);
+
+-- liste des invites d'un membre, les plus recents d'abord
+CREATE INDEX IF NOT EXISTS idx_invited_users_joined
+    ON invited_users(guild_id, inviter_id, joined_at DESC);
+
+-- anniversaires du jour
+CREATE INDEX IF NOT EXISTS idx_user_birthdays_date
+    ON user_birthdays(guild_id, month, day);
+
+-- stats de moderation (GROUP BY action)
+CREATE INDEX IF NOT EXISTS idx_mod_cases_action
+    ON mod_cases(guild_id, action);
+
+CREATE INDEX IF NOT EXISTS idx_auto_messages_guild ON auto_messages(guild_id);
+CREATE INDEX IF NOT EXISTS idx_starboard_messages_guild ON starboard_messages(guild_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_guild ON tickets(guild_id);
+CREATE INDEX IF NOT EXISTS idx_shop_items_price ON shop_items(guild_id, price);
@@ -0,0 +1,8 @@
+-- Migration 007: colonnes utilisees par les cogs mais absentes du schema
+-- trouvees par utils/query_plans.py (les requetes plantaient a l'execution)
+
+ALTER TABLE user_birthdays ADD COLUMN updated_at REAL;
+ALTER TABLE birthday_config ADD COLUMN announce_hour INTEGER DEFAULT 9;
+ALTER TABLE starboard_config ADD COLUMN ignore_bots INTEGER DEFAULT 0;
+ALTER TABLE starboard_config ADD COLUMN ignored_channels TEXT;
+ALTER TABLE starboard_messages ADD COLUMN created_at REAL;
@@ -0,0 +1,162 @@
+-- Migration 008: journal des modifs de config (utils/config_sync.py)
+-- chaque UPDATE/DELETE sur une table de config (bot, dashboard, sqlite3 a la
+-- main...) ajoute une ligne ici. le bot lit les nouvelles lignes toutes les
+-- CONFIG_SYNC_INTERVAL secondes et vide le cache de la guild concernee,
+-- ce qui permet de garder les configs en cache pendant des heures
+
+CREATE TABLE IF NOT EXISTS config_changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    changed_at REAL DEFAULT ((julianday('now') - 2440587.5) * 86400.0)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_guild_settings_update AFTER UPDATE ON guild_settings
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('guild_settings', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_guild_settings_delete AFTER DELETE ON guild_settings
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('guild_settings', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_levels_config_update AFTER UPDATE ON levels_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('levels_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_levels_config_delete AFTER DELETE ON levels_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('levels_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_economy_config_update AFTER UPDATE ON economy_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('economy_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_economy_config_delete AFTER DELETE ON economy_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('economy_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_welcome_config_update AFTER UPDATE ON welcome_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('welcome_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_welcome_config_delete AFTER DELETE ON welcome_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('welcome_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_mod_config_update AFTER UPDATE ON mod_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('mod_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_mod_config_delete AFTER DELETE ON mod_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('mod_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ticket_config_update AFTER UPDATE ON ticket_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('ticket_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ticket_config_delete AFTER DELETE ON ticket_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('ticket_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_suggestions_config_update AFTER UPDATE ON suggestions_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('suggestions_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_suggestions_config_delete AFTER DELETE ON suggestions_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('suggestions_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_starboard_config_update AFTER UPDATE ON starboard_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('starboard_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_starboard_config_delete AFTER DELETE ON starboard_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('starboard_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_birthday_config_update AFTER UPDATE ON birthday_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('birthday_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_birthday_config_delete AFTER DELETE ON birthday_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('birthday_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_temp_voice_config_update AFTER UPDATE ON temp_voice_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('temp_voice_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_temp_voice_config_delete AFTER DELETE ON temp_voice_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('temp_voice_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_log_config_update AFTER UPDATE ON log_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('log_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_log_config_delete AFTER DELETE ON log_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('log_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invite_config_update AFTER UPDATE ON invite_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('invite_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invite_config_delete AFTER DELETE ON invite_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('invite_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_releases_config_update AFTER UPDATE ON releases_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('releases_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_releases_config_delete AFTER DELETE ON releases_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('releases_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_gamedeals_config_update AFTER UPDATE ON gamedeals_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('gamedeals_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_gamedeals_config_delete AFTER DELETE ON gamedeals_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('gamedeals_config', OLD.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_bump_config_update AFTER UPDATE ON bump_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('bump_config', NEW.guild_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_bump_config_delete AFTER DELETE ON bump_config
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('bump_config', OLD.guild_id);
+END;
@@ -0,0 +1,8 @@
+-- Migration 009: les INSERT dans guild_settings vont aussi dans config_changes
+-- le bot garde en memoire "pas de ligne" pour une guild (prefix/modules par
+-- defaut), une ligne creee ailleurs (dashboard) doit vider ce cache
+
+CREATE TRIGGER IF NOT EXISTS trg_guild_settings_insert AFTER INSERT ON guild_settings
+BEGIN
+    INSERT INTO config_changes (table_name, guild_id) VALUES ('guild_settings', NEW.guild_id);
+END;
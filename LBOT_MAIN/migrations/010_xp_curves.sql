@@ -0,0 +1,6 @@
+-- Migration 010: courbe d'xp par serveur (cf utils/xp_curve.py)
+-- xp totale pour le niveau n = int(xp_curve_base * n ^ xp_curve_exponent)
+-- les defauts donnent la meme courbe qu'avant
+
+ALTER TABLE levels_config ADD COLUMN xp_curve_base INTEGER DEFAULT 100;
+ALTER TABLE levels_config ADD COLUMN xp_curve_exponent REAL DEFAULT 1.5;
@@ -0,0 +1,28 @@
+-- Migration 011: fortune (balance + bank) stockee pour le classement eco
+-- l'index sur l'expression (006) obligeait a ecrire l'expression exacte et
+-- le classement payait un OFFSET. avec une vraie colonne indexee le
+-- leaderboard reprend apres le dernier membre de la page d'avant (keyset)
+-- tenue a jour par triggers: marche aussi pour les ecritures hors repo
+
+ALTER TABLE user_economy ADD COLUMN net_worth INTEGER DEFAULT 0;
+UPDATE user_economy SET net_worth = balance + bank;
+
+CREATE TRIGGER IF NOT EXISTS trg_user_economy_net_worth_insert AFTER INSERT ON user_economy
+WHEN NEW.net_worth IS NOT NEW.balance + NEW.bank
+BEGIN
+    UPDATE user_economy SET net_worth = NEW.balance + NEW.bank
+    WHERE guild_id = NEW.guild_id AND user_id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_user_economy_net_worth_update AFTER UPDATE OF balance, bank ON user_economy
+WHEN NEW.net_worth IS NOT NEW.balance + NEW.bank
+BEGIN
+    UPDATE user_economy SET net_worth = NEW.balance + NEW.bank
+    WHERE guild_id = NEW.guild_id AND user_id = NEW.user_id;
+END;
+
+-- user_id pour departager les egalites (curseur keyset sans tri temporaire)
+CREATE INDEX IF NOT EXISTS idx_user_economy_net_worth
+    ON user_economy(guild_id, net_worth DESC, user_id);
+
+DROP INDEX IF EXISTS idx_user_economy_networth;
@@ -0,0 +1,5 @@
+-- Migration 012: options du filtre de mots (cf utils/word_filter.py)
+-- par defaut meme comportement qu'avant: sous-chaine, sans normalisation
+
+ALTER TABLE mod_config ADD COLUMN bad_words_whole_words INTEGER DEFAULT 0;
+ALTER TABLE mod_config ADD COLUMN bad_words_obfuscation INTEGER DEFAULT 0;
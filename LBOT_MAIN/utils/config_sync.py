@@ -0,0 +1,107 @@
+"""
+Invalidation des caches de config entre process
+
+le dashboard (Flask, sqlite3 direct) ecrit les tables de config dans le meme
+fichier que le bot. des triggers (migration 008) notent chaque modif dans
+config_changes, le bot lit les nouvelles lignes toutes les
+CONFIG_SYNC_INTERVAL secondes et previent les abonnes de la table, qui
+vident juste la guild concernee. du coup les caches peuvent avoir des TTL
+de plusieurs heures au lieu de recharger chaque guild toutes les minutes
+
+un tour sans modif = un SELECT sur la cle primaire qui retourne rien
+
+usage:
+    from utils.config_sync import config_sync
+    config_sync.subscribe("levels_config", cache.invalidate)  # callback(guild_id)
+    await config_sync.start()      # setup_hook, apres db.connect()
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+from utils.database import db
+
+logger = logging.getLogger('database')
+
+# secondes entre deux lectures du journal (0 = off, les caches vivent jusqu'au TTL)
+CONFIG_SYNC_INTERVAL = float(os.getenv("CONFIG_SYNC_INTERVAL", "2"))
+
+# on garde le journal un jour, largement assez pour un bot qui redemarre
+CHANGES_KEEP = 86400
+PRUNE_EVERY = 3600
+
+
+class ConfigSync:
+    """lit config_changes et invalide les caches abonnes"""
+    
+    def __init__(self, interval: float = CONFIG_SYNC_INTERVAL):
+        self.interval = interval
+        self._subscribers: dict[str, list[Callable[[int], None]]] = {}
+        self._last_id = 0
+        self._last_prune = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    def subscribe(self, table: str, callback: Callable[[int], None]):
+        """callback(guild_id) appele quand la config de la guild change dans cette table"""
+        self._subscribers.setdefault(table, []).append(callback)
+    
+    # ---- SCHEDULER ----
+    
+    async def start(self):
+        if self.interval <= 0 or self._task:
+            return
+        # les modifs d'avant le demarrage sont deja dans la db, caches vides
+        row = await db.fetchone("SELECT MAX(id) as id FROM config_changes")
+        self._last_id = (row["id"] or 0) if row else 0
+        self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Config sync: {e}")
+    
+    # ---- POLL ----
+    
+    async def poll(self) -> int:
+        """applique les modifs depuis le dernier tour, retourne le nb d'invalidations"""
+        rows = await db.fetchall(
+            "SELECT id, table_name, guild_id FROM config_changes WHERE id > ? ORDER BY id",
+            (self._last_id,)
+        )
+        
+        # une modif = une ligne, plusieurs colonnes changees d'un coup = plusieurs lignes
+        changed = {(r["table_name"], r["guild_id"]) for r in rows}
+        for table, guild_id in changed:
+            for callback in self._subscribers.get(table, ()):
+                callback(guild_id)
+        
+        if rows:
+            self._last_id = rows[-1]["id"]
+        
+        if time.time() - self._last_prune > PRUNE_EVERY:
+            self._last_prune = time.time()
+            await db.execute(
+                "DELETE FROM config_changes WHERE changed_at < ?",
+                (time.time() - CHANGES_KEEP,)
+            )
+        
+        return len(changed)
+
+
+# Singleton instance
+config_sync = ConfigSync()
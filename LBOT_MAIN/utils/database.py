@@ -1,23 +1,733 @@
 """
 Module database - gestion SQLite async
 toutes les tables: levels, economy, moderation, welcome, tickets, giveaways, etc.
+
+group commit: les ecritures de execute() sont mises en file et commit
+ensemble dans une seule transaction (timer court ou taille max du batch)
+au lieu d'un commit (= un fsync) par requete. l'appelant attend quand meme
+que SA requete soit commit, donc rien ne change pour les repos/cogs
+
+pool de lecture: fetchone/fetchall passent par des connexions read-only
+(WAL = les lecteurs bloquent pas l'ecrivain et inversement), la connexion
+principale reste la seule a ecrire
+
+transactions: `async with db.transaction():` regroupe plusieurs requetes
+dans un seul commit, imbricable (SAVEPOINT)
+
+bulk: execute_many / upsert_many ecrivent N lignes avec un seul statement
+prepare et un seul commit (taches de fond, gros batchs)
+
+bootstrap: le schema (SCHEMA + migrations) est joue dans une seule
+transaction, et completement saute si l'empreinte stockee dans schema_meta
+correspond -> un restart = une seule requete
+
+records: fetchone/fetchall(..., record=UserLevel) construisent directement
+les dataclasses (slots=True) depuis les tuples sqlite, cf record_factory
+
+stats: chaque requete est chronometree (attente vs execution), voir
+utils/query_stats.py et la commande owner `dbstats`
 """
 
 import aiosqlite
+import asyncio
+import contextvars
+import dataclasses
+import hashlib
+import operator
 import os
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Iterable, Sequence
 import json
 
+from utils.query_stats import QueryStats
+
 DATABASE_PATH = os.getenv("DATABASE_PATH", "data/bot.db")
 
+# fenetre du group commit en ms (0 = un commit par requete, comme avant)
+DB_COMMIT_INTERVAL_MS = int(os.getenv("DB_COMMIT_INTERVAL_MS", "50"))
+# nb max d'ecritures par batch, au dela on flush direct sans attendre le timer
+DB_COMMIT_BATCH_SIZE = int(os.getenv("DB_COMMIT_BATCH_SIZE", "200"))
+# nb de connexions read-only pour les SELECT (0 = tout sur la connexion principale)
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "4"))
+# attente max d'un verrou (ms) avant "database is locked"
+BUSY_TIMEOUT_MS = 5000
+
+
+# Schema complet, joue au bootstrap (son hash sert d'empreinte, cf schema_fingerprint)
+SCHEMA = [
+    # ==================== GUILD SETTINGS ====================
+    """
+        CREATE TABLE IF NOT EXISTS guild_settings (
+            guild_id INTEGER PRIMARY KEY,
+            prefix TEXT DEFAULT '!',
+            language TEXT DEFAULT 'fr',
+            
+            -- Module toggles
+            levels_enabled INTEGER DEFAULT 1,
+            economy_enabled INTEGER DEFAULT 1,
+            welcome_enabled INTEGER DEFAULT 0,
+            moderation_enabled INTEGER DEFAULT 1,
+            tickets_enabled INTEGER DEFAULT 0,
+            starboard_enabled INTEGER DEFAULT 0,
+            suggestions_enabled INTEGER DEFAULT 0,
+            birthdays_enabled INTEGER DEFAULT 0,
+            temp_voice_enabled INTEGER DEFAULT 0,
+            invites_enabled INTEGER DEFAULT 0,
+            releases_enabled INTEGER DEFAULT 0,
+            gamedeals_enabled INTEGER DEFAULT 0,
+            
+            -- General settings stored as JSON
+            settings_json TEXT DEFAULT '{}'
+        )
+    """,
+    
+    # ==================== LEVELS SYSTEM ====================
+    """
+        CREATE TABLE IF NOT EXISTS levels_config (
+            guild_id INTEGER PRIMARY KEY,
+            xp_per_message INTEGER DEFAULT 15,
+            xp_cooldown INTEGER DEFAULT 60,
+            xp_voice_per_minute INTEGER DEFAULT 5,
+            level_up_channel_id INTEGER,
+            level_up_message TEXT DEFAULT 'Félicitations {user} ! Tu es passé au niveau **{level}** ! 🎉',
+            max_level INTEGER DEFAULT 0,
+            color TEXT DEFAULT '#5865F2',
+            ignored_channels TEXT DEFAULT '[]',
+            ignored_roles TEXT DEFAULT '[]',
+            booster_roles TEXT DEFAULT '{}'
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS user_levels (
+            guild_id INTEGER,
+            user_id INTEGER,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 0,
+            total_messages INTEGER DEFAULT 0,
+            voice_time INTEGER DEFAULT 0,
+            last_xp_time REAL DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS level_rewards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            level INTEGER,
+            role_id INTEGER,
+            remove_previous INTEGER DEFAULT 0,
+            UNIQUE(guild_id, level, role_id)
+        )
+    """,
+    
+    # ==================== ECONOMY SYSTEM ====================
+    """
+        CREATE TABLE IF NOT EXISTS economy_config (
+            guild_id INTEGER PRIMARY KEY,
+            currency_name TEXT DEFAULT 'coins',
+            currency_emoji TEXT DEFAULT '🪙',
+            daily_amount INTEGER DEFAULT 100,
+            work_min INTEGER DEFAULT 50,
+            work_max INTEGER DEFAULT 200,
+            work_cooldown INTEGER DEFAULT 3600,
+            voice_money_per_minute INTEGER DEFAULT 1,
+            color TEXT DEFAULT '#F1C40F',
+            booster_roles TEXT DEFAULT '{}'
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS user_economy (
+            guild_id INTEGER,
+            user_id INTEGER,
+            balance INTEGER DEFAULT 0,
+            bank INTEGER DEFAULT 0,
+            last_daily REAL DEFAULT 0,
+            last_work REAL DEFAULT 0,
+            total_earned INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS shop_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            name TEXT,
+            description TEXT,
+            price INTEGER,
+            role_id INTEGER,
+            stock INTEGER DEFAULT -1,
+            required_role_id INTEGER,
+            created_at REAL
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS user_inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            item_id INTEGER,
+            quantity INTEGER DEFAULT 1,
+            purchased_at REAL,
+            FOREIGN KEY (item_id) REFERENCES shop_items(id)
+        )
+    """,
+    
+    # ==================== WELCOME/GOODBYE ====================
+    """
+        CREATE TABLE IF NOT EXISTS welcome_config (
+            guild_id INTEGER PRIMARY KEY,
+            welcome_channel_id INTEGER,
+            welcome_message TEXT DEFAULT 'Bienvenue {user} sur **{server}** ! 🎉',
+            welcome_embed INTEGER DEFAULT 1,
+            welcome_image_url TEXT,
+            goodbye_channel_id INTEGER,
+            goodbye_message TEXT DEFAULT 'Au revoir {user} ! 👋',
+            goodbye_embed INTEGER DEFAULT 1,
+            goodbye_image_url TEXT,
+            dm_message TEXT,
+            dm_enabled INTEGER DEFAULT 0
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS auto_roles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            role_id INTEGER,
+            UNIQUE(guild_id, role_id)
+        )
+    """,
+    
+    # ==================== MODERATION ====================
+    """
+        CREATE TABLE IF NOT EXISTS mod_config (
+            guild_id INTEGER PRIMARY KEY,
+            mod_log_channel_id INTEGER,
+            mute_role_id INTEGER,
+            
+            -- Anti-spam settings
+            antispam_enabled INTEGER DEFAULT 0,
+            antispam_messages INTEGER DEFAULT 5,
+            antispam_seconds INTEGER DEFAULT 5,
+            antispam_action TEXT DEFAULT 'mute',
+            
+            -- Anti-invite
+            anti_invite_enabled INTEGER DEFAULT 0,
+            anti_invite_action TEXT DEFAULT 'delete',
+            
+            -- Anti-links
+            anti_links_enabled INTEGER DEFAULT 0,
+            allowed_links TEXT DEFAULT '[]',
+            
+            -- Bad words
+            bad_words_enabled INTEGER DEFAULT 0,
+            bad_words TEXT DEFAULT '[]',
+            bad_words_action TEXT DEFAULT 'delete'
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS mod_cases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            moderator_id INTEGER,
+            action TEXT,
+            reason TEXT,
+            duration INTEGER,
+            created_at REAL,
+            expires_at REAL,
+            active INTEGER DEFAULT 1
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS warnings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            user_id INTEGER,
+            moderator_id INTEGER,
+            reason TEXT,
+            created_at REAL
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS temp_bans (
+            guild_id INTEGER,
+            user_id INTEGER,
+            expires_at REAL,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS temp_mutes (
+            guild_id INTEGER,
+            user_id INTEGER,
+            expires_at REAL,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """,
+    
+    # ==================== TICKETS ====================
+    """
+        CREATE TABLE IF NOT EXISTS ticket_config (
+            guild_id INTEGER PRIMARY KEY,
+            category_id INTEGER,
+            log_channel_id INTEGER,
+            support_role_id INTEGER,
+            ticket_message TEXT DEFAULT 'Bonjour {user} ! Un membre du staff va vous aider bientôt.',
+            max_tickets_per_user INTEGER DEFAULT 1,
+            auto_close_hours INTEGER DEFAULT 0,
+            transcript_enabled INTEGER DEFAULT 1
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS tickets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER UNIQUE,
+            user_id INTEGER,
+            status TEXT DEFAULT 'open',
+            subject TEXT,
+            created_at REAL,
+            closed_at REAL,
+            closed_by INTEGER
+        )
+    """,
+    
+    # ==================== GIVEAWAYS ====================
+    """
+        CREATE TABLE IF NOT EXISTS giveaways (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            message_id INTEGER UNIQUE,
+            host_id INTEGER,
+            prize TEXT,
+            winners_count INTEGER DEFAULT 1,
+            required_role_id INTEGER,
+            ends_at REAL,
+            ended INTEGER DEFAULT 0,
+            winner_ids TEXT DEFAULT '[]'
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS giveaway_entries (
+            giveaway_id INTEGER,
+            user_id INTEGER,
+            entries INTEGER DEFAULT 1,
+            PRIMARY KEY (giveaway_id, user_id),
+            FOREIGN KEY (giveaway_id) REFERENCES giveaways(id)
+        )
+    """,
+    
+    # ==================== SUGGESTIONS ====================
+    """
+        CREATE TABLE IF NOT EXISTS suggestions_config (
+            guild_id INTEGER PRIMARY KEY,
+            channel_id INTEGER,
+            review_channel_id INTEGER,
+            approved_channel_id INTEGER,
+            denied_channel_id INTEGER,
+            auto_thread INTEGER DEFAULT 0,
+            anonymous INTEGER DEFAULT 0,
+            upvote_emoji TEXT DEFAULT '👍',
+            downvote_emoji TEXT DEFAULT '👎'
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS suggestions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            message_id INTEGER UNIQUE,
+            user_id INTEGER,
+            content TEXT,
+            status TEXT DEFAULT 'pending',
+            upvotes INTEGER DEFAULT 0,
+            downvotes INTEGER DEFAULT 0,
+            review_note TEXT,
+            reviewed_by INTEGER,
+            created_at REAL
+        )
+    """,
+    
+    # ==================== STARBOARD ====================
+    """
+        CREATE TABLE IF NOT EXISTS starboard_config (
+            guild_id INTEGER PRIMARY KEY,
+            channel_id INTEGER,
+            threshold INTEGER DEFAULT 3,
+            emoji TEXT DEFAULT '⭐',
+            self_star INTEGER DEFAULT 0,
+            ignore_channels TEXT DEFAULT '[]'
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS starboard_messages (
+            original_message_id INTEGER PRIMARY KEY,
+            guild_id INTEGER,
+            starboard_message_id INTEGER,
+            channel_id INTEGER,
+            author_id INTEGER,
+            star_count INTEGER DEFAULT 0
+        )
+    """,
+    
+    # ==================== BIRTHDAYS ====================
+    """
+        CREATE TABLE IF NOT EXISTS birthday_config (
+            guild_id INTEGER PRIMARY KEY,
+            channel_id INTEGER,
+            role_id INTEGER,
+            message TEXT DEFAULT '🎂 Joyeux anniversaire {user} ! 🎉',
+            announce_time TEXT DEFAULT '09:00'
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS user_birthdays (
+            guild_id INTEGER,
+            user_id INTEGER,
+            day INTEGER,
+            month INTEGER,
+            year INTEGER,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """,
+    
+    # ==================== TEMPORARY VOICE ====================
+    """
+        CREATE TABLE IF NOT EXISTS temp_voice_config (
+            guild_id INTEGER PRIMARY KEY,
+            creator_channel_id INTEGER,
+            category_id INTEGER,
+            default_name TEXT DEFAULT '{user}''s channel',
+            default_limit INTEGER DEFAULT 0
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS temp_voice_channels (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER,
+            owner_id INTEGER,
+            created_at REAL
+        )
+    """,
+    
+    # ==================== ROLE REACTIONS ====================
+    """
+        CREATE TABLE IF NOT EXISTS reaction_roles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            message_id INTEGER,
+            emoji TEXT,
+            role_id INTEGER,
+            UNIQUE(message_id, emoji)
+        )
+    """,
+    
+    # ==================== CUSTOM COMMANDS ====================
+    """
+        CREATE TABLE IF NOT EXISTS custom_commands (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            name TEXT,
+            response TEXT,
+            embed INTEGER DEFAULT 0,
+            created_by INTEGER,
+            uses INTEGER DEFAULT 0,
+            UNIQUE(guild_id, name)
+        )
+    """,
+    
+    # ==================== REMINDERS ====================
+    """
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            user_id INTEGER,
+            message TEXT,
+            remind_at REAL,
+            created_at REAL,
+            sent INTEGER DEFAULT 0
+        )
+    """,
+    
+    # ==================== LOGS ====================
+    """
+        CREATE TABLE IF NOT EXISTS log_config (
+            guild_id INTEGER PRIMARY KEY,
+            message_log_channel INTEGER,
+            member_log_channel INTEGER,
+            mod_log_channel INTEGER,
+            voice_log_channel INTEGER,
+            server_log_channel INTEGER
+        )
+    """,
+    
+    # ==================== SOCIAL NOTIFICATIONS ====================
+    """
+        CREATE TABLE IF NOT EXISTS social_notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            platform TEXT,
+            platform_id TEXT,
+            custom_message TEXT,
+            last_check TEXT,
+            UNIQUE(guild_id, platform, platform_id)
+        )
+    """,
+    
+    # ==================== INVITE TRACKING ====================
+    """
+        CREATE TABLE IF NOT EXISTS invite_config (
+            guild_id INTEGER PRIMARY KEY,
+            join_channel_id INTEGER,
+            leave_channel_id INTEGER,
+            join_message TEXT,
+            join_message_unknown TEXT,
+            leave_message TEXT,
+            leave_message_unknown TEXT,
+            min_account_age INTEGER DEFAULT 7
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS user_invites (
+            guild_id INTEGER,
+            user_id INTEGER,
+            regular INTEGER DEFAULT 0,
+            leaves INTEGER DEFAULT 0,
+            fake INTEGER DEFAULT 0,
+            bonus INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS invited_users (
+            guild_id INTEGER,
+            user_id INTEGER,
+            inviter_id INTEGER,
+            invite_code TEXT,
+            joined_at REAL,
+            is_fake INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS invite_rewards (
+            guild_id INTEGER,
+            required_invites INTEGER,
+            role_id INTEGER,
+            PRIMARY KEY (guild_id, required_invites)
+        )
+    """,
+    
+    # ==================== RELEASES (Games/Anime/Series/Films) ====================
+    """
+        CREATE TABLE IF NOT EXISTS releases_config (
+            guild_id INTEGER PRIMARY KEY,
+            games_channel_id INTEGER,
+            games_role_id INTEGER,
+            anime_channel_id INTEGER,
+            anime_role_id INTEGER,
+            series_channel_id INTEGER,
+            series_role_id INTEGER,
+            films_channel_id INTEGER,
+            films_role_id INTEGER
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS announced_releases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            category TEXT,
+            item_id TEXT,
+            announced_at REAL,
+            UNIQUE(guild_id, category, item_id)
+        )
+    """,
+    
+    # ==================== GAME DEALS (Epic/Steam) ====================
+    """
+        CREATE TABLE IF NOT EXISTS gamedeals_config (
+            guild_id INTEGER PRIMARY KEY,
+            epic_channel_id INTEGER,
+            epic_role_id INTEGER,
+            steam_channel_id INTEGER,
+            steam_role_id INTEGER,
+            steam_min_discount INTEGER DEFAULT 75
+        )
+    """,
+    
+    """
+        CREATE TABLE IF NOT EXISTS announced_deals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            deal_id TEXT,
+            platform TEXT,
+            announced_at REAL,
+            UNIQUE(guild_id, deal_id)
+        )
+    """,
+    
+    # ==================== AUTO MESSAGES ====================
+    """
+        CREATE TABLE IF NOT EXISTS auto_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            channel_id INTEGER,
+            content TEXT,
+            embed_json TEXT,
+            interval INTEGER,
+            next_run REAL,
+            last_run REAL,
+            created_at REAL,
+            enabled INTEGER DEFAULT 1,
+            mention_role_id INTEGER
+        )
+    """,
+    
+    # ==================== BUMP REMINDERS ====================
+    """
+        CREATE TABLE IF NOT EXISTS bump_config (
+            guild_id INTEGER PRIMARY KEY,
+            enabled INTEGER DEFAULT 0,
+            channel_id INTEGER,
+            role_id INTEGER,
+            cooldown INTEGER DEFAULT 7200,
+            message TEXT,
+            thank_message TEXT,
+            last_bump REAL DEFAULT 0,
+            last_reminder REAL DEFAULT 0
+        )
+    """,
+    
+    # Create indexes for performance
+    "CREATE INDEX IF NOT EXISTS idx_user_levels_guild ON user_levels(guild_id)",
+    "CREATE INDEX IF NOT EXISTS idx_user_levels_xp ON user_levels(guild_id, xp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_user_economy_guild ON user_economy(guild_id)",
+    "CREATE INDEX IF NOT EXISTS idx_mod_cases_guild ON mod_cases(guild_id)",
+    "CREATE INDEX IF NOT EXISTS idx_mod_cases_user ON mod_cases(guild_id, user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_user_invites_guild ON user_invites(guild_id)",
+    "CREATE INDEX IF NOT EXISTS idx_invited_users_inviter ON invited_users(guild_id, inviter_id)",
+    "CREATE INDEX IF NOT EXISTS idx_auto_messages_next ON auto_messages(next_run)",
+    "CREATE INDEX IF NOT EXISTS idx_announced_releases ON announced_releases(guild_id, category)",
+    "CREATE INDEX IF NOT EXISTS idx_announced_deals ON announced_deals(guild_id, platform)",
+    
+    # ==================== META ====================
+    """
+        CREATE TABLE IF NOT EXISTS schema_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """,
+]
+
+
+def schema_fingerprint() -> str:
+    """hash du schema + des fichiers de migration, change des qu'on touche a l'un des deux"""
+    from utils.migrations import MIGRATIONS_DIR
+    
+    digest = hashlib.sha256()
+    for statement in SCHEMA:
+        digest.update(statement.encode())
+    if MIGRATIONS_DIR.exists():
+        for file in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            digest.update(file.name.encode())
+            digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def record_factory(record: type):
+    """
+    row_factory qui construit directement un record (dataclass slots=True)
+    depuis le tuple sqlite, sans passer par aiosqlite.Row puis dict(row)
+    
+    le mapping colonne -> champ est calcule une fois sur le 1er resultat
+    (cursor.description) puis c'est juste des index: cls(*row) si les
+    colonnes sont dans l'ordre des champs, sinon un itemgetter. les colonnes
+    en trop sont ignorees, les champs absents gardent leur valeur par defaut
+    """
+    fields = [f.name for f in dataclasses.fields(record)]
+    build = None
+    
+    def factory(cursor, row):
+        nonlocal build
+        if build is None:
+            columns = [d[0] for d in cursor.description]
+            if columns == fields:
+                build = lambda r: record(*r)
+            elif all(f in columns for f in fields):
+                getter = operator.itemgetter(*(columns.index(f) for f in fields))
+                build = lambda r: record(*getter(r))
+            else:
+                present = [(f, columns.index(f)) for f in fields if f in columns]
+                build = lambda r: record(**{f: r[i] for f, i in present})
+        return build(row)
+    
+    return factory
+
 
 class Database:
     """Async SQLite database wrapper"""
     
-    def __init__(self, db_path: str = DATABASE_PATH):
+    def __init__(
+        self,
+        db_path: str = DATABASE_PATH,
+        commit_interval_ms: int = DB_COMMIT_INTERVAL_MS,
+        commit_batch_size: int = DB_COMMIT_BATCH_SIZE,
+        read_pool_size: int = DB_READ_POOL_SIZE,
+        foreign_keys: bool = True,
+        create_schema: bool = True
+    ):
         self.db_path = db_path
+        self.foreign_keys = foreign_keys
+        # False = fichier sans les tables du bot (ex: la db d'archive)
+        self.create_schema = create_schema
         self.connection: Optional[aiosqlite.Connection] = None
+        
+        # group commit
+        self.commit_interval = commit_interval_ms / 1000
+        self.commit_batch_size = max(1, commit_batch_size)
+        self._group_commit = False
+        self._write_queue: list[tuple[str, tuple, asyncio.Future, float]] = []
+        self._batch_full = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        # un seul flush a la fois sur la connexion
+        self._write_lock = asyncio.Lock()
+        
+        # pool de lecture (pas possible en :memory:, chaque connexion aurait sa db)
+        self.read_pool_size = 0 if db_path == ":memory:" else read_pool_size
+        self._readers: list[aiosqlite.Connection] = []
+        self._idle_readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        
+        # profondeur de transaction du contexte courant (0 = pas en transaction)
+        # contextvar pour que seul le code dans le `async with` la voie
+        self._tx_depth = contextvars.ContextVar(f"db_tx_depth_{id(self)}", default=0)
+        
+        # latences par requete + slow query log
+        self.stats = QueryStats()
     
     async def connect(self):
         """Connexion a la DB et creation des tables"""
@@ -26,623 +736,356 @@ class Database:
         self.connection.row_factory = aiosqlite.Row
         
         # sqlite desactive les FK par defaut, faut les activer a la main
-        await self.connection.execute("PRAGMA foreign_keys = ON")
+        # (off sur les shards, les lignes parentes sont dans le fichier central)
+        await self.connection.execute(f"PRAGMA foreign_keys = {'ON' if self.foreign_keys else 'OFF'}")
+        
+        # vacuum incremental (cf utils/maintenance.py), pris en compte que sur une db
+        # vide, une db existante doit passer par un VACUUM complet (!dbmaint vacuum)
+        await self.connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
         
         # WAL = meilleures perfs en lecture, et ca evite de lock la db
         await self.connection.execute("PRAGMA journal_mode = WAL")
         
         # si le bot et le dashboard ecrivent en meme temps ca peut lock
         # 5sec de timeout ca laisse le temps de retry
-        await self.connection.execute("PRAGMA busy_timeout = 5000")
+        await self.connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
         await self.connection.execute("PRAGMA synchronous = NORMAL")
         
-        await self._create_tables()
+        if self.create_schema:
+            await self._bootstrap()
         
-        # run les migrations en attente
+        # le group commit s'active qu'apres le bootstrap, sinon chaque
+        # CREATE TABLE attendrait la fenetre du timer
+        self._group_commit = self.commit_interval > 0
+        
+        # les lecteurs s'ouvrent apres le bootstrap, mode=ro exige que le fichier existe
+        await self._open_readers()
+    
+    async def _bootstrap(self):
+        """cree les tables et joue les migrations, sauf si le schema a pas bouge"""
         from utils.migrations import run_migrations
+        
+        fingerprint = schema_fingerprint()
+        try:
+            cursor = await self.connection.execute(
+                "SELECT value FROM schema_meta WHERE key = 'fingerprint'"
+            )
+            row = await cursor.fetchone()
+            await cursor.close()
+        except aiosqlite.OperationalError:
+            # db neuve ou d'avant schema_meta
+            row = None
+        
+        if row and row[0] == fingerprint:
+            return
+        
+        # toutes les tables dans un seul commit au lieu d'un par CREATE
+        async with self.transaction():
+            await self._create_tables()
+        
         await run_migrations(self.connection)
+        
+        # l'empreinte s'ecrit qu'une fois tout passe, un bootstrap rate sera rejoue
+        await self.execute(
+            "INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('fingerprint', ?)",
+            (fingerprint,)
+        )
+    
+    async def _open_readers(self):
+        """ouvre le pool de connexions read-only"""
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        for _ in range(self.read_pool_size):
+            reader = await aiosqlite.connect(uri, uri=True)
+            reader.row_factory = aiosqlite.Row
+            await reader.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+            self._readers.append(reader)
+            self._idle_readers.put_nowait(reader)
+    
+    @asynccontextmanager
+    async def _reader(self):
+        """emprunte une connexion de lecture (ou la principale si pas de pool)"""
+        # dans une transaction faut lire sur la connexion qui ecrit,
+        # sinon on verrait pas nos propres ecritures pas encore commit
+        if not self._readers or self._tx_depth.get():
+            yield self.connection
+            return
+        
+        reader = await self._idle_readers.get()
+        try:
+            yield reader
+        finally:
+            self._idle_readers.put_nowait(reader)
     
     async def close(self):
         """Close database connection"""
         if self.connection:
+            # commit ce qui reste dans la file avant de fermer
+            if self._flush_task:
+                self._flush_task.cancel()
+                self._flush_task = None
+            await self.flush()
+            self._group_commit = False
+            
+            for reader in self._readers:
+                await reader.close()
+            self._readers.clear()
+            self._idle_readers = asyncio.Queue()
+            
             await self.connection.close()
     
     async def execute(self, query: str, params: tuple = ()) -> aiosqlite.Cursor:
-        """Execute a query"""
-        cursor = await self.connection.execute(query, params)
-        await self.connection.commit()
-        return cursor
-    
-    async def fetchone(self, query: str, params: tuple = ()) -> Optional[aiosqlite.Row]:
-        """Fetch one row"""
-        cursor = await self.connection.execute(query, params)
-        return await cursor.fetchone()
-    
-    async def fetchall(self, query: str, params: tuple = ()) -> list[aiosqlite.Row]:
-        """Fetch all rows"""
-        cursor = await self.connection.execute(query, params)
-        return await cursor.fetchall()
-    
-    async def _create_tables(self):
-        """Create all database tables"""
-        
-        # ==================== GUILD SETTINGS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS guild_settings (
-                guild_id INTEGER PRIMARY KEY,
-                prefix TEXT DEFAULT '!',
-                language TEXT DEFAULT 'fr',
-                
-                -- Module toggles
-                levels_enabled INTEGER DEFAULT 1,
-                economy_enabled INTEGER DEFAULT 1,
-                welcome_enabled INTEGER DEFAULT 0,
-                moderation_enabled INTEGER DEFAULT 1,
-                tickets_enabled INTEGER DEFAULT 0,
-                starboard_enabled INTEGER DEFAULT 0,
-                suggestions_enabled INTEGER DEFAULT 0,
-                birthdays_enabled INTEGER DEFAULT 0,
-                temp_voice_enabled INTEGER DEFAULT 0,
-                invites_enabled INTEGER DEFAULT 0,
-                releases_enabled INTEGER DEFAULT 0,
-                gamedeals_enabled INTEGER DEFAULT 0,
-                
-                -- General settings stored as JSON
-                settings_json TEXT DEFAULT '{}'
-            )
-        """)
+        """
+        Execute a query
+        en mode group commit la requete part dans la file, on rend la main
+        une fois le batch commit (l'ecriture est durable au retour)
+        """
+        start = time.perf_counter()
         
-        # ==================== LEVELS SYSTEM ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS levels_config (
-                guild_id INTEGER PRIMARY KEY,
-                xp_per_message INTEGER DEFAULT 15,
-                xp_cooldown INTEGER DEFAULT 60,
-                xp_voice_per_minute INTEGER DEFAULT 5,
-                level_up_channel_id INTEGER,
-                level_up_message TEXT DEFAULT 'Félicitations {user} ! Tu es passé au niveau **{level}** ! 🎉',
-                max_level INTEGER DEFAULT 0,
-                color TEXT DEFAULT '#5865F2',
-                ignored_channels TEXT DEFAULT '[]',
-                ignored_roles TEXT DEFAULT '[]',
-                booster_roles TEXT DEFAULT '{}'
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS user_levels (
-                guild_id INTEGER,
-                user_id INTEGER,
-                xp INTEGER DEFAULT 0,
-                level INTEGER DEFAULT 0,
-                total_messages INTEGER DEFAULT 0,
-                voice_time INTEGER DEFAULT 0,
-                last_xp_time REAL DEFAULT 0,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS level_rewards (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                level INTEGER,
-                role_id INTEGER,
-                remove_previous INTEGER DEFAULT 0,
-                UNIQUE(guild_id, level, role_id)
-            )
-        """)
-        
-        # ==================== ECONOMY SYSTEM ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS economy_config (
-                guild_id INTEGER PRIMARY KEY,
-                currency_name TEXT DEFAULT 'coins',
-                currency_emoji TEXT DEFAULT '🪙',
-                daily_amount INTEGER DEFAULT 100,
-                work_min INTEGER DEFAULT 50,
-                work_max INTEGER DEFAULT 200,
-                work_cooldown INTEGER DEFAULT 3600,
-                voice_money_per_minute INTEGER DEFAULT 1,
-                color TEXT DEFAULT '#F1C40F',
-                booster_roles TEXT DEFAULT '{}'
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS user_economy (
-                guild_id INTEGER,
-                user_id INTEGER,
-                balance INTEGER DEFAULT 0,
-                bank INTEGER DEFAULT 0,
-                last_daily REAL DEFAULT 0,
-                last_work REAL DEFAULT 0,
-                total_earned INTEGER DEFAULT 0,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS shop_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                name TEXT,
-                description TEXT,
-                price INTEGER,
-                role_id INTEGER,
-                stock INTEGER DEFAULT -1,
-                required_role_id INTEGER,
-                created_at REAL
-            )
-        """)
+        # dans une transaction: direct sur la connexion, le commit se fait a la fin du bloc
+        if self._tx_depth.get():
+            cursor = await self.connection.execute(query, params)
+            self.stats.record(query, params, 0, time.perf_counter() - start)
+            return cursor
         
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS user_inventory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                user_id INTEGER,
-                item_id INTEGER,
-                quantity INTEGER DEFAULT 1,
-                purchased_at REAL,
-                FOREIGN KEY (item_id) REFERENCES shop_items(id)
-            )
-        """)
-        
-        # ==================== WELCOME/GOODBYE ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS welcome_config (
-                guild_id INTEGER PRIMARY KEY,
-                welcome_channel_id INTEGER,
-                welcome_message TEXT DEFAULT 'Bienvenue {user} sur **{server}** ! 🎉',
-                welcome_embed INTEGER DEFAULT 1,
-                welcome_image_url TEXT,
-                goodbye_channel_id INTEGER,
-                goodbye_message TEXT DEFAULT 'Au revoir {user} ! 👋',
-                goodbye_embed INTEGER DEFAULT 1,
-                goodbye_image_url TEXT,
-                dm_message TEXT,
-                dm_enabled INTEGER DEFAULT 0
-            )
-        """)
+        if not self._group_commit:
+            async with self._write_lock:
+                acquired = time.perf_counter()
+                cursor = await self.connection.execute(query, params)
+                await self.connection.commit()
+            self.stats.record(query, params, acquired - start, time.perf_counter() - acquired)
+            return cursor
         
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS auto_roles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                role_id INTEGER,
-                UNIQUE(guild_id, role_id)
-            )
-        """)
-        
-        # ==================== MODERATION ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS mod_config (
-                guild_id INTEGER PRIMARY KEY,
-                mod_log_channel_id INTEGER,
-                mute_role_id INTEGER,
-                
-                -- Anti-spam settings
-                antispam_enabled INTEGER DEFAULT 0,
-                antispam_messages INTEGER DEFAULT 5,
-                antispam_seconds INTEGER DEFAULT 5,
-                antispam_action TEXT DEFAULT 'mute',
-                
-                -- Anti-invite
-                anti_invite_enabled INTEGER DEFAULT 0,
-                anti_invite_action TEXT DEFAULT 'delete',
-                
-                -- Anti-links
-                anti_links_enabled INTEGER DEFAULT 0,
-                allowed_links TEXT DEFAULT '[]',
-                
-                -- Bad words
-                bad_words_enabled INTEGER DEFAULT 0,
-                bad_words TEXT DEFAULT '[]',
-                bad_words_action TEXT DEFAULT 'delete'
-            )
-        """)
+        future = asyncio.get_running_loop().create_future()
+        self._write_queue.append((query, params, future, start))
         
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS mod_cases (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                user_id INTEGER,
-                moderator_id INTEGER,
-                action TEXT,
-                reason TEXT,
-                duration INTEGER,
-                created_at REAL,
-                expires_at REAL
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS warnings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                user_id INTEGER,
-                moderator_id INTEGER,
-                reason TEXT,
-                created_at REAL
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS temp_bans (
-                guild_id INTEGER,
-                user_id INTEGER,
-                expires_at REAL,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        """)
+        if len(self._write_queue) >= self.commit_batch_size:
+            self._batch_full.set()
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
         
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS temp_mutes (
-                guild_id INTEGER,
-                user_id INTEGER,
-                expires_at REAL,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        """)
-        
-        # ==================== TICKETS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS ticket_config (
-                guild_id INTEGER PRIMARY KEY,
-                category_id INTEGER,
-                log_channel_id INTEGER,
-                support_role_id INTEGER,
-                ticket_message TEXT DEFAULT 'Bonjour {user} ! Un membre du staff va vous aider bientôt.',
-                max_tickets_per_user INTEGER DEFAULT 1,
-                auto_close_hours INTEGER DEFAULT 0,
-                transcript_enabled INTEGER DEFAULT 1
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS tickets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER UNIQUE,
-                user_id INTEGER,
-                status TEXT DEFAULT 'open',
-                subject TEXT,
-                created_at REAL,
-                closed_at REAL,
-                closed_by INTEGER
-            )
-        """)
-        
-        # ==================== GIVEAWAYS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS giveaways (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                message_id INTEGER UNIQUE,
-                host_id INTEGER,
-                prize TEXT,
-                winners_count INTEGER DEFAULT 1,
-                required_role_id INTEGER,
-                ends_at REAL,
-                ended INTEGER DEFAULT 0,
-                winner_ids TEXT DEFAULT '[]'
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS giveaway_entries (
-                giveaway_id INTEGER,
-                user_id INTEGER,
-                entries INTEGER DEFAULT 1,
-                PRIMARY KEY (giveaway_id, user_id),
-                FOREIGN KEY (giveaway_id) REFERENCES giveaways(id)
-            )
-        """)
-        
-        # ==================== SUGGESTIONS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS suggestions_config (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER,
-                review_channel_id INTEGER,
-                approved_channel_id INTEGER,
-                denied_channel_id INTEGER,
-                auto_thread INTEGER DEFAULT 0,
-                anonymous INTEGER DEFAULT 0,
-                upvote_emoji TEXT DEFAULT '👍',
-                downvote_emoji TEXT DEFAULT '👎'
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS suggestions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                message_id INTEGER UNIQUE,
-                user_id INTEGER,
-                content TEXT,
-                status TEXT DEFAULT 'pending',
-                upvotes INTEGER DEFAULT 0,
-                downvotes INTEGER DEFAULT 0,
-                review_note TEXT,
-                reviewed_by INTEGER,
-                created_at REAL
-            )
-        """)
-        
-        # ==================== STARBOARD ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS starboard_config (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER,
-                threshold INTEGER DEFAULT 3,
-                emoji TEXT DEFAULT '⭐',
-                self_star INTEGER DEFAULT 0,
-                ignore_channels TEXT DEFAULT '[]'
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS starboard_messages (
-                original_message_id INTEGER PRIMARY KEY,
-                guild_id INTEGER,
-                starboard_message_id INTEGER,
-                channel_id INTEGER,
-                author_id INTEGER,
-                star_count INTEGER DEFAULT 0
-            )
-        """)
-        
-        # ==================== BIRTHDAYS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS birthday_config (
-                guild_id INTEGER PRIMARY KEY,
-                channel_id INTEGER,
-                role_id INTEGER,
-                message TEXT DEFAULT '🎂 Joyeux anniversaire {user} ! 🎉',
-                announce_time TEXT DEFAULT '09:00'
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS user_birthdays (
-                guild_id INTEGER,
-                user_id INTEGER,
-                day INTEGER,
-                month INTEGER,
-                year INTEGER,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        """)
-        
-        # ==================== TEMPORARY VOICE ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS temp_voice_config (
-                guild_id INTEGER PRIMARY KEY,
-                creator_channel_id INTEGER,
-                category_id INTEGER,
-                default_name TEXT DEFAULT '{user}''s channel',
-                default_limit INTEGER DEFAULT 0
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS temp_voice_channels (
-                channel_id INTEGER PRIMARY KEY,
-                guild_id INTEGER,
-                owner_id INTEGER,
-                created_at REAL
-            )
-        """)
-        
-        # ==================== ROLE REACTIONS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS reaction_roles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                message_id INTEGER,
-                emoji TEXT,
-                role_id INTEGER,
-                UNIQUE(message_id, emoji)
-            )
-        """)
-        
-        # ==================== CUSTOM COMMANDS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS custom_commands (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                name TEXT,
-                response TEXT,
-                embed INTEGER DEFAULT 0,
-                created_by INTEGER,
-                uses INTEGER DEFAULT 0,
-                UNIQUE(guild_id, name)
-            )
-        """)
-        
-        # ==================== REMINDERS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                user_id INTEGER,
-                message TEXT,
-                remind_at REAL,
-                created_at REAL,
-                sent INTEGER DEFAULT 0
-            )
-        """)
-        
-        # ==================== LOGS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS log_config (
-                guild_id INTEGER PRIMARY KEY,
-                message_log_channel INTEGER,
-                member_log_channel INTEGER,
-                mod_log_channel INTEGER,
-                voice_log_channel INTEGER,
-                server_log_channel INTEGER
-            )
-        """)
-        
-        # ==================== SOCIAL NOTIFICATIONS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS social_notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                platform TEXT,
-                platform_id TEXT,
-                custom_message TEXT,
-                last_check TEXT,
-                UNIQUE(guild_id, platform, platform_id)
-            )
-        """)
-        
-        # ==================== INVITE TRACKING ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS invite_config (
-                guild_id INTEGER PRIMARY KEY,
-                join_channel_id INTEGER,
-                leave_channel_id INTEGER,
-                join_message TEXT,
-                join_message_unknown TEXT,
-                leave_message TEXT,
-                leave_message_unknown TEXT,
-                min_account_age INTEGER DEFAULT 7
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS user_invites (
-                guild_id INTEGER,
-                user_id INTEGER,
-                regular INTEGER DEFAULT 0,
-                leaves INTEGER DEFAULT 0,
-                fake INTEGER DEFAULT 0,
-                bonus INTEGER DEFAULT 0,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS invited_users (
-                guild_id INTEGER,
-                user_id INTEGER,
-                inviter_id INTEGER,
-                invite_code TEXT,
-                joined_at REAL,
-                is_fake INTEGER DEFAULT 0,
-                PRIMARY KEY (guild_id, user_id)
-            )
-        """)
-        
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS invite_rewards (
-                guild_id INTEGER,
-                required_invites INTEGER,
-                role_id INTEGER,
-                PRIMARY KEY (guild_id, required_invites)
-            )
-        """)
+        return await future
+    
+    async def _flush_later(self):
+        """attend la fin de la fenetre (ou un batch plein) puis flush"""
+        try:
+            await asyncio.wait_for(self._batch_full.wait(), timeout=self.commit_interval)
+        except asyncio.TimeoutError:
+            pass
+        # les ecritures qui arrivent pendant le flush planifient le suivant
+        self._flush_task = None
+        await self.flush()
+    
+    async def flush(self):
+        """commit toutes les ecritures en attente dans une seule transaction"""
+        async with self._write_lock:
+            batch, self._write_queue = self._write_queue, []
+            self._batch_full.clear()
+            if not batch:
+                return
+            
+            done = []
+            for query, params, future, queued_at in batch:
+                # l'appelant a ete annule entre temps, on joue pas sa requete
+                if future.done():
+                    continue
+                started = time.perf_counter()
+                try:
+                    cursor = await self.connection.execute(query, params)
+                    done.append((future, cursor, None))
+                except Exception as e:
+                    # sqlite annule juste la requete fautive, pas la transaction
+                    done.append((future, None, e))
+                # attente = temps passe dans la file du group commit
+                self.stats.record(query, params, started - queued_at, time.perf_counter() - started)
+            
+            try:
+                started = time.perf_counter()
+                await self.connection.commit()
+                self.stats.record("COMMIT", (), 0, time.perf_counter() - started)
+            except Exception as e:
+                await self.connection.rollback()
+                for future, _, _ in done:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            
+            for future, cursor, error in done:
+                if future.done():
+                    continue
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(cursor)
+    
+    async def pragma(self, statement: str) -> list:
+        """
+        PRAGMA/VACUUM sur la connexion d'ecriture, hors transaction
+        (checkpoint, optimize, vacuum...), retourne les lignes du resultat
+        """
+        start = time.perf_counter()
+        # le lock garantit qu'aucune transaction ni batch du group commit est ouvert
+        async with self._write_lock:
+            acquired = time.perf_counter()
+            async with self.connection.execute(statement) as cursor:
+                rows = await cursor.fetchall()
+            if self.connection.in_transaction:
+                await self.connection.commit()
+        self.stats.record(statement, (), acquired - start, time.perf_counter() - acquired)
+        return rows
+    
+    async def checkpoint(self, mode: str = "PASSIVE", busy_timeout_ms: int = BUSY_TIMEOUT_MS) -> Optional[tuple]:
+        """
+        wal_checkpoint(mode) sous le lock d'ecriture, retourne (busy, pages du
+        WAL, pages copiees). busy_timeout_ms borne l'attente des lecteurs
+        (TRUNCATE/RESTART), remis a la normale juste apres
+        """
+        start = time.perf_counter()
+        async with self._write_lock:
+            acquired = time.perf_counter()
+            await self.connection.execute(f"PRAGMA busy_timeout = {busy_timeout_ms}")
+            try:
+                async with self.connection.execute(f"PRAGMA wal_checkpoint({mode})") as cursor:
+                    row = await cursor.fetchone()
+            finally:
+                await self.connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self.stats.record(f"PRAGMA wal_checkpoint({mode})", (), acquired - start, time.perf_counter() - acquired)
+        return tuple(row) if row else None
+    
+    async def execute_many(self, query: str, params_seq: Iterable[tuple]) -> int:
+        """
+        execute la meme requete pour chaque jeu de params, un seul commit
+        retourne le nombre de lignes touchees
+        """
+        params_seq = list(params_seq)
+        if not params_seq:
+            return 0
         
-        # ==================== RELEASES (Games/Anime/Series/Films) ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS releases_config (
-                guild_id INTEGER PRIMARY KEY,
-                games_channel_id INTEGER,
-                games_role_id INTEGER,
-                anime_channel_id INTEGER,
-                anime_role_id INTEGER,
-                series_channel_id INTEGER,
-                series_role_id INTEGER,
-                films_channel_id INTEGER,
-                films_role_id INTEGER
-            )
-        """)
+        if self._tx_depth.get():
+            return await self._executemany(query, params_seq)
         
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS announced_releases (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                category TEXT,
-                item_id TEXT,
-                announced_at REAL,
-                UNIQUE(guild_id, category, item_id)
-            )
-        """)
+        async with self.transaction():
+            return await self._executemany(query, params_seq)
+    
+    async def _executemany(self, query: str, params_seq: list[tuple]) -> int:
+        """executemany chronometre, appele dans une transaction"""
+        start = time.perf_counter()
+        cursor = await self.connection.executemany(query, params_seq)
+        self.stats.record(query, params_seq[0], 0, time.perf_counter() - start)
+        return cursor.rowcount
+    
+    async def upsert_many(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[tuple],
+        conflict: Sequence[str] = ("guild_id",),
+        update: Optional[dict[str, str]] = None
+    ) -> int:
+        """
+        INSERT ... ON CONFLICT DO UPDATE en bulk
         
-        # ==================== GAME DEALS (Epic/Steam) ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS gamedeals_config (
-                guild_id INTEGER PRIMARY KEY,
-                epic_channel_id INTEGER,
-                epic_role_id INTEGER,
-                steam_channel_id INTEGER,
-                steam_role_id INTEGER,
-                steam_min_discount INTEGER DEFAULT 75
-            )
-        """)
+        update = {colonne: expression sql} pour le DO UPDATE, par defaut
+        `col = excluded.col` pour toutes les colonnes hors conflit
+        ex: update={"xp": "xp + excluded.xp"} pour incrementer
+        update={} = DO NOTHING (insert or ignore)
+        """
+        if update is None:
+            update = {c: f"excluded.{c}" for c in columns if c not in conflict}
         
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS announced_deals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                deal_id TEXT,
-                platform TEXT,
-                announced_at REAL,
-                UNIQUE(guild_id, deal_id)
-            )
-        """)
+        placeholders = ", ".join("?" for _ in columns)
+        query = (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT({', '.join(conflict)}) "
+        )
+        if update:
+            query += "DO UPDATE SET " + ", ".join(f"{c} = {expr}" for c, expr in update.items())
+        else:
+            query += "DO NOTHING"
         
-        # ==================== AUTO MESSAGES ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS auto_messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                guild_id INTEGER,
-                channel_id INTEGER,
-                content TEXT,
-                embed_json TEXT,
-                interval INTEGER,
-                next_run REAL,
-                last_run REAL,
-                created_at REAL,
-                enabled INTEGER DEFAULT 1,
-                mention_role_id INTEGER
-            )
-        """)
+        return await self.execute_many(query, rows)
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        execute un groupe de requetes en un seul commit
+            
+            async with db.transaction():
+                await db.execute(...)
+                await db.execute(...)
         
-        # ==================== BUMP REMINDERS ====================
-        await self.execute("""
-            CREATE TABLE IF NOT EXISTS bump_config (
-                guild_id INTEGER PRIMARY KEY,
-                enabled INTEGER DEFAULT 0,
-                channel_id INTEGER,
-                role_id INTEGER,
-                cooldown INTEGER DEFAULT 7200,
-                message TEXT,
-                thank_message TEXT,
-                last_bump REAL DEFAULT 0,
-                last_reminder REAL DEFAULT 0
-            )
-        """)
+        une exception dans le bloc = rollback de tout le bloc
+        imbrique = SAVEPOINT, si le bloc interieur plante seul lui est annule
+        """
+        depth = self._tx_depth.get()
         
-        # Create indexes for performance
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_user_levels_guild ON user_levels(guild_id)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_user_levels_xp ON user_levels(guild_id, xp DESC)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_user_economy_guild ON user_economy(guild_id)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_mod_cases_guild ON mod_cases(guild_id)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_mod_cases_user ON mod_cases(guild_id, user_id)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_user_invites_guild ON user_invites(guild_id)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_invited_users_inviter ON invited_users(guild_id, inviter_id)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_auto_messages_next ON auto_messages(next_run)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_announced_releases ON announced_releases(guild_id, category)")
-        await self.execute("CREATE INDEX IF NOT EXISTS idx_announced_deals ON announced_deals(guild_id, platform)")
-
+        if depth:
+            savepoint = f"sp_{depth}"
+            await self.connection.execute(f"SAVEPOINT {savepoint}")
+            token = self._tx_depth.set(depth + 1)
+            try:
+                yield self
+            except BaseException:
+                await self.connection.execute(f"ROLLBACK TO {savepoint}")
+                await self.connection.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                await self.connection.execute(f"RELEASE {savepoint}")
+            finally:
+                self._tx_depth.reset(token)
+        else:
+            # le lock empeche le group commit / les autres execute() de
+            # commit notre transaction au milieu
+            start = time.perf_counter()
+            async with self._write_lock:
+                # IMMEDIATE = on prend le verrou d'ecriture tout de suite,
+                # les lectures du bloc restent valides jusqu'au commit
+                acquired = time.perf_counter()
+                await self.connection.execute("BEGIN IMMEDIATE")
+                # l'attente du lock = contention entre ecrivains
+                self.stats.record("BEGIN IMMEDIATE", (), acquired - start, time.perf_counter() - acquired)
+                token = self._tx_depth.set(1)
+                try:
+                    yield self
+                except BaseException:
+                    await self.connection.rollback()
+                    raise
+                else:
+                    started = time.perf_counter()
+                    await self.connection.commit()
+                    self.stats.record("COMMIT", (), 0, time.perf_counter() - started)
+                finally:
+                    self._tx_depth.reset(token)
+    
+    async def fetchone(self, query: str, params: tuple = (), record: Optional[type] = None) -> Any:
+        """Fetch one row (record = type a construire a la place d'un aiosqlite.Row)"""
+        # faut fermer le curseur, sinon le statement garde un snapshot
+        # ouvert et la connexion verrait plus les nouveaux commits
+        start = time.perf_counter()
+        async with self._reader() as conn:
+            acquired = time.perf_counter()
+            async with conn.execute(query, params) as cursor:
+                if record is not None:
+                    cursor.row_factory = record_factory(record)
+                row = await cursor.fetchone()
+        self.stats.record(query, params, acquired - start, time.perf_counter() - acquired)
+        return row
+    
+    async def fetchall(self, query: str, params: tuple = (), record: Optional[type] = None) -> list:
+        """Fetch all rows (record = type a construire a la place d'un aiosqlite.Row)"""
+        start = time.perf_counter()
+        async with self._reader() as conn:
+            acquired = time.perf_counter()
+            async with conn.execute(query, params) as cursor:
+                if record is not None:
+                    cursor.row_factory = record_factory(record)
+                rows = await cursor.fetchall()
+        self.stats.record(query, params, acquired - start, time.perf_counter() - acquired)
+        return rows
+    
+    async def _create_tables(self):
+        """Create all database tables"""
+        for statement in SCHEMA:
+            await self.execute(statement)
 
 # Singleton instance
 db = Database()
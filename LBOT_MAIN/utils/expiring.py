@@ -0,0 +1,165 @@
+"""
+Structures en memoire qui oublient les cles inactives
+
+les cooldowns xp et l'anti-spam etaient des dicts (guild, user) jamais
+nettoyes: une entree par membre qui a parle depuis le demarrage. ici chaque
+cle a une date d'expiration et une roue de timing (un slot par
+`resolution` secondes) la supprime quand elle tombe, sans tache de fond:
+le nettoyage avance a chaque appel et coute le nb de cles expirees
+
+- Cooldowns: cle -> fin du cooldown
+- RateTracker: cle -> timestamps recents dans un array('d') (fenetre glissante)
+
+chaque instance s'enregistre pour `!memstats` (tracker_stats())
+
+usage:
+    cooldowns = Cooldowns("xp_cooldowns")
+    if not cooldowns.hit((guild_id, user_id), 60):
+        return  # encore en cooldown
+    
+    spam = RateTracker("spam_tracker")
+    if spam.hit((guild_id, user_id), window=5) >= 5:
+        spam.reset((guild_id, user_id))
+"""
+
+import math
+import sys
+import time
+import weakref
+from array import array
+from bisect import bisect_right
+from typing import Hashable, Optional
+
+_trackers: "weakref.WeakSet[ExpiringKeys]" = weakref.WeakSet()
+
+
+class ExpiringKeys:
+    """cles avec expiration, nettoyees par une roue de timing"""
+    
+    def __init__(self, name: str, resolution: float = 1.0, slots: int = 512):
+        self.name = name
+        self.resolution = resolution
+        self._expiry: dict[Hashable, float] = {}
+        # slot = liste de (tick d'expiration, cle), une cle peut y etre plusieurs
+        # fois (re-armee), seule sa derniere expiration compte
+        self._wheel: list[list[tuple[int, Hashable]]] = [[] for _ in range(slots)]
+        self._tick: Optional[int] = None
+        self.expired = 0
+        _trackers.add(self)
+    
+    def __len__(self) -> int:
+        return len(self._expiry)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        expiry = self._expiry.get(key)
+        return expiry is not None and expiry > time.time()
+    
+    def discard(self, key: Hashable):
+        self._expiry.pop(key, None)
+    
+    def _arm(self, key: Hashable, expiry: float):
+        self._expiry[key] = expiry
+        tick = math.ceil(expiry / self.resolution)
+        self._wheel[tick % len(self._wheel)].append((tick, key))
+    
+    def _advance(self, now: float):
+        """supprime les cles expirees depuis le dernier appel"""
+        current = int(now // self.resolution)
+        if self._tick is None:
+            self._tick = current
+            return
+        
+        # apres une longue pause on fait juste un tour complet
+        steps = min(current - self._tick, len(self._wheel))
+        for tick in range(current - steps + 1, current + 1):
+            slot = self._wheel[tick % len(self._wheel)]
+            if not slot:
+                continue
+            
+            remaining = []
+            for entry in slot:
+                due, key = entry
+                if due > current:
+                    remaining.append(entry)  # tour suivant de la roue
+                    continue
+                expiry = self._expiry.get(key)
+                if expiry is not None and expiry <= now:
+                    self.discard(key)
+                    self.expired += 1
+            self._wheel[tick % len(self._wheel)] = remaining
+        
+        self._tick = max(self._tick, current)
+    
+    def memory(self) -> int:
+        """taille approximative en octets (dict + roue, hors cles partagees)"""
+        return (
+            sys.getsizeof(self._expiry)
+            + sum(sys.getsizeof(slot) for slot in self._wheel)
+        )
+    
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "keys": len(self),
+            "scheduled": sum(len(slot) for slot in self._wheel),
+            "expired": self.expired,
+            "bytes": self.memory(),
+        }
+
+
+class Cooldowns(ExpiringKeys):
+    """cle -> fin du cooldown"""
+    
+    def hit(self, key: Hashable, cooldown: float, now: Optional[float] = None) -> bool:
+        """True si la cle est libre (et relance le cooldown), False si encore en cooldown"""
+        now = time.time() if now is None else now
+        self._advance(now)
+        
+        expiry = self._expiry.get(key)
+        if expiry is not None and expiry > now:
+            return False
+        self._arm(key, now + cooldown)
+        return True
+
+
+class RateTracker(ExpiringKeys):
+    """cle -> timestamps des derniers hits (fenetre glissante)"""
+    
+    def __init__(self, name: str, resolution: float = 1.0, slots: int = 512):
+        super().__init__(name, resolution, slots)
+        self._hits: dict[Hashable, array] = {}
+    
+    def discard(self, key: Hashable):
+        super().discard(key)
+        self._hits.pop(key, None)
+    
+    def hit(self, key: Hashable, window: float, now: Optional[float] = None) -> int:
+        """ajoute un hit, retourne le nb de hits dans les `window` dernieres secondes"""
+        now = time.time() if now is None else now
+        self._advance(now)
+        
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = array("d")
+        else:
+            # les timestamps sont dans l'ordre, on coupe le debut
+            del hits[:bisect_right(hits, now - window)]
+        hits.append(now)
+        
+        self._arm(key, now + window)
+        return len(hits)
+    
+    def reset(self, key: Hashable):
+        self.discard(key)
+    
+    def memory(self) -> int:
+        return (
+            super().memory()
+            + sys.getsizeof(self._hits)
+            + sum(sys.getsizeof(hits) for hits in self._hits.values())
+        )
+
+
+def tracker_stats() -> list[dict]:
+    """stats de toutes les structures vivantes"""
+    return sorted((t.stats() for t in list(_trackers)), key=lambda s: s["name"])
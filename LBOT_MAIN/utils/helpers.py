@@ -5,11 +5,13 @@ Fonctions utilitaires - embeds, pagination, format de temps, etc.
 import discord
 from discord.ext import commands
 from datetime import datetime, timedelta
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Awaitable, Callable
 import asyncio
 import re
 import humanize
 
+from utils.xp_curve import default_curve
+
 
 # ============ EMBEDS ============
 
@@ -82,6 +84,36 @@ def info_embed(message: str, title: str = "Information") -> discord.Embed:
     )
 
 
+# limites discord: 6000 caracteres par embed (titre, description, champs,
+# footer...) et par message, 25 champs par embed
+EMBED_MAX_LENGTH = 6000
+EMBED_MAX_FIELDS = 25
+
+
+def split_embed(embed: discord.Embed) -> list[discord.Embed]:
+    """
+    decoupe un embed trop gros en plusieurs (meme titre, couleur et footer),
+    a envoyer un par message: for page in split_embed(embed): await ctx.send(embed=page)
+    """
+    if len(embed) <= EMBED_MAX_LENGTH and len(embed.fields) <= EMBED_MAX_FIELDS:
+        return [embed]
+    
+    fields = embed.fields
+    first = embed.copy()
+    first.clear_fields()
+    pages = [first]
+    for field in fields:
+        page = pages[-1]
+        size = len(field.name) + len(field.value)
+        if page.fields and (len(page.fields) >= EMBED_MAX_FIELDS or len(page) + size > EMBED_MAX_LENGTH):
+            page = discord.Embed(title=f"{embed.title} (suite)" if embed.title else None, color=embed.color)
+            if embed.footer.text:
+                page.set_footer(text=embed.footer.text)
+            pages.append(page)
+        page.add_field(name=field.name, value=field.value, inline=field.inline)
+    return pages
+
+
 # ============ PAGINATION ============
 
 class Paginator(discord.ui.View):
@@ -139,6 +171,78 @@ class Paginator(discord.ui.View):
         await interaction.response.edit_message(embed=self.pages[self.current_page], view=self)
 
 
+class KeysetPaginator(discord.ui.View):
+    """
+    Paginated embed view for big lists (leaderboards): pages are fetched on
+    demand with a cursor instead of being built upfront
+    fetch_page(cursor, page_index) -> (embed, next_cursor), next_cursor None = last page
+    find_cursor(page_index) -> cursor of that page, used by ◀️ after a direct jump
+    (start_page > 0, nothing on the stack to go back to)
+    """
+    
+    def __init__(
+        self,
+        fetch_page: Callable[[Any, int], Awaitable[tuple[discord.Embed, Any]]],
+        author_id: int,
+        start_cursor: Any = None,
+        start_page: int = 0,
+        find_cursor: Optional[Callable[[int], Awaitable[Any]]] = None,
+        timeout: float = 180
+    ):
+        super().__init__(timeout=timeout)
+        self.fetch_page = fetch_page
+        self.find_cursor = find_cursor
+        self.author_id = author_id
+        # curseur du debut de chaque page vue, pour revenir en arriere
+        self.cursors = [start_cursor]
+        self.current_page = start_page
+        self.next_cursor: Any = None
+        self.message: Optional[discord.Message] = None
+    
+    async def load(self) -> discord.Embed:
+        """fetch the current page and update the buttons"""
+        embed, self.next_cursor = await self.fetch_page(self.cursors[-1], self.current_page)
+        self.first_page.disabled = self.current_page == 0
+        self.prev_page.disabled = len(self.cursors) == 1 and (self.current_page == 0 or not self.find_cursor)
+        self.next_page.disabled = self.next_cursor is None
+        return embed
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message(
+                "Tu ne peux pas utiliser ces boutons.", ephemeral=True
+            )
+            return False
+        return True
+    
+    @discord.ui.button(emoji="⏪", style=discord.ButtonStyle.secondary)
+    async def first_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors = [None]
+        self.current_page = 0
+        await interaction.response.edit_message(embed=await self.load(), view=self)
+    
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.primary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+        else:
+            # arrive par un saut direct, on retrouve le debut de la page d'avant
+            self.cursors = [await self.find_cursor(self.current_page - 1)]
+        self.current_page -= 1
+        await interaction.response.edit_message(embed=await self.load(), view=self)
+    
+    @discord.ui.button(emoji="🗑️", style=discord.ButtonStyle.danger)
+    async def delete(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.message.delete()
+        self.stop()
+    
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.primary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.cursors.append(self.next_cursor)
+        self.current_page += 1
+        await interaction.response.edit_message(embed=await self.load(), view=self)
+
+
 class ConfirmView(discord.ui.View):
     """Confirmation dialog view"""
     
@@ -233,23 +337,18 @@ def format_datetime(timestamp: float) -> str:
 # ============ CALCULS XP/LEVEL ============
 
 def xp_for_level(level: int) -> int:
-    """Calculate total XP required for a level (exponential curve)"""
-    return int(100 * (level ** 1.5))
+    """Calculate total XP required for a level (default curve, see utils/xp_curve.py)"""
+    return default_curve.xp_for(level)
 
 
 def level_from_xp(xp: int) -> int:
-    """Calculate level from total XP"""
-    level = 0
-    while xp_for_level(level + 1) <= xp:
-        level += 1
-    return level
+    """Calculate level from total XP (default curve)"""
+    return default_curve.level_for(xp)
 
 
 def xp_progress(xp: int, level: int) -> tuple[int, int]:
-    """Return (current_xp_in_level, xp_needed_for_next_level)"""
-    current_level_xp = xp_for_level(level)
-    next_level_xp = xp_for_level(level + 1)
-    return xp - current_level_xp, next_level_xp - current_level_xp
+    """Return (current_xp_in_level, xp_needed_for_next_level) (default curve)"""
+    return default_curve.progress(xp, level)
 
 
 def progress_bar(current: int, total: int, length: int = 10) -> str:
@@ -0,0 +1,107 @@
+"""
+Filtre de liens par domaine
+
+avant check_links faisait un re.search puis un re.findall (regex recompilees
+a chaque message) et pour chaque lien `any(domaine in lien ...)` sur toute
+la liste autorisee. en plus la sous-chaine laissait passer
+`evil.com/?youtube.com` ou `youtube.com.evil.com`. ici les liens sont lus une
+fois par message, seul le nom d'hote compte, et il est cherche dans un arbre
+de suffixes (labels a l'envers: com -> youtube -> www), donc le cout depend
+de la longueur de l'hote, pas de la taille de la liste
+
+un domaine autorise couvre aussi ses sous-domaines: "youtube.com" laisse
+passer www.youtube.com et m.youtube.com, pas notyoutube.com
+
+usage:
+    matcher = LinkMatcher(["youtube.com", "https://twitch.tv/"])
+    matcher.search("regarde https://evil.com/?youtube.com")  # -> "evil.com"
+"""
+
+import re
+from typing import Optional
+
+# lien http(s), on capture juste la partie hote (+ user@ et :port eventuels)
+URL_PATTERN = re.compile(r"https?://([^\s/?#<>\\]+)", re.IGNORECASE)
+INVITE_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.)?(?:discord\.(?:gg|io|me|li)|discordapp\.com/invite)/[a-zA-Z0-9]+"
+)
+
+# marque de fin de domaine dans l'arbre (un label n'est jamais vide)
+_END = ""
+
+
+def extract_host(authority: str) -> str:
+    """user:pass@Host.com.:8080 -> host.com"""
+    host = authority.rpartition("@")[2]
+    if host.startswith("["):
+        return host[1:host.find("]")].lower()  # ipv6
+    return host.partition(":")[0].rstrip(".").lower()
+
+
+def normalize_domain(entry: str) -> str:
+    """entree de la liste autorisee -> domaine ("https://www.x.com/a", "*.x.com" -> x.com)"""
+    entry = entry.strip().lower()
+    if "://" in entry:
+        entry = entry.split("://", 1)[1]
+    entry = re.split(r"[/?#]", entry, maxsplit=1)[0]
+    domain = extract_host(entry).lstrip("*.")
+    # "www.x.com" dans la liste veut dire le site x.com
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+class DomainTrie:
+    """domaines autorises, labels ranges du plus general au plus precis"""
+    
+    __slots__ = ("_root", "_size")
+    
+    def __init__(self, domains=()):
+        self._root: dict = {}
+        self._size = 0
+        for domain in domains:
+            self.add(domain)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, domain: str):
+        node = self._root
+        for label in reversed(domain.split(".")):
+            node = node.setdefault(label, {})
+        if _END not in node:
+            node[_END] = True
+            self._size += 1
+    
+    def allows(self, host: str) -> bool:
+        """True si host est un domaine de la liste ou un de ses sous-domaines"""
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+
+def find_hosts(text: str) -> list[str]:
+    """hotes des liens http(s) du message, dans l'ordre"""
+    if "://" not in text:
+        return []
+    return [extract_host(authority) for authority in URL_PATTERN.findall(text)]
+
+
+class LinkMatcher:
+    """liste de domaines autorises compilee"""
+    
+    __slots__ = ("trie",)
+    
+    def __init__(self, allowed: list[str]):
+        domains = (normalize_domain(d) for d in allowed if isinstance(d, str))
+        self.trie = DomainTrie(d for d in domains if d)
+    
+    def search(self, text: str) -> Optional[str]:
+        """premier hote non autorise, None si tous les liens passent (ou aucun lien)"""
+        for host in find_hosts(text):
+            if not self.trie.allows(host):
+                return host
+        return None
@@ -0,0 +1,222 @@
+"""
+Maintenance de la DB en tache de fond
+
+sans ca le WAL grossit, les pages liberees restent dans le fichier et le
+planner de sqlite a jamais de stats. toutes les DB_MAINT_INTERVAL secondes:
+- checkpoint PASSIVE (copie le WAL dans la db sans bloquer personne)
+- si le trafic est bas (< DB_MAINT_IDLE_QPS requetes/s depuis le dernier tour):
+    - checkpoint TRUNCATE si le WAL depasse DB_MAINT_WAL_MB (remet le fichier a 0),
+      seulement si le PASSIVE a tout copie: il reste juste a tronquer, et
+      l'attente des lecteurs est bornee par ce qui reste du budget
+    - PRAGMA optimize (ANALYZE des tables qui en ont besoin), max une fois par heure
+    - incremental_vacuum par petits paquets de pages tant qu'il reste du budget
+
+chaque etape passe par le lock d'ecriture dans le thread aiosqlite donc la
+boucle d'events est jamais bloquee. le budget DB_MAINT_BUDGET_MS est verifie
+avant chaque etape et borne l'attente du TRUNCATE et le vacuum; une etape
+commencee va au bout (le PASSIVE, et optimize dont le cout est borne par
+analysis_limit), un tour peut donc depasser un peu le budget
+
+usage:
+    from utils.maintenance import maintenance
+    maintenance.start()          # dans setup_hook, apres db/shards.connect()
+    await maintenance.run(force=True)
+    reports = await maintenance.report()
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from utils.database import Database, db
+from utils.sharding import shards
+from utils.retention import retention
+
+logger = logging.getLogger('database')
+
+# secondes entre deux tours de maintenance
+DB_MAINT_INTERVAL = int(os.getenv("DB_MAINT_INTERVAL", "300"))
+# temps max (ms) passe a bloquer l'ecrivain par tour et par fichier
+DB_MAINT_BUDGET_MS = int(os.getenv("DB_MAINT_BUDGET_MS", "250"))
+# en dessous de ce trafic (requetes/s) on considere que c'est l'heure creuse
+DB_MAINT_IDLE_QPS = float(os.getenv("DB_MAINT_IDLE_QPS", "5"))
+# taille du WAL (Mo) au dela de laquelle on le tronque
+DB_MAINT_WAL_MB = int(os.getenv("DB_MAINT_WAL_MB", "64"))
+
+OPTIMIZE_EVERY = 3600
+VACUUM_STEP_PAGES = 256
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+@dataclass
+class MaintenanceState:
+    """ce qui s'est passe au dernier tour pour un fichier"""
+    last_run: float = 0
+    last_duration: float = 0
+    last_checkpoint: Optional[tuple] = None  # (busy, pages du WAL, pages copiees)
+    last_truncate: float = 0
+    last_optimize: float = 0
+    pages_vacuumed: int = 0
+    errors: list = field(default_factory=list)
+
+
+def file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class DatabaseMaintenance:
+    """checkpoints, optimize et vacuum incremental sur la db et ses shards"""
+    
+    def __init__(
+        self,
+        interval: int = DB_MAINT_INTERVAL,
+        budget_ms: int = DB_MAINT_BUDGET_MS,
+        idle_qps: float = DB_MAINT_IDLE_QPS,
+        wal_limit_mb: int = DB_MAINT_WAL_MB
+    ):
+        self.interval = interval
+        self.budget = budget_ms / 1000
+        self.idle_qps = idle_qps
+        self.wal_limit = wal_limit_mb * 1024 * 1024
+        self._state: dict[str, MaintenanceState] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._last_tick = time.monotonic()
+        self._last_queries = 0
+    
+    @property
+    def databases(self) -> list[Database]:
+        """le fichier central, les shards s'il y en a et l'archive"""
+        databases = [db] + [s for s in shards.all if s is not db]
+        if retention.archive.connection:
+            databases.append(retention.archive)
+        return databases
+    
+    def state(self, database: Database) -> MaintenanceState:
+        return self._state.setdefault(database.db_path, MaintenanceState())
+    
+    # ---- SCHEDULER ----
+    
+    def start(self):
+        if self.interval > 0 and not self._task:
+            self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Maintenance DB: {e}")
+    
+    def current_qps(self) -> float:
+        """requetes/s depuis le dernier tour (toutes bases confondues, stats partagees)"""
+        now = time.monotonic()
+        total = db.stats.total_queries
+        elapsed = max(now - self._last_tick, 1e-6)
+        qps = (total - self._last_queries) / elapsed
+        self._last_tick, self._last_queries = now, total
+        return qps
+    
+    async def run(self, force: bool = False):
+        """un tour de maintenance, force = on ignore le trafic"""
+        idle = force or self.current_qps() < self.idle_qps
+        for database in self.databases:
+            await self.maintain(database, idle)
+    
+    async def maintain(self, database: Database, idle: bool):
+        state = self.state(database)
+        start = time.perf_counter()
+        deadline = start + self.budget
+        
+        try:
+            # passif = copie ce qu'il peut sans attendre les lecteurs, toujours safe
+            state.last_checkpoint = await database.checkpoint("PASSIVE")
+            
+            if idle:
+                # WAL deja copie en entier (busy 0, pages copiees = pages du WAL):
+                # le TRUNCATE a plus qu'a remettre le fichier a 0
+                checkpoint = state.last_checkpoint
+                copied = checkpoint is not None and checkpoint[0] == 0 and checkpoint[1] == checkpoint[2]
+                remaining = deadline - time.perf_counter()
+                if copied and remaining > 0 and file_size(f"{database.db_path}-wal") > self.wal_limit:
+                    result = await database.checkpoint("TRUNCATE", busy_timeout_ms=max(1, int(remaining * 1000)))
+                    if result and result[0] == 0:
+                        state.last_truncate = time.time()
+                
+                if time.time() - state.last_optimize > OPTIMIZE_EVERY and time.perf_counter() < deadline:
+                    # analysis_limit borne le cout de l'ANALYZE fait par optimize
+                    await database.pragma("PRAGMA analysis_limit = 400")
+                    await database.pragma("PRAGMA optimize")
+                    state.last_optimize = time.time()
+                
+                state.pages_vacuumed += await self.incremental_vacuum(database, deadline)
+        except Exception as e:
+            state.errors = (state.errors + [f"{time.strftime('%H:%M:%S')} {e}"])[-5:]
+            logger.warning(f"Maintenance {database.db_path}: {e}")
+        
+        state.last_run = time.time()
+        state.last_duration = time.perf_counter() - start
+    
+    async def incremental_vacuum(self, database: Database, deadline: float) -> int:
+        """rend les pages libres au disque par paquets, tant qu'il reste du budget"""
+        if (await database.pragma("PRAGMA auto_vacuum"))[0][0] != 2:
+            return 0
+        
+        initial = free = (await database.pragma("PRAGMA freelist_count"))[0][0]
+        while free > 0 and time.perf_counter() < deadline:
+            await database.pragma(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})")
+            free = (await database.pragma("PRAGMA freelist_count"))[0][0]
+        return initial - free
+    
+    async def full_vacuum(self, database: Database):
+        """
+        VACUUM complet + passage en auto_vacuum incremental
+        bloque les ecritures de ce fichier pendant toute la duree, a lancer a la main
+        """
+        await database.pragma("PRAGMA auto_vacuum = INCREMENTAL")
+        await database.pragma("VACUUM")
+        await database.pragma("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    # ---- REPORT ----
+    
+    async def report(self) -> list[dict]:
+        """taille, WAL et pages de chaque fichier + dernier tour de maintenance"""
+        reports = []
+        for database in self.databases:
+            # sur la connexion d'ecriture: les lecteurs gardent en cache l'entete du fichier
+            page_size = (await database.pragma("PRAGMA page_size"))[0][0]
+            page_count = (await database.pragma("PRAGMA page_count"))[0][0]
+            freelist = (await database.pragma("PRAGMA freelist_count"))[0][0]
+            auto_vacuum = (await database.pragma("PRAGMA auto_vacuum"))[0][0]
+            
+            reports.append({
+                "name": Path(database.db_path).name,
+                "size": file_size(database.db_path),
+                "wal_size": file_size(f"{database.db_path}-wal"),
+                "page_size": page_size,
+                "page_count": page_count,
+                "freelist_count": freelist,
+                "auto_vacuum": AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum)),
+                "state": self.state(database),
+            })
+        return reports
+
+
+# Singleton instance
+maintenance = DatabaseMaintenance()
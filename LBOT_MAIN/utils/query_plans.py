@@ -0,0 +1,254 @@
+"""
+Regression des plans de requetes (EXPLAIN QUERY PLAN)
+
+recupere toutes les requetes SQL ecrites en dur dans les repos et les cogs
+(premier argument de execute/fetchone/fetchall/execute_many), les joue en
+EXPLAIN QUERY PLAN sur une db remplie de donnees synthetiques + ANALYZE,
+et echoue si:
+- une grosse table est lue en entier (SCAN sans index)
+- un tri passe par un B-tree temporaire (USE TEMP B-TREE)
+- une requete de EXPECTED_INDEXES utilise pas l'index prevu
+
+a lancer avant un deploy / apres avoir touche au schema:
+    python -m utils.query_plans          # exit 1 si regression
+    python -m utils.query_plans -v       # affiche tous les plans
+
+les requetes construites en f-string sont ignorees (nom de table dynamique)
+"""
+
+import ast
+import random
+import re
+import sqlite3
+import string
+import sys
+from pathlib import Path
+
+from utils.database import SCHEMA
+from utils.migrations import MIGRATIONS_DIR
+
+ROOT = Path(__file__).parent.parent
+SOURCES = ["bot.py", "cogs/*.py", "utils/repositories/*.py"]
+DB_METHODS = {"execute", "fetchone", "fetchall", "execute_many"}
+
+GUILDS = 200
+
+# tables qui grossissent avec le nb de membres/messages -> un SCAN dessus = regression
+# (valeur = nb de lignes synthetiques)
+LARGE_TABLES = {
+    "user_levels": 60000,
+    "user_economy": 60000,
+    "user_inventory": 20000,
+    "mod_cases": 30000,
+    "warnings": 10000,
+    "giveaways": 5000,
+    "giveaway_entries": 60000,
+    "user_birthdays": 30000,
+    "user_invites": 20000,
+    "invited_users": 40000,
+    "announced_releases": 30000,
+    "announced_deals": 10000,
+    "tickets": 10000,
+    "temp_punishments": 3000,
+    "starboard_messages": 20000,
+    "auto_messages": 3000,
+    "suggestions": 10000,
+    "reminders": 5000,
+}
+
+# scans / tris voulus: (bout de la requete, raison)
+ALLOWED = [
+    ("ORDER BY RANDOM()", "tirage au sort, le tri porte que sur les lignes de la guild (via index)"),
+    ("ORDER BY i.name", "inventaire d'un membre, quelques lignes a trier"),
+]
+
+# requetes qui doivent passer par un index precis: (bout de la requete, index)
+EXPECTED_INDEXES = [
+    ("ORDER BY net_worth DESC", "idx_user_economy_net_worth"),
+    ("WHERE ended = 0 AND end_time <= ?", "idx_giveaways_pending"),
+    ("WHERE guild_id = ? AND day = ? AND month = ?", "idx_user_birthdays_date"),
+]
+
+
+# ============ EXTRACTION ============
+
+def extract_queries() -> tuple[list[tuple[str, int, str]], int]:
+    """
+    requetes SQL en dur dans les sources: [(fichier, ligne, sql)]
+    + nb de requetes dynamiques (f-string) ignorees
+    """
+    queries = []
+    dynamic = 0
+    for pattern in SOURCES:
+        for path in sorted(ROOT.glob(pattern)):
+            tree = ast.parse(path.read_text(encoding="utf-8"))
+            for node in ast.walk(tree):
+                if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+                    continue
+                if node.func.attr not in DB_METHODS or not node.args:
+                    continue
+                arg = node.args[0]
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                    sql = " ".join(arg.value.split())
+                    if sql.split(" ", 1)[0].upper() in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE"):
+                        queries.append((str(path.relative_to(ROOT)), node.lineno, sql))
+                elif isinstance(arg, ast.JoinedStr):
+                    dynamic += 1
+    return queries, dynamic
+
+
+# ============ DONNEES SYNTHETIQUES ============
+
+def fake_value(column: str, col_type: str, rng: random.Random):
+    """valeur plausible selon le nom/type de colonne"""
+    name = column.lower()
+    if name == "guild_id":
+        # quelques grosses guilds et beaucoup de petites, comme en vrai
+        return int(rng.paretovariate(1.2)) % GUILDS + 1
+    if name == "day":
+        return rng.randint(1, 28)
+    if name == "month":
+        return rng.randint(1, 12)
+    if name == "status":
+        return rng.choice(("open", "closed", "closed", "closed"))
+    if name in ("ended", "active", "enabled", "sent", "won", "is_fake"):
+        return rng.randint(0, 1)
+    if name == "action":
+        return rng.choice(("warn", "mute", "kick", "ban"))
+    if name.endswith("_id") or name == "id":
+        return rng.randint(1, 10 ** 12)
+    if "REAL" in col_type or name.endswith(("_at", "_time")):
+        return 1.7e9 + rng.random() * 1e7
+    if "INT" in col_type:
+        return rng.randint(0, 100000)
+    return "".join(rng.choices(string.ascii_lowercase, k=8))
+
+
+def build_database() -> sqlite3.Connection:
+    """db en memoire avec le schema complet, les migrations et des donnees"""
+    conn = sqlite3.connect(":memory:")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    for file in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        conn.executescript(file.read_text(encoding="utf-8"))
+    
+    rng = random.Random(42)
+    for table, count in LARGE_TABLES.items():
+        info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+        # on laisse sqlite generer les INTEGER PRIMARY KEY
+        columns = [(c[1], c[2].upper()) for c in info if not (c[5] and c[2].upper() == "INTEGER" and c[1] == "id")]
+        names = ", ".join(c[0] for c in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({names}) VALUES ({placeholders})",
+            ([fake_value(name, col_type, rng) for name, col_type in columns] for _ in range(count))
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+    return conn
+
+
+# ============ VERIFICATION ============
+
+def explain(conn: sqlite3.Connection, sql: str) -> list[str]:
+    """les lignes 'detail' du plan (les ? sont lies a 1)"""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", [1] * sql.count("?")).fetchall()
+    return [r[3] for r in rows]
+
+
+# mots qui peuvent suivre un nom de table sans etre un alias
+NOT_ALIASES = {
+    "WHERE", "JOIN", "LEFT", "INNER", "CROSS", "OUTER", "ON", "USING", "SET",
+    "ORDER", "GROUP", "LIMIT", "VALUES", "DEFAULT", "SELECT", "UNION", "HAVING",
+    "NATURAL", "INDEXED", "NOT", "AS", "RETURNING", "WINDOW", "EXCEPT", "INTERSECT",
+}
+TABLE_REF = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+# tables en plus apres une virgule: FROM a x, b y
+COMMA_REF = re.compile(r",\s*(\w+)(?:\s+(?:AS\s+)?(\w+))?")
+
+
+def table_aliases(sql: str) -> dict[str, str]:
+    """alias -> table d'apres les FROM/JOIN (la table est aussi son propre alias)"""
+    aliases = {}
+    refs = list(TABLE_REF.finditer(sql))
+    for match in refs:
+        # FROM a x, b y: on lit la liste jusqu'au prochain mot-cle
+        rest = sql[match.end():]
+        tail = re.match(r"(?:\s*,\s*\w+(?:\s+(?:AS\s+)?\w+)?)*", rest, re.IGNORECASE).group(0)
+        for table, alias in [match.groups()] + COMMA_REF.findall(tail):
+            aliases.setdefault(table, table)
+            if alias and alias.upper() not in NOT_ALIASES:
+                aliases[alias] = table
+    return aliases
+
+
+def scanned_table(detail: str, aliases: dict[str, str]):
+    """
+    table lue en entier d'une ligne du plan, None si c'est un parcours d'index
+    "SCAN t" (sqlite >= 3.36) ou "SCAN TABLE user_levels AS t" (avant)
+    """
+    words = detail.split()
+    if not words or words[0] != "SCAN" or "USING" in words:
+        return None
+    rest = words[1:]
+    if rest and rest[0] == "TABLE":
+        rest = rest[1:]
+    if not rest:
+        return None
+    return aliases.get(rest[0], rest[0])
+
+
+def check_plan(sql: str, plan: list[str]) -> list[str]:
+    """problemes du plan, vide si ok"""
+    if any(fragment in sql for fragment, _ in ALLOWED):
+        return []
+    
+    aliases = table_aliases(sql)
+    problems = []
+    for detail in plan:
+        # "SCAN ue" = table lue en entier, "SCAN ue USING INDEX ..." = parcours d'index
+        table = scanned_table(detail, aliases)
+        if table in LARGE_TABLES:
+            problems.append(f"full scan de {table}")
+        if "USE TEMP B-TREE" in detail:
+            problems.append(detail.lower())
+    
+    for fragment, index in EXPECTED_INDEXES:
+        if fragment in sql and not any(index in detail for detail in plan):
+            problems.append(f"index {index} pas utilise")
+    return problems
+
+
+def run(verbose: bool = False) -> int:
+    """verifie toutes les requetes, retourne le nb de regressions"""
+    queries, dynamic = extract_queries()
+    conn = build_database()
+    
+    failures = 0
+    seen = set()
+    for file, line, sql in queries:
+        if sql in seen:
+            continue
+        seen.add(sql)
+        
+        try:
+            plan = explain(conn, sql)
+        except sqlite3.Error as e:
+            failures += 1
+            print(f"ERREUR {file}:{line}: {e}\n  {sql}")
+            continue
+        
+        problems = check_plan(sql, plan)
+        if problems:
+            failures += 1
+            print(f"REGRESSION {file}:{line}: {', '.join(problems)}\n  {sql}")
+        if problems or verbose:
+            for detail in plan:
+                print(f"    {detail}")
+    
+    print(f"{len(seen)} requetes verifiees, {dynamic} dynamiques ignorees, {failures} probleme(s)")
+    return failures
+
+
+if __name__ == "__main__":
+    sys.exit(1 if run("-v" in sys.argv) else 0)
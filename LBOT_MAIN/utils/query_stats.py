@@ -0,0 +1,139 @@
+"""
+Stats des requetes SQL - latence par requete normalisee
+
+Database mesure pour chaque requete:
+- l'attente: connexion du pool, lock d'ecriture ou file du group commit
+- l'execution: le temps passe dans sqlite
+
+les percentiles (p50/p95/p99) sont calcules sur une fenetre glissante
+des N derniers appels de chaque requete, les requetes au dessus du seuil
+sont loggees avec la forme des params (types, pas les valeurs)
+"""
+
+import logging
+import os
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger('database')
+
+# seuil du slow query log en ms (attente + execution)
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
+# nb d'appels gardes par requete pour les percentiles
+STATS_WINDOW = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@lru_cache(maxsize=2048)
+def normalize_query(query: str) -> str:
+    """
+    une ligne, litteraux remplaces par ?, listes IN (?, ?, ?) fusionnees
+    pour que les variantes d'une meme requete tombent dans la meme stat
+    """
+    q = _WHITESPACE.sub(" ", query).strip()
+    q = _STRING.sub("?", q)
+    q = _NUMBER.sub("?", q)
+    q = _IN_LIST.sub("(?...)", q)
+    return q
+
+
+def params_shape(params) -> str:
+    """forme des params pour les logs: (int, int, str) sans les valeurs"""
+    if not params:
+        return "()"
+    return "(" + ", ".join(type(p).__name__ for p in params) + ")"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """percentile d'une liste deja triee"""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, round(pct / 100 * (len(samples) - 1)))
+    return samples[index]
+
+
+@dataclass
+class QueryStat:
+    """stats d'une requete normalisee"""
+    query: str
+    count: int = 0
+    total_exec: float = 0
+    total_wait: float = 0
+    max_exec: float = 0
+    exec_times: deque = field(default_factory=lambda: deque(maxlen=STATS_WINDOW))
+    wait_times: deque = field(default_factory=lambda: deque(maxlen=STATS_WINDOW))
+    
+    def percentiles(self) -> dict:
+        """p50/p95/p99 en secondes sur la fenetre (execution et attente)"""
+        execs = sorted(self.exec_times)
+        waits = sorted(self.wait_times)
+        return {
+            "exec": {p: percentile(execs, p) for p in (50, 95, 99)},
+            "wait": {p: percentile(waits, p) for p in (50, 95, 99)},
+        }
+
+
+class QueryStats:
+    """collecte les latences de toutes les requetes de Database"""
+    
+    def __init__(self, slow_threshold_ms: float = DB_SLOW_QUERY_MS):
+        self.slow_threshold = slow_threshold_ms / 1000
+        self._stats: dict[str, QueryStat] = {}
+        # compteur global, sert a mesurer le trafic (maintenance en heure creuse)
+        self.total_queries = 0
+        # dernieres slow queries pour la commande owner
+        self.slow_queries: deque = deque(maxlen=20)
+    
+    def record(self, query: str, params, wait: float, exec_time: float):
+        """enregistre un appel (temps en secondes)"""
+        self.total_queries += 1
+        normalized = normalize_query(query)
+        stat = self._stats.get(normalized)
+        if stat is None:
+            stat = self._stats[normalized] = QueryStat(normalized)
+        
+        stat.count += 1
+        stat.total_exec += exec_time
+        stat.total_wait += wait
+        stat.max_exec = max(stat.max_exec, exec_time)
+        stat.exec_times.append(exec_time)
+        stat.wait_times.append(wait)
+        
+        total = wait + exec_time
+        if self.slow_threshold and total >= self.slow_threshold:
+            shape = params_shape(params)
+            self.slow_queries.append((normalized, shape, wait, exec_time))
+            logger.warning(
+                f"Slow query {total * 1000:.1f}ms "
+                f"(attente {wait * 1000:.1f}ms, exec {exec_time * 1000:.1f}ms) "
+                f"params={shape}: {normalized}"
+            )
+    
+    def top(self, limit: int = 10, sort: str = "total") -> list[QueryStat]:
+        """
+        requetes les plus couteuses
+        sort: total (temps cumule), count, p99, wait
+        """
+        keys = {
+            "total": lambda s: s.total_exec + s.total_wait,
+            "count": lambda s: s.count,
+            "p99": lambda s: percentile(sorted(s.exec_times), 99),
+            "wait": lambda s: s.total_wait,
+        }
+        key = keys.get(sort, keys["total"])
+        return sorted(self._stats.values(), key=key, reverse=True)[:limit]
+    
+    def get(self, query: str) -> Optional[QueryStat]:
+        return self._stats.get(normalize_query(query))
+    
+    def reset(self):
+        """remet les compteurs a zero"""
+        self._stats.clear()
+        self.slow_queries.clear()
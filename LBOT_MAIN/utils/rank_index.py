@@ -0,0 +1,67 @@
+"""
+Index de classement en memoire
+
+avant !rank faisait un COUNT(*) sur tous les membres qui ont plus d'xp et le
+leaderboard un OFFSET qui relit toutes les lignes des pages d'avant. ici
+chaque serveur a un tableau trie de (-xp, user_id): rang, percentile et
+n'importe quelle page se lisent par bisect + slice
+
+les cles sont des tuples, donc a xp egale l'ordre est celui des user_id
+(stable d'une page a l'autre, contrairement au ORDER BY xp DESC d'avant)
+
+usage:
+    index = RankIndex((user_id, xp) for ...)   # construit depuis la db
+    index.update(user_id, xp)                  # a chaque ecriture d'xp
+    index.rank(user_id)                        # 1 = premier
+    index.page(offset, limit)                  # user_ids de la page
+"""
+
+from bisect import bisect_left, insort
+from typing import Iterable
+
+
+class RankIndex:
+    """classement d'un serveur par xp decroissante"""
+    
+    __slots__ = ("_keys", "_xp")
+    
+    def __init__(self, entries: Iterable[tuple[int, int]] = ()):
+        self._xp: dict[int, int] = dict(entries)
+        self._keys: list[tuple[int, int]] = sorted((-xp, user_id) for user_id, xp in self._xp.items())
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._xp
+    
+    def update(self, user_id: int, xp: int):
+        """nouvelle xp d'un membre (ajoute si absent)"""
+        old = self._xp.get(user_id)
+        if old == xp:
+            return
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+        self._xp[user_id] = xp
+        insort(self._keys, (-xp, user_id))
+    
+    def remove(self, user_id: int):
+        old = self._xp.pop(user_id, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+    
+    def rank(self, user_id: int) -> int:
+        """1 + nombre de membres avec strictement plus d'xp (absent = 0 xp)"""
+        xp = self._xp.get(user_id, 0)
+        # (-xp,) est avant tous les (-xp, user_id)
+        return bisect_left(self._keys, (-xp,)) + 1
+    
+    def percentile(self, user_id: int) -> float:
+        """part des membres (en %) classes devant ou a egalite, 1.0 = top 1%"""
+        if not self._keys:
+            return 100.0
+        return min(100.0, 100 * self.rank(user_id) / len(self._keys))
+    
+    def page(self, offset: int, limit: int) -> list[int]:
+        """user_ids classes de offset a offset + limit"""
+        return [user_id for _, user_id in self._keys[offset:offset + limit]]
@@ -5,28 +5,64 @@ le but c'est de separer la logique DB des cogs
 comme ca on peut tester les cogs sans DB et c'est plus clean
 """
 
+import asyncio
+import logging
+import os
+import random
 import time
 import json
+from collections import OrderedDict
 from typing import Optional, Any, TypeVar, Generic
 from dataclasses import dataclass, asdict
 
 from utils.database import db
+from utils.config_sync import config_sync
+
+logger = logging.getLogger('database')
+
+# nb max de guilds gardees par cache de config (LRU)
+CONFIG_CACHE_SIZE = int(os.getenv("CONFIG_CACHE_SIZE", "10000"))
+# duree de vie d'une config en cache (s), les modifs du dashboard arrivent
+# via utils/config_sync.py donc ca peut etre long
+CONFIG_CACHE_TTL = int(os.getenv("CONFIG_CACHE_TTL", "21600"))
 
 
 # ============ CONFIG CACHE ============
 
+# tous les caches crees (un par repo), pour le warm-up au demarrage
+_caches: list["ConfigCache"] = []
+
+
+async def warm_config_caches() -> int:
+    """remplit tous les caches de config, une requete par table"""
+    return sum([await cache.warm() for cache in _caches])
+
+
 class ConfigCache:
     """
     cache les configs avec un TTL
     evite de faire json.loads() sur chaque message
+    
+    - LRU borne a max_size guilds (les moins utilisees sortent en premier)
+    - single-flight: un seul _fetch en cours par guild, les appels
+      concurrents attendent le meme chargement
+    - stale-while-revalidate: une entree expiree depuis moins de stale_ttl
+      est servie direct pendant qu'un refresh tourne en fond
+    - abonne a config_sync: une modif de la table (dashboard...) vide la guild
     """
     
-    def __init__(self, table: str, ttl: int = 60):
+    def __init__(self, table: str, ttl: int = CONFIG_CACHE_TTL, max_size: int = CONFIG_CACHE_SIZE, stale_ttl: Optional[int] = None):
         self.table = table
         self.ttl = ttl
-        self._cache: dict[int, tuple[float, dict]] = {}
+        self.max_size = max_size
+        # par defaut on sert une valeur perimee pendant encore un TTL
+        self.stale_ttl = ttl if stale_ttl is None else stale_ttl
+        self._cache: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._inflight: dict[int, asyncio.Task] = {}
         # champs json a parser automatiquement
         self._json_fields: list[str] = []
+        config_sync.subscribe(table, self.invalidate)
+        _caches.append(self)
     
     def set_json_fields(self, fields: list[str]):
         """definit les champs a parser en json au chargement"""
@@ -34,16 +70,51 @@ class ConfigCache:
     
     async def get(self, guild_id: int) -> dict:
         """recup config du cache ou de la db"""
-        now = time.time()
-        
-        if guild_id in self._cache:
-            cached_at, config = self._cache[guild_id]
-            if now - cached_at < self.ttl:
+        entry = self._cache.get(guild_id)
+        if entry is not None:
+            cached_at, config = entry
+            age = time.monotonic() - cached_at
+            if age < self.ttl + self.stale_ttl:
+                self._cache.move_to_end(guild_id)
+                if age >= self.ttl:
+                    # perime: on sert quand meme et on recharge en fond
+                    self._load(guild_id)
                 return config
         
-        config = await self._fetch(guild_id)
-        self._cache[guild_id] = (now, config)
-        return config
+        # shield: si l'appelant est annule, le chargement partage continue
+        return await asyncio.shield(self._load(guild_id))
+    
+    def _load(self, guild_id: int) -> asyncio.Task:
+        """lance le chargement d'une guild, ou retourne celui deja en cours"""
+        task = self._inflight.get(guild_id)
+        if task is None:
+            task = asyncio.create_task(self._load_and_store(guild_id))
+            task.add_done_callback(self._log_error)
+            self._inflight[guild_id] = task
+        return task
+    
+    async def _load_and_store(self, guild_id: int) -> dict:
+        task = asyncio.current_task()
+        try:
+            config = await self._fetch(guild_id)
+            # invalide pendant le chargement -> resultat peut etre deja perime, on le garde pas
+            if self._inflight.get(guild_id) is task:
+                self._store(guild_id, config)
+            return config
+        finally:
+            if self._inflight.get(guild_id) is task:
+                del self._inflight[guild_id]
+    
+    def _store(self, guild_id: int, config: dict):
+        self._cache[guild_id] = (time.monotonic(), config)
+        self._cache.move_to_end(guild_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+    
+    def _log_error(self, task: asyncio.Task):
+        # refresh en fond: personne await la task, faut logger l'erreur ici
+        if not task.cancelled() and task.exception():
+            logger.warning(f"ConfigCache {self.table}: {task.exception()}")
     
     async def _fetch(self, guild_id: int) -> dict:
         """charge depuis la db"""
@@ -66,9 +137,11 @@ class ConfigCache:
         if not row:
             return {}
         
+        return self._parse(row)
+    
+    def _parse(self, row) -> dict:
+        """row -> dict avec les champs json parses"""
         config = dict(row)
-        
-        # parse les champs json
         for field in self._json_fields:
             if field in config and config[field]:
                 try:
@@ -78,13 +151,29 @@ class ConfigCache:
         
         return config
     
+    async def warm(self) -> int:
+        """
+        charge toute la table en une requete (demarrage), retourne le nb de guilds
+        evite une rafale de _fetch quand la gateway rejoue les events au boot
+        """
+        rows = await db.fetchall(f"SELECT * FROM {self.table} LIMIT ?", (self.max_size,))
+        now = time.monotonic()
+        for row in rows:
+            # etale les expirations sur 10% du TTL, sinon tout expire au meme moment
+            cached_at = now - random.random() * self.ttl * 0.1
+            self._cache[row["guild_id"]] = (cached_at, self._parse(row))
+        return len(rows)
+    
     def invalidate(self, guild_id: int):
         """vide le cache pour un serveur (apres modif)"""
         self._cache.pop(guild_id, None)
+        # un chargement en cours a pu lire l'ancienne valeur, le prochain get relance
+        self._inflight.pop(guild_id, None)
     
     def clear(self):
         """vide tout le cache"""
         self._cache.clear()
+        self._inflight.clear()
 
 
 # ============ BASE REPOSITORY ============
@@ -129,3 +218,39 @@ class BaseRepository(Generic[T]):
             (guild_id,)
         )
         return row["count"] if row else 0
+    
+    # ---- BULK ----
+    
+    async def bulk_insert(self, rows: list[dict], ignore_conflicts: bool = False) -> int:
+        """
+        insere plein de rows d'un coup (un statement, un commit)
+        toutes les rows doivent avoir les memes cles
+        """
+        if not rows:
+            return 0
+        
+        columns = list(rows[0])
+        placeholders = ", ".join("?" for _ in columns)
+        verb = "INSERT OR IGNORE" if ignore_conflicts else "INSERT"
+        
+        return await db.execute_many(
+            f"{verb} INTO {self.table} ({', '.join(columns)}) VALUES ({placeholders})",
+            [tuple(r[c] for c in columns) for r in rows]
+        )
+    
+    async def bulk_upsert(self, rows: list[dict], update: Optional[dict[str, str]] = None) -> int:
+        """
+        upsert plein de rows d'un coup, conflit sur primary_keys
+        update: voir Database.upsert_many (defaut = ecrase les colonnes)
+        """
+        if not rows:
+            return 0
+        
+        columns = list(rows[0])
+        return await db.upsert_many(
+            self.table,
+            columns,
+            [tuple(r[c] for c in columns) for r in rows],
+            conflict=self.primary_keys,
+            update=update
+        )
@@ -0,0 +1,53 @@
+"""
+Repository Configs - config des modules qui ont pas de repo a eux
+
+welcome, tickets, starboard, birthdays, invites, releases, gamedeals:
+avant chaque cog faisait SELECT (+ INSERT OR IGNORE + SELECT) a chaque
+appel, starboard meme a chaque reaction. maintenant tout passe par
+ConfigCache (LRU, warm-up au demarrage, invalidation dashboard)
+"""
+
+from typing import Optional
+
+from utils.database import db
+from utils.repositories import ConfigCache
+
+
+class ModuleConfigRepository:
+    """config d'un module (une ligne par guild dans `table`)"""
+    
+    def __init__(self, table: str, json_fields: Optional[list[str]] = None):
+        self.table = table
+        self.config_cache = ConfigCache(table)
+        if json_fields:
+            self.config_cache.set_json_fields(json_fields)
+    
+    async def get_config(self, guild_id: int) -> dict:
+        """config du serveur (avec cache), creee avec les defauts si besoin"""
+        return await self.config_cache.get(guild_id)
+    
+    async def update_config(self, guild_id: int, **kwargs) -> None:
+        """met a jour la config (cree la ligne si besoin)"""
+        if not kwargs:
+            return
+        
+        columns = ", ".join(kwargs)
+        placeholders = ", ".join("?" for _ in kwargs)
+        set_clause = ", ".join(f"{k} = excluded.{k}" for k in kwargs)
+        
+        await db.execute(
+            f"""INSERT INTO {self.table} (guild_id, {columns}) VALUES (?, {placeholders})
+                ON CONFLICT(guild_id) DO UPDATE SET {set_clause}""",
+            (guild_id, *kwargs.values())
+        )
+        self.config_cache.invalidate(guild_id)
+
+
+# singletons
+welcome_config_repo = ModuleConfigRepository("welcome_config")
+tickets_config_repo = ModuleConfigRepository("ticket_config")
+starboard_config_repo = ModuleConfigRepository("starboard_config")
+birthdays_config_repo = ModuleConfigRepository("birthday_config")
+invites_config_repo = ModuleConfigRepository("invite_config")
+releases_config_repo = ModuleConfigRepository("releases_config")
+gamedeals_config_repo = ModuleConfigRepository("gamedeals_config")
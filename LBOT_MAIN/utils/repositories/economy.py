@@ -9,10 +9,11 @@ from dataclasses import dataclass
 from typing import Optional
 
 from utils.database import db
+from utils.sharding import shards
 from utils.repositories import ConfigCache
 
 
-@dataclass
+@dataclass(slots=True)
 class UserEconomy:
     """donnees eco d'un user"""
     guild_id: int
@@ -22,9 +23,10 @@ class UserEconomy:
     last_daily: float = 0
     last_work: float = 0
     total_earned: int = 0
+    net_worth: int = 0  # balance + bank, tenu a jour par trigger (migration 011)
 
 
-@dataclass
+@dataclass(slots=True)
 class ShopItem:
     """article du shop"""
     id: int
@@ -38,7 +40,7 @@ class ShopItem:
     created_at: float = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class InventoryItem:
     """item dans l'inventaire"""
     id: int
@@ -53,7 +55,7 @@ class EconomyRepository:
     """acces aux donnees economy"""
     
     def __init__(self):
-        self.config_cache = ConfigCache("economy_config", ttl=60)
+        self.config_cache = ConfigCache("economy_config")
         self.config_cache.set_json_fields(["booster_roles"])
     
     # ---- CONFIG ----
@@ -77,27 +79,25 @@ class EconomyRepository:
     # ---- USERS ----
     
     async def get_user(self, guild_id: int, user_id: int) -> Optional[UserEconomy]:
-        row = await db.fetchone(
+        return await shards.for_guild(guild_id).fetchone(
             "SELECT * FROM user_economy WHERE guild_id = ? AND user_id = ?",
-            (guild_id, user_id)
+            (guild_id, user_id),
+            record=UserEconomy
         )
-        if not row:
-            return None
-        return UserEconomy(**dict(row))
     
     async def get_or_create_user(self, guild_id: int, user_id: int) -> UserEconomy:
         user = await self.get_user(guild_id, user_id)
         if user:
             return user
         
-        await db.execute(
+        await shards.for_guild(guild_id).execute(
             "INSERT OR IGNORE INTO user_economy (guild_id, user_id) VALUES (?, ?)",
             (guild_id, user_id)
         )
         return UserEconomy(guild_id=guild_id, user_id=user_id)
     
     async def save_user(self, user: UserEconomy) -> None:
-        await db.execute("""
+        await shards.for_guild(user.guild_id).execute("""
             INSERT INTO user_economy (guild_id, user_id, balance, bank, last_daily, last_work, total_earned)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(guild_id, user_id) DO UPDATE SET
@@ -114,60 +114,78 @@ class EconomyRepository:
     async def add_balance(self, guild_id: int, user_id: int, amount: int) -> UserEconomy:
         """ajoute au solde (peut etre negatif)"""
         await self.get_or_create_user(guild_id, user_id)
+        shard = shards.for_guild(guild_id)
         
         if amount > 0:
-            await db.execute(
+            await shard.execute(
                 "UPDATE user_economy SET balance = balance + ?, total_earned = total_earned + ? WHERE guild_id = ? AND user_id = ?",
                 (amount, amount, guild_id, user_id)
             )
         else:
-            await db.execute(
+            await shard.execute(
                 "UPDATE user_economy SET balance = balance + ? WHERE guild_id = ? AND user_id = ?",
                 (amount, guild_id, user_id)
             )
         
         return await self.get_user(guild_id, user_id)
     
+    async def add_balance_many(self, guild_id: int, user_ids: list[int], amount: int) -> None:
+        """ajoute le meme montant (> 0) a plusieurs users, cree les lignes manquantes (un statement)"""
+        await shards.for_guild(guild_id).upsert_many(
+            "user_economy",
+            ("guild_id", "user_id", "balance", "total_earned"),
+            [(guild_id, user_id, amount, amount) for user_id in user_ids],
+            conflict=("guild_id", "user_id"),
+            update={
+                "balance": "balance + excluded.balance",
+                "total_earned": "total_earned + excluded.total_earned"
+            }
+        )
+    
     async def set_balance(self, guild_id: int, user_id: int, amount: int) -> None:
         await self.get_or_create_user(guild_id, user_id)
-        await db.execute(
+        await shards.for_guild(guild_id).execute(
             "UPDATE user_economy SET balance = ? WHERE guild_id = ? AND user_id = ?",
             (amount, guild_id, user_id)
         )
     
     async def transfer(self, guild_id: int, from_user: int, to_user: int, amount: int) -> bool:
         """transfert entre users, retourne False si pas assez"""
-        sender = await self.get_or_create_user(guild_id, from_user)
-        if sender.balance < amount:
-            return False
-        
-        await self.add_balance(guild_id, from_user, -amount)
-        await self.add_balance(guild_id, to_user, amount)
+        shard = shards.for_guild(guild_id)
+        async with shard.transaction():
+            # debit conditionnel: si le solde suffit pas aucune ligne touchee
+            cursor = await shard.execute(
+                "UPDATE user_economy SET balance = balance - ? WHERE guild_id = ? AND user_id = ? AND balance >= ?",
+                (amount, guild_id, from_user, amount)
+            )
+            if cursor.rowcount == 0:
+                return False
+            
+            await shard.execute("""
+                INSERT INTO user_economy (guild_id, user_id, balance, total_earned)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                    balance = balance + excluded.balance,
+                    total_earned = total_earned + excluded.total_earned
+            """, (guild_id, to_user, amount, amount))
         return True
     
     async def deposit(self, guild_id: int, user_id: int, amount: int) -> bool:
         """depose en banque"""
-        user = await self.get_or_create_user(guild_id, user_id)
-        if user.balance < amount:
-            return False
-        
-        await db.execute(
-            "UPDATE user_economy SET balance = balance - ?, bank = bank + ? WHERE guild_id = ? AND user_id = ?",
-            (amount, amount, guild_id, user_id)
+        # une seule requete conditionnelle = atomique sans transaction
+        cursor = await shards.for_guild(guild_id).execute(
+            "UPDATE user_economy SET balance = balance - ?, bank = bank + ? WHERE guild_id = ? AND user_id = ? AND balance >= ?",
+            (amount, amount, guild_id, user_id, amount)
         )
-        return True
+        return cursor.rowcount > 0
     
     async def withdraw(self, guild_id: int, user_id: int, amount: int) -> bool:
         """retire de la banque"""
-        user = await self.get_or_create_user(guild_id, user_id)
-        if user.bank < amount:
-            return False
-        
-        await db.execute(
-            "UPDATE user_economy SET balance = balance + ?, bank = bank - ? WHERE guild_id = ? AND user_id = ?",
-            (amount, amount, guild_id, user_id)
+        cursor = await shards.for_guild(guild_id).execute(
+            "UPDATE user_economy SET balance = balance + ?, bank = bank - ? WHERE guild_id = ? AND user_id = ? AND bank >= ?",
+            (amount, amount, guild_id, user_id, amount)
         )
-        return True
+        return cursor.rowcount > 0
     
     # ---- COOLDOWNS ----
     
@@ -181,7 +199,7 @@ class EconomyRepository:
     async def do_daily(self, guild_id: int, user_id: int, amount: int) -> UserEconomy:
         """fait le daily"""
         await self.add_balance(guild_id, user_id, amount)
-        await db.execute(
+        await shards.for_guild(guild_id).execute(
             "UPDATE user_economy SET last_daily = ? WHERE guild_id = ? AND user_id = ?",
             (time.time(), guild_id, user_id)
         )
@@ -194,7 +212,7 @@ class EconomyRepository:
     
     async def do_work(self, guild_id: int, user_id: int, amount: int) -> UserEconomy:
         await self.add_balance(guild_id, user_id, amount)
-        await db.execute(
+        await shards.for_guild(guild_id).execute(
             "UPDATE user_economy SET last_work = ? WHERE guild_id = ? AND user_id = ?",
             (time.time(), guild_id, user_id)
         )
@@ -202,38 +220,77 @@ class EconomyRepository:
     
     # ---- LEADERBOARD ----
     
-    async def get_leaderboard(self, guild_id: int, limit: int = 10, offset: int = 0) -> list[UserEconomy]:
-        rows = await db.fetchall(
-            "SELECT * FROM user_economy WHERE guild_id = ? ORDER BY (balance + bank) DESC LIMIT ? OFFSET ?",
-            (guild_id, limit, offset)
+    async def get_leaderboard(
+        self,
+        guild_id: int,
+        limit: int = 10,
+        after: Optional[tuple[int, int]] = None
+    ) -> list[UserEconomy]:
+        """
+        classement par fortune, en keyset: after = (net_worth, user_id) du
+        dernier membre de la page d'avant, None = premiere page. chaque page
+        coute pareil, peu importe sa profondeur
+        """
+        shard = shards.for_guild(guild_id)
+        if after is None:
+            return await shard.fetchall(
+                "SELECT * FROM user_economy WHERE guild_id = ? ORDER BY net_worth DESC, user_id LIMIT ?",
+                (guild_id, limit),
+                record=UserEconomy
+            )
+        
+        net_worth, user_id = after
+        return await shard.fetchall("""
+            SELECT * FROM user_economy
+            WHERE guild_id = ? AND net_worth <= ? AND (net_worth < ? OR user_id > ?)
+            ORDER BY net_worth DESC, user_id LIMIT ?
+        """, (guild_id, net_worth, net_worth, user_id, limit), record=UserEconomy)
+    
+    async def get_leaderboard_cursor(self, guild_id: int, offset: int) -> Optional[tuple[int, int]]:
+        """
+        curseur (after) de la page qui commence a offset, pour sauter direct a
+        une page (!lb-eco 50). lit juste l'index, pas les lignes
+        """
+        if offset <= 0:
+            return None
+        row = await shards.for_guild(guild_id).fetchone(
+            "SELECT net_worth, user_id FROM user_economy WHERE guild_id = ? ORDER BY net_worth DESC, user_id LIMIT 1 OFFSET ?",
+            (guild_id, offset - 1)
         )
-        return [UserEconomy(**dict(r)) for r in rows]
+        return (row["net_worth"], row["user_id"]) if row else None
     
     async def get_rank(self, guild_id: int, user_id: int) -> int:
-        row = await db.fetchone("""
+        row = await shards.for_guild(guild_id).fetchone("""
             SELECT COUNT(*) + 1 as rank
             FROM user_economy
-            WHERE guild_id = ? AND (balance + bank) > (
-                SELECT COALESCE(balance + bank, 0) FROM user_economy WHERE guild_id = ? AND user_id = ?
+            WHERE guild_id = ? AND net_worth > (
+                SELECT COALESCE(net_worth, 0) FROM user_economy WHERE guild_id = ? AND user_id = ?
             )
         """, (guild_id, guild_id, user_id))
         return row["rank"] if row else 1
     
+    async def get_total_users(self, guild_id: int) -> int:
+        row = await shards.for_guild(guild_id).fetchone(
+            "SELECT COUNT(*) as count FROM user_economy WHERE guild_id = ?",
+            (guild_id,)
+        )
+        return row["count"] if row else 0
+    
     # ---- SHOP ----
     
     async def get_shop_items(self, guild_id: int) -> list[ShopItem]:
-        rows = await db.fetchall(
+        return await db.fetchall(
             "SELECT * FROM shop_items WHERE guild_id = ? ORDER BY price",
-            (guild_id,)
+            (guild_id,),
+            record=ShopItem
         )
-        return [ShopItem(**dict(r)) for r in rows]
     
     async def get_shop_item(self, item_id: int) -> Optional[ShopItem]:
-        row = await db.fetchone(
+        return await db.fetchone(
             "SELECT * FROM shop_items WHERE id = ?",
-            (item_id,)
+            (item_id,),
+            record=ShopItem
         )
-        return ShopItem(**dict(row)) if row else None
     
     async def create_shop_item(self, guild_id: int, name: str, price: int, **kwargs) -> int:
         cursor = await db.execute(
@@ -253,33 +310,41 @@ class EconomyRepository:
         achete un item
         retourne (success, message)
         """
-        item = await self.get_shop_item(item_id)
-        if not item:
-            return False, "Article introuvable"
-        
-        if item.stock == 0:
-            return False, "Stock epuise"
-        
-        user = await self.get_or_create_user(guild_id, user_id)
-        if user.balance < item.price:
-            return False, "Pas assez d'argent"
-        
-        # deduit le prix
-        await self.add_balance(guild_id, user_id, -item.price)
-        
-        # reduit le stock si limite
-        if item.stock > 0:
-            await db.execute(
-                "UPDATE shop_items SET stock = stock - 1 WHERE id = ?",
-                (item_id,)
+        # tout dans une transaction: soit l'achat passe en entier, soit rien
+        # (plus de prix debite sans l'item dans l'inventaire)
+        # shop/inventaire dans le central, solde dans le shard de la guild
+        shard = shards.for_guild(guild_id)
+        async with db.transaction(), shard.transaction():
+            item = await self.get_shop_item(item_id)
+            if not item:
+                return False, "Article introuvable"
+            
+            if item.stock == 0:
+                return False, "Stock epuise"
+            
+            user = await self.get_user(guild_id, user_id)
+            if not user or user.balance < item.price:
+                return False, "Pas assez d'argent"
+            
+            # deduit le prix
+            await shard.execute(
+                "UPDATE user_economy SET balance = balance - ? WHERE guild_id = ? AND user_id = ?",
+                (item.price, guild_id, user_id)
             )
-        
-        # ajoute a l'inventaire
-        await db.execute("""
-            INSERT INTO user_inventory (guild_id, user_id, item_id, quantity, purchased_at)
-            VALUES (?, ?, ?, 1, ?)
-            ON CONFLICT(guild_id, user_id, item_id) DO UPDATE SET quantity = quantity + 1
-        """, (guild_id, user_id, item_id, time.time()))
+            
+            # reduit le stock si limite
+            if item.stock > 0:
+                await db.execute(
+                    "UPDATE shop_items SET stock = stock - 1 WHERE id = ?",
+                    (item_id,)
+                )
+            
+            # ajoute a l'inventaire
+            await db.execute("""
+                INSERT INTO user_inventory (guild_id, user_id, item_id, quantity, purchased_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(guild_id, user_id, item_id) DO UPDATE SET quantity = quantity + 1
+            """, (guild_id, user_id, item_id, time.time()))
         
         return True, f"Tu as achete **{item.name}** !"
     
@@ -0,0 +1,135 @@
+"""
+Repository Guild Settings - prefix et modules actives par serveur
+
+chaque message passe par get_prefix et chaque event de chaque cog (message,
+reaction, join...) commence par verifier si son module est actif. au lieu
+d'un SELECT sur guild_settings a chaque fois, toutes les guilds sont gardees
+en memoire (prefix + bitfield des modules), chargees au demarrage et
+invalidees par les commandes enable/disable et les modifs du dashboard
+(config_sync). une guild sans ligne est cachee aussi (= valeurs par defaut)
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.database import db
+from utils.config_sync import config_sync
+
+
+# ordre = position du bit, ajouter les nouveaux modules a la fin
+MODULES = (
+    "levels", "economy", "welcome", "moderation", "tickets", "starboard",
+    "suggestions", "birthdays", "temp_voice", "invites", "releases", "gamedeals",
+)
+MODULE_BITS = {module: 1 << i for i, module in enumerate(MODULES)}
+TOGGLE_COLUMNS = ", ".join(f"{m}_enabled" for m in MODULES)
+
+
+@dataclass(slots=True)
+class GuildSettings:
+    """ce qui est garde en memoire pour une guild"""
+    toggles: int = 0
+    prefix: Optional[str] = None  # None = prefix par defaut du bot
+
+
+# guild sans ligne dans guild_settings: tout desactive, prefix par defaut (comme avant)
+NO_SETTINGS = GuildSettings()
+
+
+def toggles_from_row(row) -> int:
+    """row guild_settings -> bitfield des modules actifs"""
+    toggles = 0
+    for module, bit in MODULE_BITS.items():
+        if row[f"{module}_enabled"]:
+            toggles |= bit
+    return toggles
+
+
+def settings_from_row(row) -> GuildSettings:
+    return GuildSettings(toggles_from_row(row), row["prefix"] or None)
+
+
+class GuildSettingsRepository:
+    """acces a guild_settings, toggles gardes en memoire"""
+    
+    def __init__(self):
+        self._guilds: dict[int, GuildSettings] = {}
+        self._inflight: dict[int, asyncio.Task] = {}
+        config_sync.subscribe("guild_settings", self.invalidate)
+    
+    async def get(self, guild_id: int) -> GuildSettings:
+        """settings en memoire du serveur (charges au 1er appel si pas warm)"""
+        settings = self._guilds.get(guild_id)
+        if settings is not None:
+            return settings
+        
+        # un seul SELECT par guild meme si plein d'events arrivent en meme temps
+        task = self._inflight.get(guild_id)
+        if task is None:
+            task = asyncio.create_task(self._load(guild_id))
+            self._inflight[guild_id] = task
+        return await asyncio.shield(task)
+    
+    # ---- PREFIX ----
+    
+    async def get_prefix(self, guild_id: int) -> Optional[str]:
+        """prefix du serveur, None = prefix par defaut"""
+        return (await self.get(guild_id)).prefix
+    
+    # ---- TOGGLES ----
+    
+    async def get_toggles(self, guild_id: int) -> int:
+        """bitfield des modules actifs du serveur"""
+        return (await self.get(guild_id)).toggles
+    
+    async def is_enabled(self, guild_id: int, module: str) -> bool:
+        """le module est actif sur ce serveur ?"""
+        return bool(await self.get_toggles(guild_id) & MODULE_BITS[module])
+    
+    async def set_enabled(self, guild_id: int, module: str, enabled: bool) -> None:
+        """active/desactive un module (cree la ligne si besoin)"""
+        if module not in MODULE_BITS:
+            raise ValueError(f"Module inconnu: {module}")
+        column = f"{module}_enabled"
+        
+        await db.execute(
+            f"""INSERT INTO guild_settings (guild_id, {column}) VALUES (?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET {column} = excluded.{column}""",
+            (guild_id, int(enabled))
+        )
+        # la ligne a pu etre creee avec les defauts des autres modules, on relit
+        self.invalidate(guild_id)
+    
+    async def _load(self, guild_id: int) -> GuildSettings:
+        task = asyncio.current_task()
+        try:
+            row = await db.fetchone(
+                f"SELECT prefix, {TOGGLE_COLUMNS} FROM guild_settings WHERE guild_id = ?",
+                (guild_id,)
+            )
+            settings = settings_from_row(row) if row else NO_SETTINGS
+            # invalide pendant la lecture -> on garde pas une valeur peut etre perimee
+            if self._inflight.get(guild_id) is task:
+                self._guilds[guild_id] = settings
+            return settings
+        finally:
+            if self._inflight.get(guild_id) is task:
+                del self._inflight[guild_id]
+    
+    # ---- CACHE ----
+    
+    async def warm(self) -> int:
+        """charge toutes les guilds en une requete (demarrage)"""
+        rows = await db.fetchall(f"SELECT guild_id, prefix, {TOGGLE_COLUMNS} FROM guild_settings")
+        self._guilds.update({r["guild_id"]: settings_from_row(r) for r in rows})
+        return len(rows)
+    
+    def invalidate(self, guild_id: int):
+        """a appeler apres une ecriture dans guild_settings (les triggers + config_sync le font pour les autres process)"""
+        self._guilds.pop(guild_id, None)
+        self._inflight.pop(guild_id, None)
+
+
+# singleton
+guild_settings_repo = GuildSettingsRepository()
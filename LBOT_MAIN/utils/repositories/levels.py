@@ -7,15 +7,31 @@ separe la logique SQL du cog pour:
 - centraliser les modifs de schema
 """
 
+import asyncio
+import logging
+import os
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Optional
 
 from utils.database import db
+from utils.sharding import shards
 from utils.repositories import ConfigCache
+from utils.xp_curve import XPCurve
+from utils.rank_index import RankIndex
 
+logger = logging.getLogger('database')
 
-@dataclass
+# secondes entre deux ecritures des gains d'xp en attente (0 = ecriture a chaque gain)
+XP_FLUSH_INTERVAL = float(os.getenv("XP_FLUSH_INTERVAL", "5"))
+# users gardes en memoire, les moins recents sont oublies une fois ecrits
+XP_CACHE_SIZE = int(os.getenv("XP_CACHE_SIZE", "50000"))
+# serveurs dont le classement est garde en memoire, les autres sont relus au besoin
+RANK_INDEX_GUILDS = int(os.getenv("RANK_INDEX_GUILDS", "1000"))
+
+
+@dataclass(slots=True)
 class UserLevel:
     """un user avec son xp/level"""
     guild_id: int
@@ -27,7 +43,7 @@ class UserLevel:
     last_xp_time: float = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class LevelReward:
     """recompense de niveau"""
     id: int
@@ -40,9 +56,22 @@ class LevelReward:
 class LevelsRepository:
     """acces aux donnees levels"""
     
-    def __init__(self):
+    def __init__(self, flush_interval: float = XP_FLUSH_INTERVAL, cache_size: int = XP_CACHE_SIZE):
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        # users lus ou modifies recemment, la version en memoire fait foi
+        self._users: OrderedDict[tuple[int, int], UserLevel] = OrderedDict()
+        # ceux qui ont change depuis le dernier flush
+        self._dirty: dict[tuple[int, int], UserLevel] = {}
+        self._task: Optional[asyncio.Task] = None
+        # stop() attend la fin du flush en cours au lieu d'annuler la tache
+        self._stopping = asyncio.Event()
+        # classement par serveur (LRU), mis a jour a chaque ecriture d'xp
+        self._ranks: OrderedDict[int, RankIndex] = OrderedDict()
+        self._rank_inflight: dict[int, asyncio.Task] = {}
+        
         # cache config avec parsing json auto
-        self.config_cache = ConfigCache("levels_config", ttl=60)
+        self.config_cache = ConfigCache("levels_config")
         self.config_cache.set_json_fields([
             "ignored_channels",
             "ignored_roles", 
@@ -72,14 +101,15 @@ class LevelsRepository:
     # ---- USERS ----
     
     async def get_user(self, guild_id: int, user_id: int) -> Optional[UserLevel]:
-        """recup un user"""
-        row = await db.fetchone(
+        """recup un user (version en memoire si il y en a une, gains pas encore ecrits compris)"""
+        user = self._users.get((guild_id, user_id))
+        if user is not None:
+            return user
+        return await shards.for_guild(guild_id).fetchone(
             "SELECT * FROM user_levels WHERE guild_id = ? AND user_id = ?",
-            (guild_id, user_id)
+            (guild_id, user_id),
+            record=UserLevel
         )
-        if not row:
-            return None
-        return UserLevel(**dict(row))
     
     async def get_or_create_user(self, guild_id: int, user_id: int) -> UserLevel:
         """recup ou cree un user"""
@@ -87,15 +117,35 @@ class LevelsRepository:
         if user:
             return user
         
-        await db.execute(
+        await shards.for_guild(guild_id).execute(
             "INSERT OR IGNORE INTO user_levels (guild_id, user_id) VALUES (?, ?)",
             (guild_id, user_id)
         )
         return UserLevel(guild_id=guild_id, user_id=user_id)
     
+    async def get_users(self, guild_id: int, user_ids: list[int]) -> list[UserLevel]:
+        """
+        recup plusieurs users en une requete (par paquets de 500)
+        les users absents sont retournes avec les valeurs par defaut
+        """
+        shard = shards.for_guild(guild_id)
+        found: dict[int, UserLevel] = {}
+        for i in range(0, len(user_ids), 500):
+            chunk = user_ids[i:i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = await shard.fetchall(
+                f"SELECT * FROM user_levels WHERE guild_id = ? AND user_id IN ({placeholders})",
+                (guild_id, *chunk),
+                record=UserLevel
+            )
+            for user in rows:
+                found[user.user_id] = user
+        
+        return [found.get(uid) or UserLevel(guild_id=guild_id, user_id=uid) for uid in user_ids]
+    
     async def save_user(self, user: UserLevel) -> None:
         """sauvegarde un user"""
-        await db.execute("""
+        await shards.for_guild(user.guild_id).execute("""
             INSERT INTO user_levels (guild_id, user_id, xp, level, total_messages, voice_time, last_xp_time)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(guild_id, user_id) DO UPDATE SET
@@ -107,24 +157,44 @@ class LevelsRepository:
         """, (user.guild_id, user.user_id, user.xp, user.level,
               user.total_messages, user.voice_time, user.last_xp_time))
     
-    async def add_xp(self, guild_id: int, user_id: int, amount: int) -> UserLevel:
-        """ajoute de l'xp et retourne le user mis a jour"""
-        now = time.time()
-        
-        await db.execute("""
-            INSERT INTO user_levels (guild_id, user_id, xp, total_messages, last_xp_time)
-            VALUES (?, ?, ?, 1, ?)
-            ON CONFLICT(guild_id, user_id) DO UPDATE SET
-                xp = xp + ?,
-                total_messages = total_messages + 1,
-                last_xp_time = ?
-        """, (guild_id, user_id, amount, now, amount, now))
+    async def save_users(self, users: list[UserLevel]) -> None:
+        """sauvegarde plusieurs users (un statement, un commit par shard)"""
+        by_guild: dict[int, list[UserLevel]] = {}
+        for u in users:
+            by_guild.setdefault(u.guild_id, []).append(u)
         
-        return await self.get_user(guild_id, user_id)
+        for guild_id, guild_users in by_guild.items():
+            await shards.for_guild(guild_id).upsert_many(
+                "user_levels",
+                ("guild_id", "user_id", "xp", "level", "total_messages", "voice_time", "last_xp_time"),
+                [(u.guild_id, u.user_id, u.xp, u.level, u.total_messages, u.voice_time, u.last_xp_time)
+                 for u in guild_users],
+                conflict=("guild_id", "user_id")
+            )
+    
+    async def add_xp(self, guild_id: int, user_id: int, amount: int) -> UserLevel:
+        """ajoute de l'xp (sans recalcul du niveau) et retourne le user mis a jour"""
+        user = await self.get_cached_user(guild_id, user_id)
+        user.xp += amount
+        user.total_messages += 1
+        user.last_xp_time = time.time()
+        await self.queue_save(user)
+        return user
     
     async def set_xp(self, guild_id: int, user_id: int, xp: int, level: int) -> None:
         """definit l'xp d'un user"""
-        await db.execute("""
+        # un classement en cours de lecture a pu rater cette ecriture
+        self._rank_inflight.pop(guild_id, None)
+        self._rank_changed(guild_id, user_id, xp)
+        user = self._users.get((guild_id, user_id))
+        if user is not None:
+            # sinon le prochain flush remettrait l'ancienne valeur
+            user.xp, user.level = xp, level
+            self._dirty.pop((guild_id, user_id), None)
+            await self.save_user(user)
+            return
+        
+        await shards.for_guild(guild_id).execute("""
             INSERT INTO user_levels (guild_id, user_id, xp, level)
             VALUES (?, ?, ?, ?)
             ON CONFLICT(guild_id, user_id) DO UPDATE SET xp = ?, level = ?
@@ -132,70 +202,267 @@ class LevelsRepository:
     
     async def reset_user(self, guild_id: int, user_id: int) -> None:
         """reset un user"""
-        await db.execute(
+        self.forget(guild_id, user_id)
+        self._rank_inflight.pop(guild_id, None)
+        self._rank_changed(guild_id, user_id, None)
+        await shards.for_guild(guild_id).execute(
             "DELETE FROM user_levels WHERE guild_id = ? AND user_id = ?",
             (guild_id, user_id)
         )
     
+    async def recompute_levels(self, guild_id: int, curve: XPCurve, max_level: int = 0) -> int:
+        """
+        recalcule le niveau de tous les users du serveur avec une nouvelle courbe
+        (une lecture, un executemany des lignes qui changent), retourne le nb de users modifies
+        """
+        # sinon le prochain flush remettrait les niveaux de l'ancienne courbe
+        await self.flush()
+        
+        shard = shards.for_guild(guild_id)
+        rows = await shard.fetchall(
+            "SELECT user_id, xp, level FROM user_levels WHERE guild_id = ?",
+            (guild_id,)
+        )
+        levels = curve.levels_for([r["xp"] for r in rows])
+        if max_level > 0:
+            levels = [min(level, max_level) for level in levels]
+        
+        changed = [(level, guild_id, r["user_id"]) for r, level in zip(rows, levels) if level != r["level"]]
+        await shard.execute_many(
+            "UPDATE user_levels SET level = ? WHERE guild_id = ? AND user_id = ?",
+            changed
+        )
+        
+        # versions en memoire (l'xp a pu bouger depuis la lecture)
+        for _, _, user_id in changed:
+            user = self._users.get((guild_id, user_id))
+            if user is not None:
+                level = curve.level_for(user.xp)
+                user.level = min(level, max_level) if max_level > 0 else level
+        
+        return len(changed)
+    
     async def check_cooldown(self, guild_id: int, user_id: int, cooldown: int) -> bool:
         """
         verifie si l'user peut gagner de l'xp
         retourne True si ok, False si en cooldown
         """
-        row = await db.fetchone(
-            "SELECT last_xp_time FROM user_levels WHERE guild_id = ? AND user_id = ?",
-            (guild_id, user_id)
-        )
-        if not row:
+        user = await self.get_user(guild_id, user_id)
+        if not user:
             return True
-        return time.time() - row["last_xp_time"] >= cooldown
+        return time.time() - user.last_xp_time >= cooldown
+    
+    # ---- WRITE-BEHIND ----
+    
+    async def get_cached_user(self, guild_id: int, user_id: int) -> UserLevel:
+        """
+        user en memoire (lu en db au 1er appel, cree si absent), a modifier sur
+        place puis passer a queue_save(). tous les gains d'xp passent par la
+        meme instance donc messages et vocal s'ecrasent jamais entre eux
+        """
+        key = (guild_id, user_id)
+        user = self._users.get(key)
+        if user is not None:
+            self._users.move_to_end(key)
+            return user
+        
+        loaded = await self.get_user(guild_id, user_id)
+        return self._remember(loaded or UserLevel(guild_id=guild_id, user_id=user_id))
+    
+    async def get_cached_users(self, guild_id: int, user_ids: list[int]) -> list[UserLevel]:
+        """pareil pour plusieurs users, les absents du cache sont lus en une requete"""
+        found: dict[int, UserLevel] = {}
+        missing = []
+        for uid in user_ids:
+            user = self._users.get((guild_id, uid))
+            if user is None:
+                missing.append(uid)
+            else:
+                self._users.move_to_end((guild_id, uid))
+                found[uid] = user
+        
+        if missing:
+            for user in await self.get_users(guild_id, missing):
+                found[user.user_id] = self._remember(user)
+        return [found[uid] for uid in user_ids]
+    
+    async def queue_save(self, user: UserLevel) -> None:
+        """ecrit le user au prochain flush (direct si le flush tourne pas)"""
+        await self.queue_save_many([user])
+    
+    async def queue_save_many(self, users: list[UserLevel]) -> None:
+        for user in users:
+            self._rank_changed(user.guild_id, user.user_id, user.xp)
+        
+        if not self._task:
+            await self.save_users(users)
+            return
+        for user in users:
+            key = (user.guild_id, user.user_id)
+            self._dirty[key] = user
+            # a pu etre evince pendant un await de l'appelant
+            self._users.setdefault(key, user)
+    
+    async def flush(self) -> int:
+        """ecrit tous les users modifies (un upsert par guild), retourne le nb de users"""
+        if not self._dirty:
+            return 0
+        
+        # les gains qui arrivent pendant l'ecriture repartent pour le tour suivant
+        pending, self._dirty = self._dirty, {}
+        try:
+            await self.save_users(list(pending.values()))
+        except BaseException:
+            # annulation comprise, sinon le lot sorti de _dirty serait perdu
+            for key, user in pending.items():
+                self._dirty.setdefault(key, user)
+            raise
+        
+        self._evict()
+        return len(pending)
+    
+    def forget(self, guild_id: int, user_id: int):
+        """oublie la version en memoire (avant une ecriture directe en db)"""
+        self._users.pop((guild_id, user_id), None)
+        self._dirty.pop((guild_id, user_id), None)
+    
+    def _remember(self, user: UserLevel) -> UserLevel:
+        # un autre event a pu charger le meme user pendant le SELECT, on garde le sien
+        key = (user.guild_id, user.user_id)
+        existing = self._users.get(key)
+        if existing is not None:
+            return existing
+        
+        self._users[key] = user
+        self._evict()
+        return user
+    
+    def _evict(self):
+        # les users pas encore ecrits restent, ils partiront apres le flush
+        checked = 0
+        while len(self._users) > self.cache_size and checked < len(self._users):
+            key = next(iter(self._users))
+            if key in self._dirty:
+                self._users.move_to_end(key)
+                checked += 1
+            else:
+                del self._users[key]
+    
+    def start(self):
+        if self.flush_interval > 0 and not self._task:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        """arrete le flush periodique et ecrit ce qui reste (fermeture du bot)"""
+        if self._task:
+            # pas de cancel: un flush en cours va au bout, la boucle sort apres
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+    
+    async def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Flush XP: {e}")
     
     # ---- LEADERBOARD ----
     
     async def get_leaderboard(self, guild_id: int, limit: int = 10, offset: int = 0) -> list[UserLevel]:
-        """classement xp"""
-        rows = await db.fetchall(
-            "SELECT * FROM user_levels WHERE guild_id = ? ORDER BY xp DESC LIMIT ? OFFSET ?",
-            (guild_id, limit, offset)
-        )
-        return [UserLevel(**dict(r)) for r in rows]
+        """classement xp (page lue dans l'index, puis les users par cle primaire)"""
+        index = await self.get_rank_index(guild_id)
+        user_ids = index.page(offset, limit)
+        if not user_ids:
+            return []
+        
+        users = {u.user_id: u for u in await self.get_users(guild_id, user_ids)}
+        return [self._users.get((guild_id, uid)) or users[uid] for uid in user_ids]
     
     async def get_rank(self, guild_id: int, user_id: int) -> int:
         """rang d'un user (1-indexed)"""
-        row = await db.fetchone("""
-            SELECT COUNT(*) + 1 as rank
-            FROM user_levels
-            WHERE guild_id = ? AND xp > (
-                SELECT COALESCE(xp, 0) FROM user_levels WHERE guild_id = ? AND user_id = ?
-            )
-        """, (guild_id, guild_id, user_id))
-        return row["rank"] if row else 1
+        return (await self.get_rank_index(guild_id)).rank(user_id)
+    
+    async def get_percentile(self, guild_id: int, user_id: int) -> float:
+        """top x% du serveur"""
+        return (await self.get_rank_index(guild_id)).percentile(user_id)
     
     async def get_total_users(self, guild_id: int) -> int:
         """nombre total d'users avec xp"""
-        row = await db.fetchone(
-            "SELECT COUNT(*) as count FROM user_levels WHERE guild_id = ?",
-            (guild_id,)
-        )
-        return row["count"] if row else 0
+        return len(await self.get_rank_index(guild_id))
+    
+    async def get_rank_index(self, guild_id: int) -> RankIndex:
+        """classement du serveur, relu en db si il est pas (plus) en memoire"""
+        index = self._ranks.get(guild_id)
+        if index is not None:
+            self._ranks.move_to_end(guild_id)
+            return index
+        
+        # un seul chargement par guild meme si plusieurs !rank arrivent en meme temps
+        task = self._rank_inflight.get(guild_id)
+        if task is None:
+            task = asyncio.create_task(self._load_rank_index(guild_id))
+            self._rank_inflight[guild_id] = task
+        return await asyncio.shield(task)
+    
+    async def _load_rank_index(self, guild_id: int) -> RankIndex:
+        task = asyncio.current_task()
+        try:
+            rows = await shards.for_guild(guild_id).fetchall(
+                "SELECT user_id, xp FROM user_levels WHERE guild_id = ?",
+                (guild_id,)
+            )
+            index = RankIndex((r["user_id"], r["xp"]) for r in rows)
+            
+            # la version en memoire fait foi (gains pas encore ecrits ou arrives pendant le SELECT)
+            for (gid, uid), user in self._users.items():
+                if gid == guild_id and (user.xp or uid in index):
+                    index.update(uid, user.xp)
+            
+            # set_xp / reset pendant la lecture -> on garde pas un index peut etre perime
+            # (les gains d'xp normaux sont deja dans self._users)
+            if self._rank_inflight.get(guild_id) is task:
+                self._ranks[guild_id] = index
+                while len(self._ranks) > RANK_INDEX_GUILDS:
+                    self._ranks.popitem(last=False)
+            return index
+        finally:
+            if self._rank_inflight.get(guild_id) is task:
+                del self._rank_inflight[guild_id]
+    
+    def _rank_changed(self, guild_id: int, user_id: int, xp: Optional[int]):
+        # xp None = user supprime
+        index = self._ranks.get(guild_id)
+        if index is None:
+            return
+        if xp is None:
+            index.remove(user_id)
+        else:
+            index.update(user_id, xp)
     
     # ---- REWARDS ----
     
     async def get_rewards(self, guild_id: int) -> list[LevelReward]:
         """liste des rewards"""
-        rows = await db.fetchall(
+        return await db.fetchall(
             "SELECT * FROM level_rewards WHERE guild_id = ? ORDER BY level",
-            (guild_id,)
+            (guild_id,),
+            record=LevelReward
         )
-        return [LevelReward(**dict(r)) for r in rows]
     
     async def get_rewards_for_level(self, guild_id: int, level: int) -> list[LevelReward]:
         """rewards jusqu'au niveau donne"""
-        rows = await db.fetchall(
+        return await db.fetchall(
             "SELECT * FROM level_rewards WHERE guild_id = ? AND level <= ? ORDER BY level",
-            (guild_id, level)
+            (guild_id, level),
+            record=LevelReward
         )
-        return [LevelReward(**dict(r)) for r in rows]
     
     async def add_reward(self, guild_id: int, level: int, role_id: int, remove_previous: bool = False) -> None:
         """ajoute une reward"""
@@ -4,15 +4,20 @@ Repository Moderation - acces aux donnees moderation
 cases, warns, mutes, bans, automod
 """
 
+import json
 import time
 from dataclasses import dataclass
 from typing import Optional, Literal
 
 from utils.database import db
+from utils.sharding import shards
 from utils.repositories import ConfigCache
+from utils.config_sync import config_sync
+from utils.word_filter import WordMatcher
+from utils.link_filter import LinkMatcher
 
 
-@dataclass
+@dataclass(slots=True)
 class ModCase:
     """un cas de moderation"""
     id: int
@@ -27,7 +32,7 @@ class ModCase:
     active: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class TempPunishment:
     """punition temporaire (mute/ban)"""
     id: int
@@ -42,12 +47,18 @@ class ModerationRepository:
     """acces aux donnees moderation"""
     
     def __init__(self):
-        self.config_cache = ConfigCache("mod_config", ttl=60)
+        self.config_cache = ConfigCache("mod_config")
         self.config_cache.set_json_fields([
             "automod_ignored_channels",
             "automod_ignored_roles",
-            "banned_words"
+            "allowed_links",
+            "bad_words"
         ])
+        # guild -> (valeur bad_words de la config en cache, matcher compile)
+        self._word_matchers: dict[int, tuple[object, WordMatcher]] = {}
+        # pareil pour allowed_links
+        self._link_matchers: dict[int, tuple[object, LinkMatcher]] = {}
+        config_sync.subscribe("mod_config", self._drop_matchers)
     
     # ---- CONFIG ----
     
@@ -66,6 +77,39 @@ class ModerationRepository:
             tuple(values)
         )
         self.config_cache.invalidate(guild_id)
+        self._drop_matchers(guild_id)
+    
+    # ---- AUTOMOD ----
+    
+    def get_word_matcher(self, guild_id: int, config: dict) -> WordMatcher:
+        """
+        filtre de mots compile du serveur. recompile seulement quand la config
+        en cache change (nouvelle liste = nouvel objet apres un rechargement)
+        """
+        raw = config.get("bad_words")
+        entry = self._word_matchers.get(guild_id)
+        if entry is None or entry[0] is not raw:
+            words = json.loads(raw) if isinstance(raw, str) else (raw or [])
+            matcher = WordMatcher(
+                words,
+                whole_words=bool(config.get("bad_words_whole_words")),
+                obfuscation=bool(config.get("bad_words_obfuscation"))
+            )
+            entry = self._word_matchers[guild_id] = (raw, matcher)
+        return entry[1]
+    
+    def get_link_matcher(self, guild_id: int, config: dict) -> LinkMatcher:
+        """domaines autorises du serveur en arbre de suffixes (meme cache que les mots)"""
+        raw = config.get("allowed_links")
+        entry = self._link_matchers.get(guild_id)
+        if entry is None or entry[0] is not raw:
+            allowed = json.loads(raw) if isinstance(raw, str) else (raw or [])
+            entry = self._link_matchers[guild_id] = (raw, LinkMatcher(allowed))
+        return entry[1]
+    
+    def _drop_matchers(self, guild_id: int):
+        self._word_matchers.pop(guild_id, None)
+        self._link_matchers.pop(guild_id, None)
     
     # ---- CASES ----
     
@@ -82,7 +126,7 @@ class ModerationRepository:
         now = time.time()
         expires_at = now + duration if duration else None
         
-        cursor = await db.execute("""
+        cursor = await shards.for_guild(guild_id).execute("""
             INSERT INTO mod_cases (guild_id, user_id, moderator_id, action, reason, duration, expires_at, created_at, active)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
         """, (guild_id, user_id, moderator_id, action, reason, duration, expires_at, now))
@@ -102,12 +146,13 @@ class ModerationRepository:
             active=True
         )
     
-    async def get_case(self, case_id: int) -> Optional[ModCase]:
-        row = await db.fetchone(
-            "SELECT * FROM mod_cases WHERE id = ?",
-            (case_id,)
+    async def get_case(self, guild_id: int, case_id: int) -> Optional[ModCase]:
+        # les ids sont propres a chaque shard, faut la guild pour retrouver le cas
+        return await shards.for_guild(guild_id).fetchone(
+            "SELECT * FROM mod_cases WHERE id = ? AND guild_id = ?",
+            (case_id, guild_id),
+            record=ModCase
         )
-        return ModCase(**dict(row)) if row else None
     
     async def get_user_cases(
         self, 
@@ -129,35 +174,34 @@ class ModerationRepository:
         
         query += " ORDER BY created_at DESC"
         
-        rows = await db.fetchall(query, tuple(params))
-        return [ModCase(**dict(r)) for r in rows]
+        return await shards.for_guild(guild_id).fetchall(query, tuple(params), record=ModCase)
     
     async def get_recent_cases(self, guild_id: int, limit: int = 20) -> list[ModCase]:
-        rows = await db.fetchall(
+        return await shards.for_guild(guild_id).fetchall(
             "SELECT * FROM mod_cases WHERE guild_id = ? ORDER BY created_at DESC LIMIT ?",
-            (guild_id, limit)
+            (guild_id, limit),
+            record=ModCase
         )
-        return [ModCase(**dict(r)) for r in rows]
     
     async def count_user_warns(self, guild_id: int, user_id: int) -> int:
         """compte les warns actifs d'un user"""
-        row = await db.fetchone(
+        row = await shards.for_guild(guild_id).fetchone(
             "SELECT COUNT(*) as count FROM mod_cases WHERE guild_id = ? AND user_id = ? AND action = 'warn' AND active = 1",
             (guild_id, user_id)
         )
         return row["count"] if row else 0
     
-    async def deactivate_case(self, case_id: int) -> None:
+    async def deactivate_case(self, guild_id: int, case_id: int) -> None:
         """desactive un cas (pardon)"""
-        await db.execute(
-            "UPDATE mod_cases SET active = 0 WHERE id = ?",
-            (case_id,)
+        await shards.for_guild(guild_id).execute(
+            "UPDATE mod_cases SET active = 0 WHERE id = ? AND guild_id = ?",
+            (case_id, guild_id)
         )
     
     async def clear_user_warns(self, guild_id: int, user_id: int) -> int:
         """supprime tous les warns d'un user, retourne le nombre"""
         count = await self.count_user_warns(guild_id, user_id)
-        await db.execute(
+        await shards.for_guild(guild_id).execute(
             "UPDATE mod_cases SET active = 0 WHERE guild_id = ? AND user_id = ? AND action = 'warn'",
             (guild_id, user_id)
         )
@@ -192,11 +236,11 @@ class ModerationRepository:
     async def get_expired_punishments(self) -> list[TempPunishment]:
         """recup les punitions expirees (pour la task)"""
         now = time.time()
-        rows = await db.fetchall(
+        return await db.fetchall(
             "SELECT * FROM temp_punishments WHERE expires_at <= ?",
-            (now,)
+            (now,),
+            record=TempPunishment
         )
-        return [TempPunishment(**dict(r)) for r in rows]
     
     async def get_user_temp_punishment(
         self, 
@@ -205,22 +249,23 @@ class ModerationRepository:
         action: str
     ) -> Optional[TempPunishment]:
         """recup une punition temporaire specifique"""
-        row = await db.fetchone(
+        return await db.fetchone(
             "SELECT * FROM temp_punishments WHERE guild_id = ? AND user_id = ? AND action = ?",
-            (guild_id, user_id, action)
+            (guild_id, user_id, action),
+            record=TempPunishment
         )
-        return TempPunishment(**dict(row)) if row else None
     
     # ---- STATS ----
     
     async def get_mod_stats(self, guild_id: int) -> dict:
         """stats de moderation du serveur"""
-        total = await db.fetchone(
+        shard = shards.for_guild(guild_id)
+        total = await shard.fetchone(
             "SELECT COUNT(*) as count FROM mod_cases WHERE guild_id = ?",
             (guild_id,)
         )
         
-        by_action = await db.fetchall(
+        by_action = await shard.fetchall(
             "SELECT action, COUNT(*) as count FROM mod_cases WHERE guild_id = ? GROUP BY action",
             (guild_id,)
         )
@@ -232,7 +277,7 @@ class ModerationRepository:
     
     async def get_moderator_stats(self, guild_id: int, moderator_id: int) -> dict:
         """stats d'un moderateur"""
-        row = await db.fetchone(
+        row = await shards.for_guild(guild_id).fetchone(
             "SELECT COUNT(*) as count FROM mod_cases WHERE guild_id = ? AND moderator_id = ?",
             (guild_id, moderator_id)
         )
@@ -0,0 +1,328 @@
+"""
+Retention - archive les vieilles lignes des tables qui grossissent sans fin
+
+les lignes plus vieilles que la fenetre de leur table sont deplacees dans
+une db d'archive a part (DB_ARCHIVE_PATH, memes noms de tables + archived_at)
+par paquets de DB_RETENTION_CHUNK, avec une pause entre chaque paquet pour
+laisser passer le trafic normal. le fichier principal recupere la place via
+le vacuum incremental de utils/maintenance.py
+
+fenetres: POLICIES donne le defaut de chaque table, une guild peut avoir
+sa propre fenetre dans retention_config (NULL = defaut, 0 = jamais)
+
+usage:
+    from utils.retention import retention
+    await retention.connect(); retention.start()     # setup_hook
+    results = await retention.run()                  # {table: (lignes, octets)}
+    await retention.set_window(guild_id, "tickets", 30)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from utils.database import Database, db, DATABASE_PATH
+from utils.sharding import shards
+
+logger = logging.getLogger('database')
+
+# secondes entre deux passes de retention (0 = off)
+DB_RETENTION_INTERVAL = int(os.getenv("DB_RETENTION_INTERVAL", "21600"))
+# fichier d'archive, par defaut data/bot.archive.db a cote de DATABASE_PATH
+DB_ARCHIVE_PATH = os.getenv("DB_ARCHIVE_PATH", "") or str(
+    Path(DATABASE_PATH).with_suffix(f".archive{Path(DATABASE_PATH).suffix}")
+)
+# lignes deplacees par paquet
+DB_RETENTION_CHUNK = int(os.getenv("DB_RETENTION_CHUNK", "500"))
+
+# pause entre deux paquets (s)
+CHUNK_PAUSE = 0.05
+DAY = 86400
+
+
+@dataclass
+class RetentionPolicy:
+    """quelles lignes d'une table sont archivables"""
+    table: str
+    time_column: str
+    default_days: int
+    # filtre en plus de l'age (ex: seulement les tickets fermes)
+    condition: str = ""
+    # table par membre -> sur les shards
+    sharded: bool = False
+
+
+POLICIES = {
+    p.table: p for p in (
+        # les APIs regardent jamais aussi loin en arriere, pas de re-annonce
+        RetentionPolicy("announced_releases", "announced_at", 90),
+        RetentionPolicy("announced_deals", "announced_at", 90),
+        # les warns actifs comptent toujours pour les sanctions auto, on les garde
+        RetentionPolicy("mod_cases", "created_at", 365, "(active = 0 OR action != 'warn')", sharded=True),
+        # special: fenetre comptee depuis la fin du giveaway, cf _archive_giveaways
+        RetentionPolicy("giveaway_entries", "ended_at", 30, sharded=True),
+        RetentionPolicy("tickets", "closed_at", 90, "status = 'closed'"),
+        # normalement supprimees a l'expiration, il reste celles des guilds quittees
+        RetentionPolicy("temp_punishments", "expires_at", 7),
+    )
+}
+
+
+def row_size(row) -> int:
+    """taille approx d'une ligne en octets (pour le rapport)"""
+    size = 0
+    for value in row:
+        if value is None:
+            size += 1
+        elif isinstance(value, (int, float)):
+            size += 8
+        elif isinstance(value, bytes):
+            size += len(value)
+        else:
+            size += len(str(value).encode())
+    return size
+
+
+class RetentionEngine:
+    """deplace les vieilles lignes vers la db d'archive"""
+    
+    def __init__(
+        self,
+        archive_path: str = DB_ARCHIVE_PATH,
+        interval: int = DB_RETENTION_INTERVAL,
+        chunk: int = DB_RETENTION_CHUNK
+    ):
+        # pas de tables du bot dans l'archive, elles sont creees a la volee
+        self.archive = Database(archive_path, read_pool_size=0, create_schema=False)
+        self.interval = interval
+        self.chunk = chunk
+        self._archive_columns: dict[str, set[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+    
+    async def connect(self):
+        await self.archive.connect()
+        await self.archive.execute("""
+            CREATE TABLE IF NOT EXISTS retention_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT,
+                rows INTEGER,
+                bytes INTEGER,
+                ran_at REAL
+            )
+        """)
+    
+    async def close(self):
+        await self.stop()
+        await self.archive.close()
+    
+    # ---- SCHEDULER ----
+    
+    def start(self):
+        if self.interval > 0 and not self._task:
+            self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Retention: {e}")
+    
+    # ---- CONFIG ----
+    
+    async def windows(self, table: str) -> dict[int, int]:
+        """fenetres perso des guilds pour une table {guild_id: jours}"""
+        column = f"{table}_days"
+        rows = await db.fetchall(
+            f"SELECT guild_id, {column} FROM retention_config WHERE {column} IS NOT NULL"
+        )
+        return {r[0]: r[1] for r in rows}
+    
+    async def set_window(self, guild_id: int, table: str, days: Optional[int]) -> None:
+        """days=None remet le defaut, 0 = jamais archiver"""
+        if table not in POLICIES:
+            raise ValueError(f"Table sans retention: {table}")
+        column = f"{table}_days"
+        await db.execute(
+            f"""INSERT INTO retention_config (guild_id, {column}) VALUES (?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET {column} = excluded.{column}""",
+            (guild_id, days)
+        )
+    
+    # ---- RUN ----
+    
+    async def run(self) -> dict[str, tuple[int, int]]:
+        """une passe sur toutes les tables, retourne {table: (lignes, octets)}"""
+        results = {}
+        # un seul run a la fois (tache de fond + commande owner)
+        async with self._lock:
+            for policy in POLICIES.values():
+                try:
+                    if policy.table == "giveaway_entries":
+                        moved = await self._archive_giveaways(policy)
+                    else:
+                        moved = await self._archive_table(policy)
+                except Exception as e:
+                    logger.error(f"Retention {policy.table}: {e}")
+                    continue
+                
+                results[policy.table] = moved
+                if moved[0]:
+                    logger.info(f"Retention: {moved[0]} lignes de {policy.table} archivees")
+                    await self.archive.execute(
+                        "INSERT INTO retention_runs (table_name, rows, bytes, ran_at) VALUES (?, ?, ?, ?)",
+                        (policy.table, moved[0], moved[1], time.time())
+                    )
+        return results
+    
+    async def _archive_table(self, policy: RetentionPolicy) -> tuple[int, int]:
+        now = time.time()
+        windows = await self.windows(policy.table)
+        condition = f" AND {policy.condition}" if policy.condition else ""
+        databases = shards.all if policy.sharded else [db]
+        rows = size = 0
+        
+        # toutes les guilds sans fenetre perso
+        if policy.default_days > 0:
+            excluded = list(windows)
+            not_in = f" AND guild_id NOT IN ({', '.join('?' for _ in excluded)})" if excluded else ""
+            for database in databases:
+                r, s = await self._move(
+                    database, policy.table,
+                    f"{policy.time_column} < ?{condition}{not_in}",
+                    (now - policy.default_days * DAY, *excluded)
+                )
+                rows, size = rows + r, size + s
+        
+        # les guilds avec leur propre fenetre
+        for guild_id, days in windows.items():
+            if days <= 0:
+                continue
+            database = shards.for_guild(guild_id) if policy.sharded else db
+            r, s = await self._move(
+                database, policy.table,
+                f"guild_id = ? AND {policy.time_column} < ?{condition}",
+                (guild_id, now - days * DAY)
+            )
+            rows, size = rows + r, size + s
+        
+        return rows, size
+    
+    async def _archive_giveaways(self, policy: RetentionPolicy) -> tuple[int, int]:
+        """
+        les entries ont pas de guild ni de date, on part des giveaways finis
+        (fichier central) et on archive leurs entries (shard) puis le giveaway
+        """
+        now = time.time()
+        windows = await self.windows(policy.table)
+        ended = await db.fetchall(
+            "SELECT id, guild_id, ended_at FROM giveaways WHERE ended = 1 AND ended_at < ?",
+            (now,)
+        )
+        
+        by_guild: dict[int, list[int]] = {}
+        for g in ended:
+            days = windows.get(g["guild_id"], policy.default_days)
+            if days > 0 and g["ended_at"] < now - days * DAY:
+                by_guild.setdefault(g["guild_id"], []).append(g["id"])
+        
+        rows = size = 0
+        for guild_id, ids in by_guild.items():
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                r, s = await self._move(
+                    shards.for_guild(guild_id), "giveaway_entries",
+                    f"giveaway_id IN ({placeholders})", tuple(chunk)
+                )
+                # plus d'entries = plus de reroll possible, le giveaway part aussi
+                gr, gs = await self._move(db, "giveaways", f"id IN ({placeholders})", tuple(chunk))
+                rows, size = rows + r + gr, size + s + gs
+        
+        return rows, size
+    
+    async def _move(self, source: Database, table: str, where: str, params: tuple) -> tuple[int, int]:
+        """copie dans l'archive puis supprime, paquet par paquet"""
+        moved = size = 0
+        while True:
+            rows = await source.fetchall(
+                f"SELECT rowid AS archive_rowid, * FROM {table} WHERE {where} LIMIT ?",
+                (*params, self.chunk)
+            )
+            if not rows:
+                break
+            
+            columns = [k for k in rows[0].keys() if k != "archive_rowid"]
+            await self._ensure_archive_table(table, columns)
+            
+            now = time.time()
+            values = [tuple(r[c] for c in columns) + (now,) for r in rows]
+            await self.archive.execute_many(
+                f"INSERT INTO {table} ({', '.join(columns)}, archived_at) "
+                f"VALUES ({', '.join('?' for _ in columns)}, ?)",
+                values
+            )
+            
+            # archive commit avant le DELETE: un crash entre les deux = doublon dans l'archive, pas de perte
+            rowids = [r["archive_rowid"] for r in rows]
+            await source.execute(
+                f"DELETE FROM {table} WHERE rowid IN ({', '.join('?' for _ in rowids)})",
+                tuple(rowids)
+            )
+            
+            moved += len(rows)
+            size += sum(row_size(v[:-1]) for v in values)
+            if len(rows) < self.chunk:
+                break
+            await asyncio.sleep(CHUNK_PAUSE)
+        
+        return moved, size
+    
+    async def _ensure_archive_table(self, table: str, columns: list[str]):
+        """cree la table d'archive, ajoute les colonnes apparues depuis (migrations)"""
+        known = self._archive_columns.get(table)
+        if known is None:
+            await self.archive.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)}, archived_at REAL)"
+            )
+            info = await self.archive.fetchall(f"PRAGMA table_info({table})")
+            known = self._archive_columns[table] = {r["name"] for r in info}
+        
+        for column in columns:
+            if column not in known:
+                await self.archive.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+                known.add(column)
+    
+    # ---- REPORT ----
+    
+    async def report(self) -> list[dict]:
+        """lignes/octets archives par table: total et dernieres 24h"""
+        rows = await self.archive.fetchall("""
+            SELECT table_name,
+                   SUM(rows) as rows, SUM(bytes) as bytes,
+                   SUM(CASE WHEN ran_at > ? THEN rows ELSE 0 END) as rows_24h,
+                   MAX(ran_at) as last_run
+            FROM retention_runs
+            GROUP BY table_name
+            ORDER BY bytes DESC
+        """, (time.time() - DAY,))
+        return [dict(r) for r in rows]
+
+
+# Singleton instance
+retention = RetentionEngine()
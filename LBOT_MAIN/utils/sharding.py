@@ -0,0 +1,314 @@
+"""
+Sharding optionnel de la DB par guild
+
+avec DB_SHARDS=N (> 0) les tables par membre (xp, eco, cases, invites...)
+sont reparties sur N fichiers sqlite selon guild_id, chaque fichier a son
+propre WAL et son propre ecrivain -> une grosse guild bloque plus les autres.
+les configs, guild_settings et tout ce qui est scanne toutes guilds
+confondues (giveaways, temp_punishments, auto_messages...) restent dans le
+fichier central (DATABASE_PATH)
+
+usage:
+    from utils.sharding import shards
+    shard = shards.for_guild(guild_id)   # = db si le sharding est off
+    await shard.fetchone("SELECT * FROM user_levels WHERE guild_id = ? ...")
+
+changer DB_SHARDS (N -> M, ou 0) est gere au demarrage: les lignes sont
+redistribuees dans leur nouveau fichier (cf ShardRouter._rebalance)
+
+quand une operation touche les deux fichiers on imbrique les transactions
+toujours dans le meme ordre (central puis shard):
+    async with db.transaction():
+        async with shards.for_guild(guild_id).transaction():
+            ...
+sans sharding le shard c'est db, le bloc interne devient un SAVEPOINT
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+from utils.database import Database, db, DATABASE_PATH
+
+logger = logging.getLogger('database')
+
+# nb de fichiers shard (0 = tout dans le fichier central, comme avant)
+DB_SHARDS = int(os.getenv("DB_SHARDS", "0"))
+# dossier des shards, par defaut a cote de DATABASE_PATH (peut etre un autre disque)
+DB_SHARD_DIR = os.getenv("DB_SHARD_DIR", "")
+
+# tables shardees -> (colonne qui donne la guild, table parente du central)
+# sert a deplacer les lignes quand la repartition change (cf _rebalance)
+SHARDED_TABLES = {
+    "user_levels": ("guild_id", None),
+    "user_economy": ("guild_id", None),
+    "mod_cases": ("guild_id", None),
+    "user_invites": ("guild_id", None),
+    "invited_users": ("guild_id", None),
+    # pas de guild_id dans les entries, la guild est celle du giveaway (central)
+    "giveaway_entries": ("giveaway_id", "giveaways"),
+}
+
+MIGRATE_CHUNK = 5000
+
+
+def shard_index(guild_id: int, count: int) -> int:
+    """shard d'une guild (les bits de poids faible d'un snowflake tournent vite)"""
+    return guild_id % count
+
+
+def shard_path(index: int, directory: str = "") -> str:
+    """chemin du fichier d'un shard: data/bot.shard0.db, data/bot.shard1.db..."""
+    central = Path(DATABASE_PATH)
+    folder = Path(directory) if directory else central.parent
+    return str(folder / f"{central.stem}.shard{index}{central.suffix}")
+
+
+def existing_shard_files(directory: str = "") -> dict[int, str]:
+    """fichiers shard deja sur le disque (index -> chemin), quel que soit DB_SHARDS"""
+    central = Path(DATABASE_PATH)
+    folder = Path(directory) if directory else central.parent
+    pattern = re.compile(rf"{re.escape(central.stem)}\.shard(\d+){re.escape(central.suffix)}")
+    files = {}
+    for path in folder.glob(f"{central.stem}.shard*{central.suffix}"):
+        match = pattern.fullmatch(path.name)
+        if match:
+            files[int(match.group(1))] = str(path)
+    return dict(sorted(files.items()))
+
+
+class ShardRouter:
+    """route les tables par membre vers le fichier de la guild"""
+    
+    def __init__(self, central: Database, count: int = DB_SHARDS, directory: str = DB_SHARD_DIR):
+        self.central = central
+        self.count = count
+        self.directory = directory
+        self._shards: list[Database] = []
+    
+    @property
+    def enabled(self) -> bool:
+        return self.count > 0
+    
+    @property
+    def all(self) -> list[Database]:
+        """toutes les bases qui contiennent des tables shardees"""
+        return self._shards if self._shards else [self.central]
+    
+    def for_guild(self, guild_id: int) -> Database:
+        """la base qui contient les donnees de cette guild"""
+        if not self._shards:
+            return self.central
+        return self._shards[shard_index(guild_id, self.count)]
+    
+    async def connect(self):
+        """ouvre les shards (apres db.connect), meme schema que le central"""
+        if self.enabled:
+            for i in range(self.count):
+                # FK off: giveaway_entries pointe vers giveaways qui reste dans le central
+                shard = Database(shard_path(i, self.directory), foreign_keys=False)
+                # une seule vue des stats pour la commande dbstats
+                shard.stats = self.central.stats
+                await shard.connect()
+                self._shards.append(shard)
+            
+            logger.info(f"DB shardee sur {self.count} fichiers")
+        
+        await self._rebalance()
+    
+    async def close(self):
+        for shard in self._shards:
+            await shard.close()
+        self._shards = []
+    
+    async def fetchall(self, query: str, params: tuple = (), record: Optional[type] = None) -> list:
+        """meme requete sur tous les shards, resultats concatenes (scans toutes guilds)"""
+        rows = []
+        for shard in self.all:
+            rows.extend(await shard.fetchall(query, params, record=record))
+        return rows
+    
+    async def _stored_count(self) -> Optional[int]:
+        """DB_SHARDS du dernier demarrage (None = jamais enregistre)"""
+        row = await self.central.fetchone("SELECT value FROM schema_meta WHERE key = 'db_shards'")
+        return int(row["value"]) if row else None
+    
+    async def _rebalance(self):
+        """
+        remet chaque ligne dans le fichier de sa guild:
+        - sharding active apres coup: tout ce qui est dans le central part
+        - DB_SHARDS change (N -> M, ou -> 0): les lignes des anciens fichiers
+          sont redistribuees (retour dans le central si 0)
+        le nb de shards est stocke dans schema_meta du central, les anciens
+        fichiers sont relus seulement quand il change (ou au premier passage)
+        """
+        stored = await self._stored_count()
+        
+        sources: list[Database] = []
+        opened: list[Database] = []
+        if self.enabled:
+            sources.append(self.central)
+        if stored != self.count:
+            for index, path in existing_shard_files(self.directory).items():
+                if index < self.count:
+                    sources.append(self._shards[index])
+                    continue
+                # fichier hors de la nouvelle repartition, ouvert juste pour le vider
+                shard = Database(path, foreign_keys=False)
+                await shard.connect()
+                opened.append(shard)
+                sources.append(shard)
+            if stored is not None:
+                logger.info(f"Sharding: DB_SHARDS {stored} -> {self.count}, redistribution des lignes...")
+        
+        conflicts = 0
+        try:
+            for source in sources:
+                conflicts += await self._drain(source)
+        finally:
+            for shard in opened:
+                await shard.close()
+                logger.info(f"Sharding: {shard.db_path} hors repartition, plus utilise (peut etre supprime si vide)")
+        
+        if conflicts:
+            # nb oublie: tous les fichiers seront relus au prochain demarrage
+            await self.central.execute("DELETE FROM schema_meta WHERE key = 'db_shards'")
+            logger.error(
+                f"Sharding: {conflicts} lignes en conflit laissees en place "
+                f"(cle deja prise dans le fichier cible), a regler a la main"
+            )
+            return
+        
+        if stored != self.count:
+            await self.central.execute(
+                "INSERT OR REPLACE INTO schema_meta (key, value) VALUES ('db_shards', ?)",
+                (str(self.count),)
+            )
+    
+    async def _drain(self, source: Database) -> int:
+        """
+        deplace les lignes de `source` qui appartiennent a un autre fichier.
+        une ligne n'est supprimee de la source qu'une fois copiee (ou deja
+        presente a l'identique, passage interrompu), retourne le nb de conflits
+        """
+        conflicts = 0
+        for table, (guild_column, parent) in SHARDED_TABLES.items():
+            row = await source.fetchone(f"SELECT COUNT(*) as count FROM {table}")
+            if not row or not row["count"]:
+                continue
+            
+            columns, key, remapped = await self._layout(source, table)
+            # id du parent -> guild (les parents sont toujours dans le central)
+            parents = None
+            if parent:
+                parents = {
+                    r["id"]: r["guild_id"]
+                    for r in await self.central.fetchall(f"SELECT id, guild_id FROM {parent}")
+                }
+            
+            last_rowid = 0
+            moved = orphans = kept = 0
+            while True:
+                rows = await source.fetchall(
+                    f"SELECT rowid AS shard_rowid, * FROM {table} "
+                    f"WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, MIGRATE_CHUNK)
+                )
+                if not rows:
+                    break
+                last_rowid = rows[-1]["shard_rowid"]
+                
+                done: list[tuple] = []
+                by_target: dict[Database, list] = {}
+                for r in rows:
+                    guild_id = r[guild_column] if parents is None else parents.get(r[guild_column])
+                    if guild_id is None:
+                        # entries d'un giveaway supprime, elles partent
+                        done.append((r["shard_rowid"],))
+                        orphans += 1
+                        continue
+                    target = self.for_guild(guild_id)
+                    if target is not source:
+                        by_target.setdefault(target, []).append(r)
+                
+                for target, group in by_target.items():
+                    async with target.transaction():
+                        for r in group:
+                            if await self._copy_row(target, table, r, columns, key, remapped, guild_column):
+                                done.append((r["shard_rowid"],))
+                                moved += 1
+                            else:
+                                kept += 1
+                
+                await source.execute_many(f"DELETE FROM {table} WHERE rowid = ?", done)
+            
+            if moved or orphans or kept:
+                logger.info(f"Sharding: {table} depuis {source.db_path}: {moved} deplacees, {orphans} orphelines supprimees")
+            if moved and remapped:
+                logger.warning(f"Sharding: {table}: les lignes deplacees ont un nouvel {key[0]}")
+            if kept:
+                logger.error(f"Sharding: {table}: {kept} lignes en conflit gardees dans {source.db_path}")
+            conflicts += kept
+        
+        return conflicts
+    
+    @staticmethod
+    async def _layout(source: Database, table: str) -> tuple[list[str], list[str], bool]:
+        """
+        (colonnes a copier, cle primaire, id renumerote). un id INTEGER PRIMARY
+        KEY (AUTOINCREMENT) est local a chaque fichier: deux fichiers peuvent
+        avoir le meme, donc il est pas copie et la cible en donne un nouveau
+        """
+        info = await source.fetchall(f"PRAGMA table_info({table})")
+        key = [r["name"] for r in sorted((r for r in info if r["pk"]), key=lambda r: r["pk"])]
+        remapped = len(key) == 1 and next(r["type"] for r in info if r["name"] == key[0]).upper() == "INTEGER"
+        columns = [r["name"] for r in info if not (remapped and r["name"] == key[0])]
+        return columns, key, remapped
+    
+    @staticmethod
+    async def _copy_row(
+        target: Database,
+        table: str,
+        row,
+        columns: list[str],
+        key: list[str],
+        remapped: bool,
+        guild_column: str
+    ) -> bool:
+        """copie une ligne dans target (dans sa transaction), False si conflit"""
+        values = tuple(row[c] for c in columns)
+        
+        if remapped:
+            # deja copiee par un passage interrompu ? (meme contenu hors id)
+            where = " AND ".join(
+                f"{c} = ?" if c == guild_column else f"{c} IS ?" for c in columns
+            )
+            if await target.fetchone(f"SELECT 1 FROM {table} WHERE {where}", values):
+                return True
+            await target.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                values
+            )
+            return True
+        
+        cursor = await target.execute(
+            f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})",
+            values
+        )
+        if cursor.rowcount:
+            return True
+        
+        # cle deja prise: ok seulement si c'est la meme ligne (copie interrompue)
+        existing = await target.fetchone(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE "
+            + " AND ".join(f"{c} = ?" for c in key),
+            tuple(row[c] for c in key)
+        )
+        return existing is not None and tuple(existing) == values
+
+
+# Singleton instance
+shards = ShardRouter(db)
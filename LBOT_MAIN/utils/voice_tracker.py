@@ -0,0 +1,153 @@
+"""
+Presence vocale partagee (xp vocal des levels, argent vocal de l'economie)
+
+avant Levels et Economy avaient chacun leur dict voice_tracking, leur boucle
+par minute qui recalculait la liste des humains du salon pour chaque membre,
+et l'economie faisait 1-2 ecritures par membre. ici les sessions sont suivies
+une fois, l'eligibilite est calculee par salon (pas seul, pas mute/sourd) et
+chaque minute les abonnes recoivent d'un coup les membres eligibles groupes
+par serveur, a eux d'ecrire en bulk
+
+usage:
+    from utils.voice_tracker import voice_tracker
+    voice_tracker.subscribe(self.on_voice_tick)    # cog_load
+    voice_tracker.unsubscribe(self.on_voice_tick)  # cog_unload
+    
+    async def on_voice_tick(self, eligible: dict[int, list[int]]):
+        # {guild_id: [user_id, ...]} des membres qui ont fait une minute eligible
+        ...
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+import discord
+from discord.ext import commands
+
+logger = logging.getLogger('draftbot')
+
+VoiceHandler = Callable[[dict[int, list[int]]], Awaitable[None]]
+
+TICK_INTERVAL = 60
+
+
+class VoiceTracker:
+    """sessions vocales des membres + tick par minute pour les abonnes"""
+    
+    def __init__(self, interval: float = TICK_INTERVAL):
+        self.interval = interval
+        # (guild_id, user_id) -> debut de la session
+        self.sessions: dict[tuple[int, int], float] = {}
+        self._handlers: list[VoiceHandler] = []
+        self._bot: Optional[commands.Bot] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def subscribe(self, handler: VoiceHandler):
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+    
+    def unsubscribe(self, handler: VoiceHandler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+    
+    # ---- SESSIONS ----
+    
+    async def on_voice_state_update(
+        self,
+        member: discord.Member,
+        before: discord.VoiceState,
+        after: discord.VoiceState
+    ):
+        """listener ajoute au bot dans start()"""
+        if member.bot:
+            return
+        
+        key = (member.guild.id, member.id)
+        if before.channel is None and after.channel is not None:
+            self.sessions[key] = time.time()
+        elif before.channel is not None and after.channel is None:
+            self.sessions.pop(key, None)
+    
+    def eligible(self) -> dict[int, list[int]]:
+        """membres eligibles par serveur (sessions qui sont plus en vocal retirees au passage)"""
+        if not self._bot:
+            return {}
+        
+        by_channel: dict[int, list[discord.Member]] = {}
+        channels: dict[int, discord.abc.GuildChannel] = {}
+        for guild_id, user_id in list(self.sessions):
+            guild = self._bot.get_guild(guild_id)
+            if not guild:
+                continue
+            
+            member = guild.get_member(user_id)
+            if not member or not member.voice or not member.voice.channel:
+                del self.sessions[(guild_id, user_id)]
+                continue
+            
+            channel = member.voice.channel
+            channels[channel.id] = channel
+            by_channel.setdefault(channel.id, []).append(member)
+        
+        eligible: dict[int, list[int]] = {}
+        for channel_id, members in by_channel.items():
+            # une fois par salon, pas une fois par membre
+            channel = channels[channel_id]
+            humans = sum(1 for m in channel.members if not m.bot)
+            if humans < 2:
+                continue
+            
+            for member in members:
+                if member.voice.self_mute or member.voice.self_deaf:
+                    continue
+                eligible.setdefault(channel.guild.id, []).append(member.id)
+        
+        return eligible
+    
+    # ---- SCHEDULER ----
+    
+    def start(self, bot: commands.Bot):
+        """branche le listener et lance le tick (setup_hook)"""
+        if self._task:
+            return
+        self._bot = bot
+        bot.add_listener(self.on_voice_state_update)
+        self._task = asyncio.create_task(self._loop())
+    
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._bot:
+            self._bot.remove_listener(self.on_voice_state_update)
+    
+    async def _loop(self):
+        await self._bot.wait_until_ready()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Voice tick: {e}")
+    
+    async def tick(self):
+        """un passage: calcule les eligibles une fois et les envoie a chaque abonne"""
+        eligible = self.eligible()
+        if not eligible:
+            return
+        
+        for handler in list(self._handlers):
+            try:
+                await handler(eligible)
+            except Exception as e:
+                logger.error(f"Voice tick ({getattr(handler, '__qualname__', handler)}): {e}")
+
+
+# Singleton instance
+voice_tracker = VoiceTracker()
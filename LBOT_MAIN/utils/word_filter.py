@@ -0,0 +1,204 @@
+"""
+Filtre de mots compile
+
+avant check_bad_words faisait `word in content` pour chaque mot interdit a
+chaque message: O(mots x longueur). ici la liste d'un serveur est compilee
+une fois en une seule regex en forme d'arbre (les mots qui partagent un
+debut partagent la branche), donc le moteur de re avance dans le message en
+suivant au plus une branche par lettre au lieu de retester chaque mot
+
+options (colonnes de mod_config, migration 012):
+- bad_words_whole_words: mot entier seulement ("ass" bloque pas "classe")
+- bad_words_obfuscation: le message et les mots sont normalises avant
+  (minuscules, accents retires, leet 4->a 3->e 0->o..., ponctuation entre les
+  lettres retiree) et une lettre du milieu du mot peut etre repetee au moins
+  deux fois de plus ("c.o.n", "c0ooon" -> con, mais "coon", "pas" passent).
+  une suite de lettres du mot = un seul token dans la regex, pas de `x+x+x+`
+  par lettre: un mot avec "zzz" backtrackait en temps cubique sur un message
+  de "zzzz..." (plusieurs secondes pour un seul message)
+
+benchmark:
+    python -m utils.word_filter            # 1000 mots, messages de 200 caracteres
+    python -m utils.word_filter 5000 500
+"""
+
+import re
+import sys
+import time
+import unicodedata
+from typing import Optional
+
+# "!" et "|" en fin de mot sont surtout de la ponctuation, ils restent hors de la table
+LEET = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t",
+    "@": "a", "$": "s", "€": "e",
+})
+# ponctuation entre les lettres ("c.o.n", "c-o-n", "c*n"), les espaces restent
+PUNCTUATION = re.compile(r"[^\w\s]+")
+# suites de lettres identiques d'un mot: "ass" -> a, ss
+RUNS = re.compile(r"(.)\1*")
+
+# un mot plus long que ca est surement une erreur de config
+MAX_WORD_LENGTH = 100
+
+
+def normalize(text: str) -> str:
+    """minuscules, sans accents, leet remplace, sans ponctuation"""
+    text = text.lower().translate(LEET)
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return PUNCTUATION.sub("", text)
+
+
+def trie_pattern(words: list[str], repeats: bool = False, prefix_only: bool = True) -> str:
+    """
+    regex qui matche un des mots, en arbre: ["con", "conne", "cul"] ->
+    c(?:on|ul). prefix_only = un mot qui en prolonge un autre est inutile
+    (le plus court matche deja), sauf en mot entier
+    
+    repeats = les branches sont des suites de lettres identiques, une suite de
+    n lettres au milieu du mot accepte n lettres ou n+2 et plus dans le
+    message: "con" bloque "cooon" mais pas "coon" (une lettre doublee c'est
+    de l'orthographe normale, "classe", "belle", pas de l'obfuscation).
+    la premiere et la derniere suite restent exactes, en sous-chaine la
+    lettre d'a cote du message peut deja les prolonger. en mot entier toutes
+    les suites s'etirent. deux suites voisines ont des lettres differentes:
+    rien a backtracker, temps lineaire meme sur un message de "zzzz..."
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        tokens = [(m.group(1), len(m.group(0))) for m in RUNS.finditer(word)] if repeats else [(c, 1) for c in word]
+        for token in tokens:
+            node = node.setdefault(token, {})
+        node[""] = {}
+    
+    def letter(char: str, count: int, stretch: bool) -> str:
+        char = re.escape(char)
+        exact = char if count == 1 else f"{char}{{{count}}}"
+        if not stretch:
+            return exact
+        return f"{exact}(?:{char}{char}+)?(?!{char})"
+    
+    def build(node: dict, first: bool = False) -> str:
+        if "" in node and prefix_only:
+            return ""
+        branches = []
+        for token, child in sorted((k, v) for k, v in node.items() if k):
+            last = prefix_only and "" in child
+            stretch = repeats and (not prefix_only or not (first or last))
+            branches.append(letter(*token, stretch) + build(child))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            body = f"(?:{body})?"
+        return body
+    
+    return build(trie, first=True)
+
+
+class WordMatcher:
+    """liste de mots interdits compilee"""
+    
+    __slots__ = ("words", "whole_words", "obfuscation", "_regex")
+    
+    def __init__(self, words: list[str], whole_words: bool = False, obfuscation: bool = False):
+        self.whole_words = whole_words
+        self.obfuscation = obfuscation
+        
+        clean = normalize if obfuscation else str.lower
+        self.words = sorted({clean(w).strip() for w in words if isinstance(w, str)} - {""})
+        self.words = [w for w in self.words if len(w) <= MAX_WORD_LENGTH]
+        
+        self._regex: Optional[re.Pattern] = None
+        if self.words:
+            pattern = trie_pattern(self.words, repeats=obfuscation, prefix_only=not whole_words)
+            if whole_words:
+                pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+            self._regex = re.compile(pattern)
+    
+    def __bool__(self) -> bool:
+        return self._regex is not None
+    
+    def search(self, text: str) -> Optional[str]:
+        """premier mot interdit trouve (tel qu'il apparait apres normalisation), None si rien"""
+        if self._regex is None:
+            return None
+        text = normalize(text) if self.obfuscation else text.lower()
+        match = self._regex.search(text)
+        return match.group(0) if match else None
+
+
+# ============ BENCHMARK ============
+
+def benchmark(word_count: int = 1000, length: int = 200, messages: int = 2000):
+    import random
+    import string
+    
+    rng = random.Random(42)
+    
+    def random_word(size: int) -> str:
+        # comme dans une vraie langue, jamais 3 fois la meme lettre d'affilee
+        # (ca c'est de l'obfuscation, le filtre doit le bloquer)
+        letters = []
+        while len(letters) < size:
+            char = rng.choice(string.ascii_lowercase)
+            if len(letters) < 2 or not (letters[-1] == letters[-2] == char):
+                letters.append(char)
+        return "".join(letters)
+    
+    words = [random_word(rng.randint(4, 10)) for _ in range(word_count)]
+    texts = [
+        " ".join(random_word(rng.randint(2, 9)) for _ in range(length // 6))[:length]
+        for _ in range(messages)
+    ]
+    
+    def naive(text: str) -> bool:
+        # l'ancien check_bad_words
+        lower = text.lower()
+        return any(word.lower() in lower for word in words)
+    
+    def run(label: str, check):
+        start = time.perf_counter()
+        hits = [bool(check(t)) for t in texts]
+        per_message = (time.perf_counter() - start) / messages
+        print(f"{label:<28} {per_message * 1e6:>9.1f} us/message  ({sum(hits)} matches)")
+        return per_message, hits
+    
+    print(f"{word_count} mots, {messages} messages de {length} caracteres")
+    start = time.perf_counter()
+    matchers = {
+        "compile": WordMatcher(words),
+        "compile + mot entier": WordMatcher(words, whole_words=True),
+        "compile + obfuscation": WordMatcher(words, obfuscation=True),
+    }
+    print(f"{'compilation (x3)':<28} {(time.perf_counter() - start) * 1e3:>9.1f} ms")
+    
+    base, expected = run("naif (word in content)", naive)
+    for label, matcher in matchers.items():
+        cost, hits = run(label, matcher.search)
+        print(f"{'':<28} x{base / cost:.1f}")
+        # texte sans leet, ponctuation ni lettre triplee: l'obfuscation doit
+        # bloquer pareil que le naif (pas de "ass" qui bloque "pas")
+        if matcher.obfuscation:
+            extra = sum(1 for h, e in zip(hits, expected) if h and not e)
+            assert extra == 0, f"obfuscation: {extra} messages bloques en trop"
+    
+    # pire cas: mots avec des lettres repetees contre un message qui ne fait
+    # que repeter cette lettre (4000 = taille max d'un message discord nitro)
+    print("\nmessages pieges (lettre repetee, 4000 caracteres)")
+    traps = {"zzza": "z" * 4000, "bouuuh": "bo" + "u" * 3998}
+    for label, obfuscation in (("compile", False), ("compile + obfuscation", True)):
+        for word, text in traps.items():
+            matcher = WordMatcher([word], obfuscation=obfuscation)
+            start = time.perf_counter()
+            matcher.search(text)
+            elapsed = time.perf_counter() - start
+            print(f"{label + ' ' + word:<28} {elapsed * 1e6:>9.1f} us/message")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    benchmark(*args)
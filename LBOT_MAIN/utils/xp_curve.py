@@ -0,0 +1,108 @@
+"""
+Courbe d'XP precalculee
+
+avant level_from_xp montait niveau par niveau avec un `** 1.5` en float a
+chaque pas, a chaque gain d'xp. ici les seuils cumules (xp totale pour
+atteindre chaque niveau) sont calcules une fois dans un array et le niveau
+se trouve par bisect. la table s'agrandit toute seule si quelqu'un depasse
+le dernier niveau calcule
+
+chaque serveur peut avoir sa courbe (xp_curve_base / xp_curve_exponent dans
+levels_config), les courbes sont partagees entre les serveurs qui ont les
+memes parametres
+
+usage:
+    from utils.xp_curve import curve_for, default_curve
+    curve = curve_for(config)               # config levels du serveur
+    level = curve.level_for(user.xp)
+    current, needed = curve.progress(user.xp, level)
+"""
+
+from array import array
+from bisect import bisect_right
+from typing import Optional
+
+DEFAULT_BASE = 100
+DEFAULT_EXPONENT = 1.5
+
+# niveaux calcules d'avance (la table grandit par doublement au dela)
+INITIAL_LEVELS = 200
+# la table s'arrete la (ou avant si les seuils sortent d'un int 64 bits)
+MAX_LEVELS = 1_000_000
+MAX_XP = 2 ** 62
+
+
+class XPCurve:
+    """xp totale pour atteindre le niveau n = int(base * n ** exponent)"""
+    
+    __slots__ = ("base", "exponent", "thresholds")
+    
+    def __init__(self, base: int = DEFAULT_BASE, exponent: float = DEFAULT_EXPONENT):
+        if base <= 0 or exponent <= 0:
+            raise ValueError("base et exponent doivent etre > 0")
+        self.base = base
+        self.exponent = exponent
+        self.thresholds = array("q")
+        self._extend(INITIAL_LEVELS)
+    
+    def _threshold(self, level: int) -> int:
+        return int(self.base * (level ** self.exponent))
+    
+    def _extend(self, levels: int) -> bool:
+        """calcule les seuils jusqu'au niveau donne, False si la table est au max"""
+        added = False
+        for level in range(len(self.thresholds), min(levels, MAX_LEVELS) + 1):
+            xp = self._threshold(level)
+            if xp > MAX_XP:
+                break
+            self.thresholds.append(xp)
+            added = True
+        return added
+    
+    def xp_for(self, level: int) -> int:
+        """xp totale necessaire pour atteindre ce niveau"""
+        if level < 0:
+            return 0
+        if level >= len(self.thresholds):
+            self._extend(max(level, 2 * len(self.thresholds)))
+            if level >= len(self.thresholds):
+                return self._threshold(level)
+        return self.thresholds[level]
+    
+    def level_for(self, xp: int) -> int:
+        """niveau atteint avec cette xp totale"""
+        while xp >= self.thresholds[-1] and self._extend(2 * len(self.thresholds)):
+            pass
+        return max(bisect_right(self.thresholds, xp) - 1, 0)
+    
+    def levels_for(self, xps: list[int]) -> list[int]:
+        """level_for sur toute une liste (recalcul d'un serveur entier)"""
+        if xps:
+            self.level_for(max(xps))  # agrandit la table une seule fois
+        thresholds = self.thresholds
+        return [max(bisect_right(thresholds, xp) - 1, 0) for xp in xps]
+    
+    def progress(self, xp: int, level: int) -> tuple[int, int]:
+        """(xp dans le niveau actuel, xp du niveau actuel au suivant)"""
+        current = self.xp_for(level)
+        return xp - current, self.xp_for(level + 1) - current
+
+
+_curves: dict[tuple[int, float], XPCurve] = {}
+
+
+def get_curve(base: Optional[int] = None, exponent: Optional[float] = None) -> XPCurve:
+    """courbe pour ces parametres (creee une fois, partagee)"""
+    key = (int(base or DEFAULT_BASE), float(exponent or DEFAULT_EXPONENT))
+    curve = _curves.get(key)
+    if curve is None:
+        curve = _curves[key] = XPCurve(*key)
+    return curve
+
+
+def curve_for(config: dict) -> XPCurve:
+    """courbe d'un serveur depuis sa config levels"""
+    return get_curve(config.get("xp_curve_base"), config.get("xp_curve_exponent"))
+
+
+default_curve = get_curve()